@@ -0,0 +1,214 @@
+"""Пакетная генерация наборов COMTRADE без графического интерфейса.
+
+Запуск:
+    python batch_generate.py scenario.json --jobs 4
+
+Файл сценария (JSON):
+    {
+      "output_dir": "out",
+      "data_format": "BINARY",
+      "duration": 1.0,
+      "sampling_rate": 4000,
+      "start_time": "2000-01-01T00:00:00",
+      "records": [
+        {
+          "name": "fault_a",
+          "channels": [
+            {"name": "Ia", "type": "Синус", "params": {"amplitude": 100, "frequency": 50}},
+            {"name": "Ua", "type": "Косинус", "params": {"amplitude": 57.7}}
+          ]
+        }
+      ]
+    }
+
+Параметры duration, sampling_rate и data_format можно переопределить
+в отдельной записи. Параметры канала, не указанные в сценарии, берутся
+по умолчанию из signal_types.json; вместо "type" можно задать "equation".
+
+Канал может быть последовательностью участков (см. fault_sequencer):
+    {"name": "Ia", "segments": [
+        {"start": 0.0, "type": "Синус", "params": {"amplitude": 100, "frequency": 50}},
+        {"start": 0.1, "type": "Синус", "params": {"amplitude": 2000, "frequency": 50},
+         "continuous_phase": true, "phase_step": -60},
+        {"start": 0.2, "equation": "0"}
+    ]}
+Результат зависит только от сценария: время начала записи фиксировано.
+Длинные каналы берутся из постоянного кэша сигналов (waveform_cache), общего
+для процессов пула и для графического интерфейса.
+
+Запись может состоять из участков с разной частотой дискретизации (nrates):
+    "sections": [{"sampling_rate": 1000, "duration": 0.1},
+                 {"sampling_rate": 20000, "duration": 0.2}]
+Каналы вычисляются один раз с частотой записи sampling_rate на суммарную
+длительность участков, а каждый участок получается передискретизацией
+своего отрезка (см. resampling).
+
+Модуль не импортирует PySide6 и pyqtgraph.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import signal_generator
+import waveform_cache
+from comtrade_writer import write_comtrade_sections, write_comtrade_stream
+from fault_sequencer import ChannelSequence, sequence_from_spec
+from resampling import iter_sections
+from signal_types import load_signal_types, resolve_spec
+
+DEFAULT_START_TIME: str = "2000-01-01T00:00:00"
+
+
+def resolve_channel(channel: Dict[str, Any], configs: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+    """Возвращает параметры и уравнение канала из описания в сценарии."""
+    params, equation = resolve_spec(channel, configs)
+    params["name"] = channel.get("name", "Безымянный")
+    return params, equation
+
+
+def resolve_source(
+    channel: Dict[str, Any], configs: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Union[str, ChannelSequence]]:
+    """Возвращает параметры канала и его уравнение или последовательность участков."""
+    if "segments" in channel:
+        sequence = sequence_from_spec(channel, configs)
+        return {"name": sequence.name}, sequence
+    return resolve_channel(channel, configs)
+
+
+def build_jobs(scenario: Dict[str, Any], output_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Разворачивает сценарий в список независимых заданий (по одному на запись)."""
+    configs = load_signal_types()
+    output_dir = output_dir or scenario.get("output_dir", ".")
+    jobs: List[Dict[str, Any]] = []
+    for index, record in enumerate(scenario.get("records", [])):
+        name = record.get("name", f"record_{index + 1}")
+        jobs.append({
+            "path": os.path.join(output_dir, name),
+            "channels": [resolve_source(ch, configs) for ch in record.get("channels", [])],
+            "duration": float(record.get("duration", scenario.get("duration", signal_generator.DEFAULT_DURATION))),
+            "sampling_rate": int(record.get("sampling_rate", scenario.get("sampling_rate", signal_generator.DEFAULT_SAMPLING_RATE))),
+            "data_format": record.get("data_format", scenario.get("data_format", "BINARY")),
+            "start_time": record.get("start_time", scenario.get("start_time", DEFAULT_START_TIME)),
+            "station_name": record.get("station_name", scenario.get("station_name", "")),
+            "sections": [
+                (float(section["sampling_rate"]), float(section["duration"]))
+                for section in record.get("sections", [])
+            ],
+        })
+        if jobs[-1]["sections"]:
+            jobs[-1]["duration"] = sum(duration for _, duration in jobs[-1]["sections"])
+    return jobs
+
+
+def generate_record(job: Dict[str, Any]) -> Tuple[str, int]:
+    """Генерирует одну запись COMTRADE. Возвращает путь и число записанных значений."""
+    channels = job["channels"]
+    if not channels:
+        raise ValueError(f"В записи {job['path']!r} нет каналов")
+    n_samples = int(job["sampling_rate"] * job["duration"])
+    values = np.empty((len(channels), n_samples), dtype=np.float64)
+    cache = waveform_cache.default_cache
+    for row, (params, equation) in zip(values, channels):
+        if isinstance(equation, ChannelSequence):
+            # Участки пишутся сразу в строку общего массива
+            equation.generate(job["duration"], job["sampling_rate"], out=row)
+            continue
+        key: Optional[str] = None
+        if cache.enabled and n_samples >= waveform_cache.CACHE_MIN_SAMPLES:
+            try:
+                key = cache.key(params, equation, job["duration"], job["sampling_rate"])
+            except TypeError as e:
+                print(f"Ошибка ключа кэша сигналов: {e}")
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None and cached.shape == row.shape:
+                    row[:] = cached
+                    continue
+        for start, _, y in signal_generator.iter_signal_blocks(
+            params, equation, job["duration"], job["sampling_rate"]
+        ):
+            row[start:start + len(y)] = y
+        if key is not None:
+            cache.put(key, row)
+
+    os.makedirs(os.path.dirname(job["path"]) or ".", exist_ok=True)
+    names = [params["name"] for params, _ in channels]
+    options: Dict[str, Any] = {
+        "station_name": job["station_name"],
+        "start_time": datetime.fromisoformat(job["start_time"]),
+        "expected_samples": n_samples,
+    }
+    if not job.get("sections"):
+        write_comtrade_stream(
+            job["path"], names, [values], job["sampling_rate"], job["data_format"],
+            ranges=(values.min(axis=1), values.max(axis=1)), **options,
+        )
+        return job["path"], values.size
+
+    # Участки передискретизируются по одному; диапазоны нужны до записи
+    rows = [(row, job["sampling_rate"]) for row in values]
+    blocks = list(iter_sections(rows, job["sections"]))
+    mins = np.min([block.min(axis=1) for _, block in blocks if block.size], axis=0)
+    maxs = np.max([block.max(axis=1) for _, block in blocks if block.size], axis=0)
+    write_comtrade_sections(
+        job["path"], names, blocks, job["sampling_rate"], job["data_format"],
+        ranges=(mins, maxs), **options,
+    )
+    return job["path"], sum(block.size for _, block in blocks)
+
+
+def run(jobs: List[Dict[str, Any]], workers: Optional[int] = None) -> int:
+    """Выполняет задания в пуле процессов и печатает пропускную способность."""
+    failures = 0
+    total_values = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(generate_record, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                path, n_values = future.result()
+            except Exception as e:  # noqa: BLE001 - сообщаем о любой ошибке записи
+                failures += 1
+                print(f"Ошибка: {job['path']}: {e}", file=sys.stderr)
+                continue
+            total_values += n_values
+            print(f"Записано: {path}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    done = len(jobs) - failures
+    print(
+        f"Записей: {done}/{len(jobs)} за {elapsed:.3f} с "
+        f"({done / elapsed:.1f} записей/с, {total_values / elapsed:,.0f} отсчётов/с)"
+    )
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетная генерация файлов COMTRADE из сценария.")
+    parser.add_argument("scenario", help="JSON-файл сценария")
+    parser.add_argument("-o", "--output-dir", help="каталог для результатов (по умолчанию из сценария)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="число процессов (по умолчанию по числу ядер)")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+    try:
+        jobs = build_jobs(scenario, args.output_dir)
+    except ValueError as e:
+        print(f"Ошибка в сценарии: {e}", file=sys.stderr)
+        return 2
+    return 1 if run(jobs, args.jobs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
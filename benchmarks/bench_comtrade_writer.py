@@ -0,0 +1,56 @@
+"""Бенчмарк записи COMTRADE: скорость записи .dat (МБ/с) для каждого формата.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_comtrade_writer.py --channels 32 --seconds 60 --rate 4000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comtrade_writer import DATA_FORMATS, write_comtrade  # noqa: E402
+
+
+class _Channel:
+    def __init__(self, name: str, y: np.ndarray) -> None:
+        self.name = name
+        self.y = y
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--rate", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    n_samples = int(args.seconds * args.rate)
+    t = np.arange(n_samples) / args.rate
+    channels = [
+        _Channel(f"ch{i + 1}", 100.0 * np.sin(2 * np.pi * 50.0 * t + i))
+        for i in range(args.channels)
+    ]
+    print(f"{args.channels} каналов x {n_samples} отсчётов")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for data_format in DATA_FORMATS:
+            best = float("inf")
+            for _ in range(args.repeat):
+                path = os.path.join(tmp, f"bench_{data_format}")
+                start = time.perf_counter()
+                _, dat_path = write_comtrade(path, channels, args.rate, data_format)
+                best = min(best, time.perf_counter() - start)
+            size_mb = os.path.getsize(dat_path) / 1e6
+            print(f"{data_format:>9}: {size_mb:8.1f} МБ за {best:6.3f} с -> {size_mb / best:8.1f} МБ/с")
+
+
+if __name__ == "__main__":
+    main()
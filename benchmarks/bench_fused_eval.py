@@ -0,0 +1,73 @@
+"""Бенчмарк вычисления уравнений: asteval против слитного блочного вычислителя.
+
+Для каждого встроенного типа сигнала измеряет время и пиковый объём памяти
+(tracemalloc учитывает выделения numpy) при вычислении одного канала.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_fused_eval.py --seconds 60 --rate 50000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signal_generator  # noqa: E402
+from signal_types import default_params, load_signal_types  # noqa: E402
+
+
+def _measure(func: Callable[[], np.ndarray], repeat: int) -> Tuple[float, float, np.ndarray]:
+    """Возвращает (лучшее время, с; пик памяти сверх результата, МБ; результат)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, (peak - result.nbytes) / 1e6, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--rate", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    t = signal_generator.get_time_base(args.seconds, args.rate)
+    print(f"{len(t)} отсчётов, результат {t.nbytes / 1e6:.1f} МБ")
+    print(f"{'тип':>18} {'asteval, с':>11} {'слитно, с':>10} {'ускорение':>9} "
+          f"{'пик asteval, МБ':>16} {'пик слитно, МБ':>15}")
+    for config in load_signal_types():
+        params = default_params(config)
+        compiled = signal_generator.compile_equation(config["equation"])
+        plan = compiled.fused_plan()
+        if plan is None:
+            print(f"{config['name']:>18}: не поддерживается слитным вычислителем")
+            continue
+        reference = lambda: signal_generator._coerce_result(  # noqa: E731
+            signal_generator._evaluate(compiled, t, params), t
+        )
+        fused = lambda: signal_generator._evaluate_array(compiled, t, params)  # noqa: E731
+        fused()  # прогрев буферов потока
+        time_ref, peak_ref, y_ref = _measure(reference, args.repeat)
+        time_fused, peak_fused, y_fused = _measure(fused, args.repeat)
+        if not np.allclose(y_ref, y_fused, rtol=0, atol=1e-12):
+            print(f"{config['name']:>18}: результаты расходятся")
+        print(f"{config['name']:>18} {time_ref:11.3f} {time_fused:10.3f} {time_ref / time_fused:8.2f}x "
+              f"{peak_ref:16.1f} {peak_fused:15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Бенчмарк перебора параметров: по сигналу на вариант против ParameterSweep.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_parameter_sweep.py --variants 3600 --seconds 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Генерация измеряется без постоянного кэша сигналов
+os.environ.setdefault("COMTRADE_GEN_CACHE_MB", "0")
+
+import signal_generator  # noqa: E402
+from parameter_sweep import ParameterSweep  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--type", default="Затухающий синус")
+    parser.add_argument("--variants", type=int, default=3600)
+    parser.add_argument("--seconds", type=float, default=0.2)
+    parser.add_argument("--rate", type=int, default=4000)
+    args = parser.parse_args()
+
+    sweep = ParameterSweep.from_type(
+        args.type,
+        {"phase": {"start": 0.0, "stop": 360.0, "num": args.variants}},
+        duration=args.seconds,
+        sampling_rate=args.rate,
+    )
+    print(f"{sweep.n_variants} вариантов x {sweep.n_samples} отсчётов, пачка {sweep.rows_per_chunk}")
+
+    start = time.perf_counter()
+    loop = np.empty((sweep.n_variants, sweep.n_samples))
+    for i in range(sweep.n_variants):
+        _, loop[i] = signal_generator.generate_signal_data(
+            sweep.variant_params(i), sweep.equation, sweep.duration, sweep.sampling_rate
+        )
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, values = sweep.generate()
+    sweep_time = time.perf_counter() - start
+
+    print(f"по одному: {loop_time:.3f} с, перебор: {sweep_time:.3f} с, ускорение {loop_time / sweep_time:.1f}x")
+    print(f"максимальное расхождение: {np.abs(loop - values).max():.3g}")
+
+
+if __name__ == "__main__":
+    main()
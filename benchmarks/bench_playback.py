@@ -0,0 +1,65 @@
+"""Бенчмарк воспроизведения: время подготовки кадра и отсутствие выделений памяти во внутреннем цикле.
+
+Кадры формируются без таймера (так быстро, как получается), затем
+проверяется, что последнее окно совпадает с исходными отсчётами.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_playback.py --channels 24 --frames 20000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playback import FRAME_SIZE, PlaybackEngine  # noqa: E402
+
+# Допуск на служебные объекты интерпретатора (целые номера кадров и т.п.), байт
+ALLOCATION_SLACK_BYTES: int = 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=24)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=4000)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    n = int(args.seconds * args.rate)
+    t = np.arange(n) / args.rate
+    channels = [np.sin(2 * np.pi * 50 * t + k) for k in range(args.channels)]
+    engine = PlaybackEngine(channels, args.rate)
+    frame_bytes = engine.ring[0].nbytes
+
+    # Прогрев: первые вызовы numpy создают служебные объекты
+    for frame in range(engine.ring_frames):
+        engine._produce(frame)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for frame in range(engine.ring_frames, engine.ring_frames + args.frames):
+        engine._produce(frame)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    window = np.empty((args.channels, engine.capacity - 2 * FRAME_SIZE))
+    first = engine.latest(window)
+    source = np.array(channels)
+    expected = np.take(source, np.arange(first, first + window.shape[1]), axis=1, mode="wrap")
+
+    print(f"{args.channels} каналов, кадр {FRAME_SIZE} отсчётов ({frame_bytes} байт), {args.frames} кадров")
+    print(f"кадр: {elapsed / args.frames * 1e6:.2f} мкс, пик памяти во внутреннем цикле: {peak} байт")
+    print(f"окно latest() совпадает с исходными отсчётами: {np.array_equal(window, expected)}")
+    assert peak < ALLOCATION_SLACK_BYTES, f"внутренний цикл выделяет память: пик {peak} байт"
+
+
+if __name__ == "__main__":
+    main()
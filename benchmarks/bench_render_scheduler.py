@@ -0,0 +1,105 @@
+"""Бенчмарк общего планировщика перерисовки: серия обновлений сигнала во многих окнах графиков.
+
+Половина окон собрана во вкладки и не видна. Сравнивается применение
+каждого обновления сразу во всех окнах с объединением по кадрам.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_render_scheduler.py --views 16 --updates 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("COMTRADE_GEN_CACHE_MB", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QEventLoop, Qt, QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication, QMainWindow  # noqa: E402
+
+from render_scheduler import default_scheduler  # noqa: E402
+from signal_model import Signal, SignalChange  # noqa: E402
+from signal_types import default_params, load_signal_types  # noqa: E402
+
+
+def _wait(seconds: float) -> None:
+    """Крутит цикл событий заданное время (таймеры кадров успевают сработать)."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--views", type=int, default=16)
+    # Каждая перерисовка pyqtgraph теряет ссылку на None в PySide6 6.12
+    # (QObject.property), поэтому сотни перерисовок подряд роняют процесс
+    parser.add_argument("--updates", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--rate", type=int, default=4000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    from plot_view import PlotView
+    from qt_adapter import QtSignalLibrary
+    from signal_library import SignalLibrary
+    from widgets.signal_list_model import SignalListModel
+
+    window = QMainWindow()
+    library = SignalLibrary()
+    qt_library = QtSignalLibrary(library, window)
+    model = SignalListModel(qt_library, window)
+    views = [PlotView(f"График {i + 1}", window, qt_library, model) for i in range(args.views)]
+    for view in views:
+        window.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, view)
+    # Вторая половина окон — неактивные вкладки первой
+    half = args.views // 2
+    for view in views[half + 1:]:
+        window.tabifyDockWidget(views[half], view)
+    views[half].raise_()
+    window.resize(1600, 1000)
+    window.show()
+
+    config = load_signal_types()[0]
+    params = default_params(config)
+    signal = Signal(params, config["equation"], args.seconds, args.rate)
+    library.add_signal(signal)
+    for view in views:
+        view.signal_list.set_checked(signal, True)
+    _wait(0.2)
+
+    def burst() -> None:
+        for i in range(args.updates):
+            signal.update(dict(params, amplitude=1.0 + i % 7 * 0.1), signal.equation)
+            app.processEvents()
+
+    start = time.perf_counter()
+    for i in range(args.updates):
+        signal.update(dict(params, amplitude=1.0 + i % 7 * 0.1), signal.equation)
+        for view in views:
+            view.update_displayed_signal(signal, SignalChange.DATA)
+        app.processEvents()
+    immediate = time.perf_counter() - start
+    _wait(0.1)
+
+    scheduler = default_scheduler()
+    before = scheduler.info()
+    start = time.perf_counter()
+    burst()
+    _wait(0.05)
+    scheduled = time.perf_counter() - start
+    info = scheduler.info()
+
+    print(f"{args.views} окон (видно {half + 1}), {args.updates} обновлений по {int(args.seconds * args.rate)} отсчётов")
+    print(f"сразу во всех окнах: {immediate:.3f} с ({args.views * args.updates} перерисовок)")
+    print(f"через планировщик: {scheduled:.3f} с (кадров {info['frames'] - before['frames']}, "
+          f"перерисовок {info['renders'] - before['renders']}, "
+          f"объединено {info['merged'] - before['merged']}, отложено {info['deferred']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Бенчмарк передискретизации: многофазный фильтр против повторной генерации.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_resampling.py --seconds 10 --rates 1000 4800 20000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Генерация измеряется без постоянного кэша сигналов
+os.environ.setdefault("COMTRADE_GEN_CACHE_MB", "0")
+
+import signal_generator  # noqa: E402
+from resampling import design_filter, rate_ratio, resample  # noqa: E402
+from signal_types import find_signal_type, load_signal_types, default_params  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--type", default="Синус")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--source-rate", type=int, default=4000)
+    parser.add_argument("--rates", type=int, nargs="+", default=[1000, 4800, 20000])
+    args = parser.parse_args()
+
+    config = find_signal_type(load_signal_types(), args.type)
+    if config is None:
+        parser.error(f"Неизвестный тип сигнала: {args.type}")
+    params, equation = default_params(config), config.get("equation", "0")
+    _, y = signal_generator.generate_signal_data(params, equation, args.seconds, args.source_rate)
+
+    for rate in args.rates:
+        design_filter.cache_clear()
+        start = time.perf_counter()
+        resample(y, args.source_rate, rate)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        values = resample(y, args.source_rate, rate)
+        warm = time.perf_counter() - start
+        start = time.perf_counter()
+        _, reference = signal_generator.generate_signal_data(params, equation, args.seconds, rate)
+        regenerate = time.perf_counter() - start
+
+        n = min(len(values), len(reference))
+        # Края записи искажены переходным процессом фильтра
+        edge = n // 100
+        error = np.abs(values[edge:n - edge] - reference[edge:n - edge]).max()
+        up, down = rate_ratio(args.source_rate, rate)
+        print(
+            f"{args.source_rate} -> {rate} Гц ({up}/{down}): "
+            f"с проектом фильтра {cold * 1e3:.1f} мс, из кэша {warm * 1e3:.1f} мс, "
+            f"генерация {regenerate * 1e3:.1f} мс, расхождение {error:.3g}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Бенчмарк анализа: перебор окон в Python против рекурсивного ДПФ и матричного спектра.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_signal_analysis.py --seconds 10 --rate 4000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signal_analysis import harmonic_spectrum, samples_per_cycle, sliding_phasor  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=4000)
+    parser.add_argument("--frequency", type=float, default=50.0)
+    args = parser.parse_args()
+
+    t = np.arange(int(args.seconds * args.rate)) / args.rate
+    y = 100 * np.cos(2 * np.pi * args.frequency * t + 0.3) + 10 * np.cos(2 * np.pi * 5 * args.frequency * t)
+    n = samples_per_cycle(args.rate, args.frequency)
+    kernel = np.exp(-2j * np.pi * args.frequency / args.rate * np.arange(n)) * (2.0 / n)
+
+    start = time.perf_counter()
+    loop = np.array([
+        np.dot(y[i:i + n], kernel) * np.exp(-2j * np.pi * args.frequency / args.rate * i)
+        for i in range(len(y) - n + 1)
+    ])
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    phasors = sliding_phasor(y, args.rate, args.frequency)
+    phasor_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, spectrum = harmonic_spectrum(y, args.rate, args.frequency)
+    spectrum_time = time.perf_counter() - start
+
+    print(f"{len(y)} отсчётов, окно {n}")
+    print(f"по окнам: {loop_time:.3f} с, рекурсивно: {phasor_time:.4f} с "
+          f"(ускорение {loop_time / phasor_time:.0f}x), расхождение {np.abs(loop - phasors).max():.3g}")
+    print(f"спектр {spectrum.shape[1]} гармоник по {spectrum.shape[0]} периодам: {spectrum_time:.4f} с")
+
+
+if __name__ == "__main__":
+    main()
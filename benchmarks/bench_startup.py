@@ -0,0 +1,103 @@
+"""Бенчмарк запуска: время импорта модулей и время до появления первого окна.
+
+Каждое измерение выполняется в отдельном процессе («холодный» импорт).
+Результаты сравниваются с бюджетом из startup_budget.json; при превышении
+скрипт завершается с кодом 1.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Модули ядра не должны тянуть за собой Qt
+QT_FREE_MODULES = ("signal_generator", "signal_model", "signal_library", "batch_generate")
+
+_IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+qt = any(name.startswith(("PySide6", "pyqtgraph")) for name in sys.modules)
+print(elapsed, int(qt))
+"""
+
+_WINDOW_SNIPPET = """
+import time
+start = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+app = QApplication([])
+from main_window import MainWindow
+window = MainWindow()
+window.show()
+times = {"window": time.perf_counter() - start}
+
+def wait_for_plot():
+    if window.plot_views:
+        times["plot"] = time.perf_counter() - start
+        app.quit()
+    else:
+        QTimer.singleShot(1, wait_for_plot)
+
+QTimer.singleShot(0, wait_for_plot)
+app.exec()
+print(times["window"], times["plot"])
+"""
+
+
+def _run(snippet: str) -> List[float]:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return [float(value) for value in output[-2:]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, "r", encoding="utf-8") as f:
+        budget = json.load(f)
+    failures = 0
+
+    for module, limit in budget["import_seconds"].items():
+        runs = [_run(_IMPORT_SNIPPET.format(module=module)) for _ in range(args.repeat)]
+        best = min(elapsed for elapsed, _ in runs)
+        uses_qt = bool(runs[0][1])
+        status = "OK" if best <= limit else "ПРЕВЫШЕН"
+        if best > limit:
+            failures += 1
+        if module in QT_FREE_MODULES and uses_qt:
+            failures += 1
+            status += ", импортирует Qt!"
+        print(f"import {module:<18} {best * 1000:8.1f} мс (бюджет {limit * 1000:.0f} мс) {status}")
+
+    runs = [_run(_WINDOW_SNIPPET) for _ in range(args.repeat)]
+    for label, key, value in (
+        ("первое окно", "first_window_seconds", min(r[0] for r in runs)),
+        ("первый график", "first_plot_seconds", min(r[1] for r in runs)),
+    ):
+        limit = budget[key]
+        status = "OK" if value <= limit else "ПРЕВЫШЕН"
+        if value > limit:
+            failures += 1
+        print(f"{label:<25} {value * 1000:8.1f} мс (бюджет {limit * 1000:.0f} мс) {status}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
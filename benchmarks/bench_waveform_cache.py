@@ -0,0 +1,64 @@
+"""Бенчмарк постоянного кэша сигналов: расчёт, первый запуск (запись) и повторный (чтение).
+
+Запуск из корня репозитория:
+    python benchmarks/bench_waveform_cache.py --signals 32 --seconds 20 --rate 50000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signal_generator  # noqa: E402
+import waveform_cache  # noqa: E402
+from signal_types import default_params, load_signal_types  # noqa: E402
+
+
+def _generate_all(scenario, seconds: float, rate: int) -> float:
+    start = time.perf_counter()
+    for params, equation in scenario:
+        _, y = signal_generator.generate_signal_data(params, equation, seconds, rate)
+        # Обращение ко всем отсчётам, как при экспорте
+        float(np.sum(y))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--rate", type=int, default=50000)
+    args = parser.parse_args()
+
+    configs = load_signal_types()
+    scenario = []
+    for i in range(args.signals):
+        config = configs[i % len(configs)]
+        params = default_params(config)
+        params["name"] = f"{config['name']} {i}"
+        params["phase"] = float(i)
+        scenario.append((params, config.get("equation", "0")))
+
+    with tempfile.TemporaryDirectory(prefix="bench-cache-") as directory:
+        waveform_cache.configure_default_cache(max_bytes=0)
+        compute = _generate_all(scenario, args.seconds, args.rate)
+        cache = waveform_cache.configure_default_cache(directory)
+        cold = _generate_all(scenario, args.seconds, args.rate)
+        warm = _generate_all(scenario, args.seconds, args.rate)
+        info = cache.info()
+
+    print(f"{args.signals} сигналов x {int(args.seconds * args.rate)} отсчётов")
+    print(f"без кэша: {compute:.3f} с, первый запуск: {cold:.3f} с, повторный: {warm:.3f} с "
+          f"(ускорение {compute / warm:.1f}x)")
+    print(f"попаданий {info['hits']}, промахов {info['misses']}, "
+          f"записей {info['writes']}, объём {info['bytes'] / 2**20:.1f} МиБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Набор бенчмарков горячих путей: генерация, обновление сигнала, график, экспорт.
+
+Перебирает частоты дискретизации, длительности, число каналов и встроенные
+типы сигналов. Для каждого случая записывает лучшее время, отсчёты в
+секунду и пиковый объём памяти (tracemalloc) в JSON-файл результатов и
+сравнивает их с базовой линией: если время или память выросли больше чем
+на порог, скрипт завершается с кодом 1. Qt запускается без экрана
+(платформа offscreen).
+
+Запуск из корня репозитория:
+    python benchmarks/run_benchmarks.py --threshold 0.25
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Генерация измеряется без постоянного кэша сигналов (см. bench_waveform_cache.py)
+os.environ.setdefault("COMTRADE_GEN_CACHE_MB", "0")
+
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signal_generator  # noqa: E402
+from comtrade_writer import DATA_FORMATS, write_comtrade  # noqa: E402
+from signal_model import Signal, SignalChange  # noqa: E402
+from signal_types import default_params, load_signal_types  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+GROUPS = ("generate", "update", "plot", "export")
+# Рост меньше этих значений не считается регрессией (шум коротких замеров)
+TIME_SLACK_SECONDS: float = 0.001
+MEMORY_SLACK_MB: float = 1.0
+
+# Подготовка -> измеряемое действие; подготовка в замер не входит
+Case = Tuple[str, int, Callable[[], Callable[[], Any]]]
+
+
+def _with_amplitude(params: Dict[str, Any], i: int) -> Dict[str, Any]:
+    # Разные параметры на каждом повторе, чтобы не мерить кэши
+    params = dict(params)
+    params["amplitude"] = 1.0 + (i % 7) * 0.1
+    return params
+
+
+def _generate_cases(configs: List[Dict[str, Any]], rates: List[int], durations: List[float]) -> Iterator[Case]:
+    for config in configs:
+        params = default_params(config)
+        for rate in rates:
+            for duration in durations:
+                def setup(params=params, equation=config["equation"], rate=rate, duration=duration):
+                    return lambda: signal_generator.generate_signal_data(params, equation, duration, rate)
+                yield f"generate/{config['name']}/{rate}Hz/{duration:g}s", int(rate * duration), setup
+
+
+def _update_cases(configs: List[Dict[str, Any]], rates: List[int], durations: List[float]) -> Iterator[Case]:
+    for config in configs:
+        params = default_params(config)
+        for rate in rates:
+            for duration in durations:
+                signal = Signal(params, config["equation"], duration, rate)
+                counter = iter(range(1 << 30))
+
+                def setup(signal=signal, params=params, equation=config["equation"], counter=counter):
+                    new_params = _with_amplitude(params, next(counter))
+                    return lambda: signal.update(new_params, equation)
+                yield f"update/{config['name']}/{rate}Hz/{duration:g}s", int(rate * duration), setup
+
+
+def _plot_cases(configs: List[Dict[str, Any]], rates: List[int], durations: List[float]) -> Iterator[Case]:
+    from PySide6.QtWidgets import QApplication
+    from plot_view import PlotView
+    from qt_adapter import QtSignalLibrary
+    from signal_library import SignalLibrary
+    from widgets.signal_list_model import SignalListModel
+
+    app = QApplication.instance() or QApplication([])
+    library = SignalLibrary()
+    qt_library = QtSignalLibrary(library)
+    model = SignalListModel(qt_library)
+    view = PlotView("Бенчмарк", None, qt_library, model)
+    view.resize(1200, 600)
+    view.show()
+
+    config = configs[0]
+    params = default_params(config)
+    for rate in rates:
+        for duration in durations:
+            signal = Signal(params, config["equation"], duration, rate)
+            library.add_signal(signal)
+            view.signal_list.set_checked(signal, True)
+            app.processEvents()
+            counter = iter(range(1 << 30))
+
+            def setup(signal=signal, counter=counter):
+                t, y = signal_generator.generate_signal_data(
+                    _with_amplitude(params, next(counter)), config["equation"], signal.duration, signal.sampling_rate
+                )
+                signal.set_data(signal.params, signal.equation, t, y)
+                view.pending_changes.clear()
+
+                def run() -> None:
+                    view.update_displayed_signal(signal, SignalChange.DATA)
+                    # Отложенная выборка видимого уровня огибающей и перерисовка
+                    app.processEvents()
+                return run
+            yield f"plot/{rate}Hz/{duration:g}s", int(rate * duration), setup
+
+
+def _export_cases(configs: List[Dict[str, Any]], channels: List[int], rate: int, duration: float) -> Iterator[Case]:
+    tmp = tempfile.mkdtemp(prefix="comtrade-bench-")
+    for count in channels:
+        signals = []
+        for i in range(count):
+            config = configs[i % len(configs)]
+            params = default_params(config)
+            params["name"] = f"ch{i + 1}"
+            signals.append(Signal(params, config["equation"], duration, rate))
+        for data_format in DATA_FORMATS:
+            def setup(signals=signals, data_format=data_format, count=count):
+                path = os.path.join(tmp, f"bench_{data_format}_{count}")
+                return lambda: write_comtrade(path, signals, rate, data_format)
+            yield f"export/{data_format}/{count}ch/{rate}Hz/{duration:g}s", int(rate * duration) * count, setup
+
+
+def _measure(setup: Callable[[], Callable[[], Any]], repeat: int) -> Tuple[float, float]:
+    """Возвращает (лучшее время, с; пик памяти, МБ)."""
+    best = float("inf")
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    run = setup()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Возвращает описания регрессий относительно базовой линии."""
+    regressions = []
+    for case, base in baseline.items():
+        current = results.get(case)
+        if current is None:
+            continue
+        if current["seconds"] > base["seconds"] * (1.0 + threshold) + TIME_SLACK_SECONDS:
+            regressions.append(
+                f"{case}: время {base['seconds'] * 1000:.2f} -> {current['seconds'] * 1000:.2f} мс"
+            )
+        if current["peak_mb"] > base["peak_mb"] * (1.0 + threshold) + MEMORY_SLACK_MB:
+            regressions.append(f"{case}: память {base['peak_mb']:.1f} -> {current['peak_mb']:.1f} МБ")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[4000, 50000])
+    parser.add_argument("--durations", type=float, nargs="+", default=[2.0, 20.0])
+    parser.add_argument("--channels", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--types", nargs="+", help="имена типов сигналов (по умолчанию все)")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=RESULTS_PATH, help="файл результатов JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="файл базовой линии JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="допустимый относительный рост времени и памяти (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="записать результаты как базовую линию")
+    args = parser.parse_args(argv)
+
+    configs = load_signal_types()
+    if args.types:
+        configs = [c for c in configs if c["name"] in args.types]
+        if not configs:
+            parser.error("не найдено ни одного из указанных типов сигналов")
+
+    sources: List[Iterator[Case]] = []
+    if "generate" in args.groups:
+        sources.append(_generate_cases(configs, args.rates, args.durations))
+    if "update" in args.groups:
+        sources.append(_update_cases(configs, args.rates, args.durations))
+    if "plot" in args.groups:
+        sources.append(_plot_cases(configs, args.rates, args.durations))
+    if "export" in args.groups:
+        sources.append(_export_cases(configs, args.channels, args.rates[0], args.durations[-1]))
+
+    results: Dict[str, Dict[str, float]] = {}
+    for cases in sources:
+        for case, samples, setup in cases:
+            seconds, peak_mb = _measure(setup, args.repeat)
+            results[case] = {
+                "seconds": seconds,
+                "samples_per_second": samples / seconds if seconds > 0 else float("inf"),
+                "peak_mb": peak_mb,
+            }
+            print(f"{case:<48} {seconds * 1000:9.2f} мс {samples / seconds / 1e6:9.1f} Мотсч/с {peak_mb:8.1f} МБ")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    target = args.baseline if args.update_baseline else args.output
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {target}")
+    if args.update_baseline:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Базовая линия не найдена, сравнение пропущено")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"РЕГРЕССИЯ {line}")
+    print(f"Сравнено случаев: {len(set(results) & set(baseline))}, регрессий: {len(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
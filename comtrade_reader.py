@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import itertools
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
+
+import signal_generator
+from comtrade_writer import DATA_FORMATS, _SAMPLE_DTYPES
+from signal_model import Signal
+from waveform_store import ScaledView
+
+# Тип сигнала, которым помечаются каналы, загруженные из файла
+IMPORTED_SIGNAL_TYPE: str = "COMTRADE"
+# Строк текстового .dat, разбираемых за один шаг
+ASCII_CHUNK_LINES: int = 65536
+
+
+def _read_cfg_lines(path: str) -> List[List[str]]:
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    return [[field.strip() for field in line.split(",")] for line in text.splitlines() if line.strip()]
+
+
+def _parse_time(fields: List[str]) -> Optional[datetime]:
+    """Разбирает дату «dd/mm/yyyy,hh:mm:ss.ssssss» (возможна и mm/dd/yy из 1991)."""
+    text = ",".join(fields[:2])
+    for fmt in ("%d/%m/%Y,%H:%M:%S.%f", "%m/%d/%y,%H:%M:%S.%f", "%d/%m/%Y,%H:%M:%S"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _float(fields: List[str], index: int, default: float = 0.0) -> float:
+    try:
+        return float(fields[index])
+    except (IndexError, ValueError):
+        return default
+
+
+class AnalogChannel:
+    """Аналоговый канал записи: описание из .cfg и ленивое масштабирование.
+
+    Отсчёты не копируются при открытии: `raw` — представление поверх
+    отображённого в память файла. Индексирование (`channel[i0:i1]`)
+    масштабирует (a * x + b) только запрошенный срез, поэтому с диска
+    читаются лишь затронутые страницы; np.asarray(channel) даёт весь канал.
+
+    Значения всегда приводятся к первичным величинам: канал, записанный во
+    вторичных (ps = "S"), дополнительно умножается на primary / secondary.
+    """
+
+    __slots__ = ("index", "name", "phase", "circuit", "unit", "a", "b", "skew",
+                 "min", "max", "primary", "secondary", "ps", "_raw")
+
+    def __init__(self, fields: List[str], raw: NDArray[Any]) -> None:
+        self.index: int = int(fields[0])
+        self.name: str = fields[1]
+        self.phase: str = fields[2] if len(fields) > 2 else ""
+        self.circuit: str = fields[3] if len(fields) > 3 else ""
+        self.unit: str = fields[4] if len(fields) > 4 else ""
+        self.a: float = _float(fields, 5, 1.0)
+        self.b: float = _float(fields, 6)
+        self.skew: float = _float(fields, 7)
+        self.min: float = _float(fields, 8)
+        self.max: float = _float(fields, 9)
+        self.primary: float = _float(fields, 10, 1.0)
+        self.secondary: float = _float(fields, 11, 1.0)
+        self.ps: str = fields[12].upper() if len(fields) > 12 else "P"
+        self._raw: NDArray[Any] = raw
+
+    @property
+    def raw(self) -> NDArray[Any]:
+        """Отсчёты в единицах файла (без масштабирования, без копии)."""
+        return self._raw
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    @property
+    def ratio(self) -> float:
+        """Коэффициент приведения к первичным величинам (1 для ps = "P")."""
+        if self.ps == "S" and self.primary > 0 and self.secondary > 0:
+            return self.primary / self.secondary
+        return 1.0
+
+    def view(self) -> ScaledView:
+        """Масштабируемое при обращении представление канала в первичных величинах (без чтения файла)."""
+        ratio = self.ratio
+        return ScaledView(self._raw, self.a * ratio, self.b * ratio)
+
+    def __getitem__(self, key: Any) -> NDArray[np.float64]:
+        return self.view()[key]
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> NDArray[Any]:
+        values = self[:]
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+
+class ComtradeRecord:
+    """Открытая запись COMTRADE (.cfg + .dat) с каналами без загрузки файла.
+
+    Двоичные форматы (BINARY, BINARY32, FLOAT32) отображаются в память как
+    структурированный массив numpy, поэтому открытие занимает почти
+    постоянное время независимо от размера файла. ASCII разбирается
+    кусками по ASCII_CHUNK_LINES строк; пустые поля (пропущенные значения)
+    читаются как NaN.
+    """
+
+    def __init__(self, cfg_path: str, dat_path: Optional[str] = None) -> None:
+        base, _ = os.path.splitext(cfg_path)
+        self.cfg_path: str = cfg_path
+        self.dat_path: str = dat_path or self._find_dat(base)
+        lines = _read_cfg_lines(self.cfg_path)
+        try:
+            self._parse(lines)
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Неверный файл конфигурации COMTRADE {self.cfg_path}: {e}") from e
+        self._time: Optional[NDArray[np.float64]] = None
+
+    @staticmethod
+    def _find_dat(base: str) -> str:
+        for ext in (".dat", ".DAT"):
+            if os.path.exists(base + ext):
+                return base + ext
+        raise FileNotFoundError(f"Не найден файл данных {base}.dat")
+
+    def _parse(self, lines: List[List[str]]) -> None:
+        header = lines[0]
+        self.station_name: str = header[0]
+        self.rec_dev_id: str = header[1] if len(header) > 1 else ""
+        self.revision: str = header[2] if len(header) > 2 and header[2] else "1991"
+
+        counts = lines[1]
+        n_analog = int(counts[1].rstrip("Aa"))
+        n_digital = int(counts[2].rstrip("Dd"))
+        analog_lines = lines[2:2 + n_analog]
+        digital_lines = lines[2 + n_analog:2 + n_analog + n_digital]
+        self.digital_names: List[str] = [fields[1] for fields in digital_lines]
+
+        pos = 2 + n_analog + n_digital
+        self.line_frequency: float = _float(lines[pos], 0)
+        nrates = int(lines[pos + 1][0])
+        pos += 2
+        # (частота дискретизации, номер последнего отсчёта участка)
+        self.rates: List[Tuple[float, int]] = []
+        for fields in lines[pos:pos + max(nrates, 1)]:
+            self.rates.append((float(fields[0]), int(float(fields[1]))))
+        pos += max(nrates, 1)
+        self.start_time: Optional[datetime] = _parse_time(lines[pos])
+        self.trigger_time: Optional[datetime] = _parse_time(lines[pos + 1])
+        self.data_format: str = lines[pos + 2][0].upper()
+        if self.data_format not in DATA_FORMATS:
+            raise ValueError(f"неподдерживаемый формат данных {self.data_format}")
+        self.timemult: float = _float(lines[pos + 3], 0, 1.0) if len(lines) > pos + 3 else 1.0
+
+        self._records = self._load_records(n_analog, n_digital)
+        if self.data_format == "ASCII":
+            raws = [self._records[:, 2 + i] for i in range(n_analog)]
+        else:
+            analog = self._records["analog"]
+            raws = [analog[:, i] for i in range(n_analog)]
+        self.analog: List[AnalogChannel] = [AnalogChannel(fields, raw) for fields, raw in zip(analog_lines, raws)]
+        self.n_samples: int = len(self._records)
+
+    def _load_records(self, n_analog: int, n_digital: int) -> NDArray[Any]:
+        n_words = -(-n_digital // 16)
+        if self.data_format == "ASCII":
+            columns = 2 + n_analog + n_digital
+            chunks: List[NDArray[np.float64]] = []
+            with open(self.dat_path, "r", encoding="ascii", errors="replace") as f:
+                while True:
+                    lines = list(itertools.islice(f, ASCII_CHUNK_LINES))
+                    if not lines:
+                        break
+                    lines = [line for line in lines if line.strip(" \t\r\n\x1a")]
+                    if lines:
+                        chunks.append(self._parse_ascii_lines(lines, columns))
+            if not chunks:
+                return np.zeros((0, columns))
+            return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+        record_dtype = np.dtype([
+            ("sample", "<u4"),
+            ("timestamp", "<u4"),
+            ("analog", _SAMPLE_DTYPES[self.data_format], (n_analog,)),
+            ("digital", "<u2", (n_words,)),
+        ])
+        size = os.path.getsize(self.dat_path)
+        count = size // record_dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=record_dtype)
+        return np.memmap(self.dat_path, dtype=record_dtype, mode="r", shape=(count,))
+
+    @staticmethod
+    def _parse_ascii_lines(lines: List[str], columns: int) -> NDArray[np.float64]:
+        # Запятая в конце строки не считается лишним столбцом
+        found = len(lines[0].rstrip(" \t\r\n,").split(","))
+        if found != columns:
+            raise ValueError(f"в строках .dat {found} столбцов, ожидается {columns}")
+        usecols = range(columns)
+        try:
+            return np.loadtxt(lines, delimiter=",", dtype=np.float64, usecols=usecols, ndmin=2)
+        except ValueError:
+            # Пустые поля допускаются стандартом: медленный разбор только для такого куска
+            return np.genfromtxt(
+                lines, delimiter=",", dtype=np.float64, usecols=usecols, filling_values=np.nan, ndmin=2
+            )
+
+    @property
+    def timestamps(self) -> NDArray[np.float64]:
+        """Метки времени отсчётов из файла, с."""
+        if self.data_format == "ASCII":
+            stamps = self._records[:, 1]
+        else:
+            stamps = self._records["timestamp"]
+        return stamps * (self.timemult * 1e-6)
+
+    @property
+    def time(self) -> NDArray[np.float64]:
+        """Время отсчётов, с: по частотам участков, а при частоте 0 — по меткам."""
+        if self._time is None:
+            if len(self.rates) == 1 and self.rates[0][0] > 0:
+                # Равномерная запись: общий с генерируемыми сигналами массив времени
+                rate = self.rates[0][0]
+                t = signal_generator.get_time_base(self.n_samples / rate, int(rate))
+                if len(t) == self.n_samples and rate == int(rate):
+                    self._time = t
+                    return t
+            if not self.rates or self.rates[0][0] <= 0:
+                self._time = np.asarray(self.timestamps, dtype=np.float64)
+            else:
+                t = np.empty(self.n_samples, dtype=np.float64)
+                start_index, start_time = 0, 0.0
+                for rate, end_sample in self.rates:
+                    end = min(end_sample, self.n_samples)
+                    if end <= start_index:
+                        continue
+                    t[start_index:end] = start_time + np.arange(end - start_index) / rate
+                    start_time += (end - start_index) / rate
+                    start_index = end
+                if start_index < self.n_samples:
+                    rate = self.rates[-1][0]
+                    t[start_index:] = start_time + np.arange(self.n_samples - start_index) / rate
+                self._time = t
+        return self._time
+
+    @property
+    def uniform(self) -> bool:
+        """Равномерна ли дискретизация (одна частота, а не метки времени или участки)."""
+        return len(self.rates) == 1 and self.rates[0][0] > 0
+
+    @property
+    def duration(self) -> float:
+        """Длительность записи, с: число отсчётов на шаг дискретизации, включая последний."""
+        if self.n_samples == 0:
+            return 0.0
+        if self.uniform:
+            return self.n_samples / self.rates[0][0]
+        t = self.time
+        if self.rates and self.rates[-1][0] > 0:
+            step = 1.0 / self.rates[-1][0]
+        else:
+            step = float(t[-1] - t[-2]) if self.n_samples > 1 else 0.0
+        return float(t[-1] - t[0]) + step
+
+    def channel(self, key: Union[int, str]) -> AnalogChannel:
+        """Возвращает аналоговый канал по позиции (с 0) или по имени."""
+        if isinstance(key, int):
+            return self.analog[key]
+        for channel in self.analog:
+            if channel.name == key:
+                return channel
+        raise KeyError(key)
+
+    def digital(self, index: int) -> NDArray[np.uint8]:
+        """Возвращает значения дискретного канала (0/1) по позиции (с 0)."""
+        if self.data_format == "ASCII":
+            return np.nan_to_num(self._records[:, 2 + len(self.analog) + index]).astype(np.uint8)
+        words = self._records["digital"][:, index // 16]
+        return ((words >> (index % 16)) & 1).astype(np.uint8)
+
+    def to_signals(self, channels: Optional[Sequence[Union[int, str]]] = None) -> List[Signal]:
+        """Создаёт сигналы библиотеки из каналов (по умолчанию — из всех).
+
+        Каналы передаются в хранилище отсчётов (waveform_store) как
+        ScaledView поверх отображённого файла: страницы читаются и
+        масштабируются, только когда к ним обращаются графики или экспорт.
+        Неравномерные записи получают частоту 0 и в экспорт не попадают
+        (см. comtrade_writer.write_comtrade).
+        """
+        selected = self.analog if channels is None else [self.channel(key) for key in channels]
+        # Частота 0 — отсчёты неравномерны (по меткам времени или несколько участков)
+        rate = self.rates[0][0] if self.uniform else 0.0
+        duration = self.duration
+        signals: List[Signal] = []
+        for channel in selected:
+            params: Dict[str, Any] = {
+                "name": channel.name,
+                "type": IMPORTED_SIGNAL_TYPE,
+                "unit": channel.unit,
+                "source": self.cfg_path,
+            }
+            signal = Signal(params, "0", duration, int(rate), generate=False)
+            signal.set_data(params, "0", self.time, channel.view())
+            signal.regenerable = False
+            signals.append(signal)
+        return signals
+
+    def close(self) -> None:
+        """Отпускает отображение файла данных; оно закроется, когда исчезнут
+        последние ссылки на срезы каналов."""
+        self._records = np.zeros(0)
+        self.analog = []
+
+
+def open_comtrade(path: str) -> ComtradeRecord:
+    """Открывает запись COMTRADE по пути к .cfg (или .dat, или без расширения)."""
+    base, ext = os.path.splitext(path)
+    if ext.lower() not in (".cfg", ".dat"):
+        base = path
+    for cfg_ext in (".cfg", ".CFG"):
+        if os.path.exists(base + cfg_ext):
+            return ComtradeRecord(base + cfg_ext)
+    raise FileNotFoundError(f"Не найден файл конфигурации {base}.cfg")
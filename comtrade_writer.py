@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import math
+import os
+from datetime import datetime
+from typing import IO, Any, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+from resampling import resample
+from waveform_store import ScaledView
+
+# Поддерживаемые форматы файла данных (IEEE C37.111-2013)
+DATA_FORMATS: Tuple[str, ...] = ("ASCII", "BINARY", "BINARY32", "FLOAT32")
+
+# Предельные значения целочисленных отсчётов для каждого формата
+_QUANT_LIMITS = {
+    "ASCII": 99999,
+    "BINARY": 32767,
+    "BINARY32": 2**31 - 1,
+}
+
+# Тип одного аналогового отсчёта в двоичных форматах
+_SAMPLE_DTYPES = {
+    "BINARY": np.dtype("<i2"),
+    "BINARY32": np.dtype("<i4"),
+    "FLOAT32": np.dtype("<f4"),
+}
+
+# Число отсчётов, записываемых за один вызов write()
+DEFAULT_BLOCK_SIZE: int = 65536
+# Число значений, форматируемых за один шаг в текстовом формате (ограничивает память)
+ASCII_CHUNK_VALUES: int = 65536
+
+# Максимальное значение метки времени (uint32, 0xFFFFFFFF зарезервировано)
+_MAX_TIMESTAMP: int = 2**32 - 2
+
+
+def compute_scaling(
+    mins: NDArray[np.floating],
+    maxs: NDArray[np.floating],
+    data_format: str,
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Вычисляет коэффициенты a, b (value = a * x + b) сразу для всех каналов.
+
+    Для целочисленных форматов диапазон [min, max] каждого канала отображается
+    на симметричный диапазон отсчётов формата. Для FLOAT32 масштабирование
+    не требуется: a = 1, b = 0.
+    """
+    data_format = _check_format(data_format)
+    mins = np.asarray(mins, dtype=np.float64)
+    maxs = np.asarray(maxs, dtype=np.float64)
+    if data_format == "FLOAT32":
+        return np.ones_like(mins), np.zeros_like(mins)
+
+    limit = _QUANT_LIMITS[data_format]
+    b = (maxs + mins) / 2.0
+    a = (maxs - mins) / (2.0 * limit)
+    # Постоянный канал: любой ненулевой шаг, отсчёты будут нулевыми
+    a[~(a > 0)] = 1.0
+    return a, b
+
+
+def quantize(
+    values: NDArray[np.floating],
+    a: NDArray[np.float64],
+    b: NDArray[np.float64],
+    data_format: str,
+    out: Optional[NDArray[Any]] = None,
+) -> NDArray[Any]:
+    """Переводит блок значений формы (каналы, отсчёты) в отсчёты формата."""
+    data_format = _check_format(data_format)
+    if data_format == "FLOAT32":
+        if out is None:
+            return values.astype(np.float32)
+        np.copyto(out, values, casting="unsafe")
+        return out
+
+    limit = _QUANT_LIMITS[data_format]
+    raw = (values - b[:, None]) / a[:, None]
+    np.rint(raw, out=raw)
+    np.clip(raw, -limit, limit, out=raw)
+    if out is None:
+        return raw.astype(_SAMPLE_DTYPES.get(data_format, np.int64))
+    np.copyto(out, raw, casting="unsafe")
+    return out
+
+
+def _check_format(data_format: str) -> str:
+    data_format = data_format.upper()
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Неподдерживаемый формат данных COMTRADE: {data_format}")
+    return data_format
+
+
+def _clean_field(value: str) -> str:
+    """Убирает из текстового поля .cfg запятые и переводы строк."""
+    return str(value).replace(",", " ").replace("\n", " ").replace("\r", " ")[:64]
+
+
+def _format_number(value: float) -> str:
+    return f"{value:.9g}"
+
+
+def _format_time(moment: datetime) -> str:
+    return moment.strftime("%d/%m/%Y,%H:%M:%S.%f")
+
+
+class ComtradeWriter:
+    """Потоковая запись аналоговых каналов в пару файлов .cfg/.dat.
+
+    Отсчёты передаются блоками формы (каналы, отсчёты) через write_block();
+    .cfg записывается при закрытии, когда известно число отсчётов.
+    Для целочисленных форматов диапазоны каналов (`ranges`) нужно знать заранее.
+
+    Блок можно записать со своей частотой дискретизации: подряд идущие блоки
+    одной частоты образуют участок, и в .cfg попадает по строке на участок
+    (nrates), а метки времени продолжаются через границы участков.
+
+    Если запись прервана исключением внутри блока with, недописанный .dat
+    удаляется, а .cfg не создаётся (см. abort()).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        channel_names: Sequence[str],
+        sampling_rate: float,
+        data_format: str = "BINARY",
+        ranges: Optional[Tuple[Sequence[float], Sequence[float]]] = None,
+        units: Optional[Sequence[str]] = None,
+        station_name: str = "",
+        rec_dev_id: str = "",
+        line_frequency: float = 50.0,
+        start_time: Optional[datetime] = None,
+        expected_samples: Optional[int] = None,
+    ) -> None:
+        self.data_format: str = _check_format(data_format)
+        self.channel_names: List[str] = [_clean_field(name) for name in channel_names]
+        self.units: List[str] = [_clean_field(u) for u in (units or [""] * len(channel_names))]
+        if len(self.units) != len(self.channel_names):
+            raise ValueError("Число единиц измерения не совпадает с числом каналов")
+        self.sampling_rate: float = float(sampling_rate)
+        self.station_name: str = _clean_field(station_name)
+        self.rec_dev_id: str = _clean_field(rec_dev_id)
+        self.line_frequency: float = line_frequency
+        self.start_time: datetime = start_time or datetime.now()
+        self.samples_written: int = 0
+        # Участки записи: [частота, номер последнего отсчёта]
+        self.rates: List[List[float]] = []
+        self._section_start_index: int = 0
+        self._section_start_us: float = 0.0
+
+        n_channels = len(self.channel_names)
+        if ranges is None:
+            if self.data_format != "FLOAT32":
+                raise ValueError("Для целочисленных форматов нужно указать диапазоны каналов")
+            ranges = (np.zeros(n_channels), np.zeros(n_channels))
+        self.mins: NDArray[np.float64] = np.asarray(ranges[0], dtype=np.float64)
+        self.maxs: NDArray[np.float64] = np.asarray(ranges[1], dtype=np.float64)
+        self.a, self.b = compute_scaling(self.mins, self.maxs, self.data_format)
+
+        # Множитель меток времени подбирается так, чтобы метки поместились в uint32
+        self.timemult: float = 1.0
+        if expected_samples:
+            duration_us = expected_samples * 1e6 / self.sampling_rate
+            if duration_us > _MAX_TIMESTAMP:
+                self.timemult = math.ceil(duration_us / _MAX_TIMESTAMP)
+
+        base, _ = os.path.splitext(path)
+        self.cfg_path: str = base + ".cfg"
+        self.dat_path: str = base + ".dat"
+        self._dat: IO[Any]
+        if self.data_format == "ASCII":
+            self._dat = open(self.dat_path, "w", encoding="ascii", newline="\r\n")
+        else:
+            self._dat = open(self.dat_path, "wb")
+        self._record_buffer: Optional[NDArray[Any]] = None
+
+    def __enter__(self) -> "ComtradeWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def _records(self, count: int) -> NDArray[Any]:
+        """Возвращает переиспользуемый буфер двоичных записей на `count` отсчётов."""
+        if self._record_buffer is None or len(self._record_buffer) < count:
+            record_dtype = np.dtype([
+                ("sample", "<u4"),
+                ("timestamp", "<u4"),
+                ("analog", _SAMPLE_DTYPES[self.data_format], (len(self.channel_names),)),
+            ])
+            self._record_buffer = np.empty(count, dtype=record_dtype)
+        return self._record_buffer[:count]
+
+    def _start_section(self, sampling_rate: float) -> None:
+        if self.rates:
+            previous_rate = self.rates[-1][0]
+            self._section_start_us += (self.samples_written - self._section_start_index) * 1e6 / previous_rate
+        self._section_start_index = self.samples_written
+        self.rates.append([sampling_rate, self.samples_written])
+
+    def write_block(self, values: NDArray[np.floating], sampling_rate: Optional[float] = None) -> None:
+        """Записывает блок отсчётов формы (каналы, отсчёты).
+
+        `sampling_rate` — частота блока (по умолчанию частота записи).
+        """
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape[0] != len(self.channel_names):
+            raise ValueError("Блок должен иметь форму (число каналов, число отсчётов)")
+        count = values.shape[1]
+        if count == 0:
+            return
+        rate = self.sampling_rate if sampling_rate is None else float(sampling_rate)
+        if not self.rates or self.rates[-1][0] != rate:
+            self._start_section(rate)
+        index = np.arange(self.samples_written, self.samples_written + count, dtype=np.int64)
+        timestamps = np.rint(
+            (self._section_start_us + (index - self._section_start_index) * (1e6 / rate)) / self.timemult
+        )
+        if timestamps[-1] > _MAX_TIMESTAMP:
+            # Иначе метки молча переполнят uint32 и пойдут по кругу
+            raise ValueError(
+                "Метки времени не помещаются в 32 бита при timemult="
+                f"{_format_number(self.timemult)}: укажите expected_samples при создании записи"
+            )
+
+        if self.data_format == "ASCII":
+            # Строки форматируются кусками: память не растёт с размером блока
+            columns = 2 + values.shape[0]
+            rows = max(1, ASCII_CHUNK_VALUES // columns)
+            table = np.empty((min(rows, count), columns), dtype=np.int64)
+            row_format = ",".join(["%d"] * columns) + "\n"
+            for start in range(0, count, rows):
+                stop = min(start + rows, count)
+                chunk = table[:stop - start]
+                chunk[:, 0] = index[start:stop] + 1
+                chunk[:, 1] = timestamps[start:stop]
+                quantize(values[:, start:stop], self.a, self.b, self.data_format, out=chunk[:, 2:].T)
+                self._dat.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+        else:
+            records = self._records(count)
+            records["sample"] = index + 1
+            records["timestamp"] = timestamps
+            quantize(values, self.a, self.b, self.data_format, out=records["analog"].T)
+            records.tofile(self._dat)
+        self.samples_written += count
+        self.rates[-1][1] = self.samples_written
+
+    def close(self) -> None:
+        """Закрывает файл данных и записывает файл конфигурации."""
+        if self._dat.closed:
+            return
+        self._dat.close()
+        self._record_buffer = None
+        with open(self.cfg_path, "w", encoding="utf-8", newline="\r\n") as cfg:
+            cfg.write(self._config_text())
+
+    def abort(self) -> None:
+        """Закрывает и удаляет недописанный файл данных, не создавая .cfg."""
+        if self._dat.closed:
+            return
+        self._dat.close()
+        self._record_buffer = None
+        for path in (self.dat_path, self.cfg_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _config_text(self) -> str:
+        n_channels = len(self.channel_names)
+        lines = [
+            f"{self.station_name},{self.rec_dev_id},2013",
+            f"{n_channels},{n_channels}A,0D",
+        ]
+        if self.data_format == "FLOAT32":
+            raw_min = self.mins
+            raw_max = self.maxs
+        else:
+            limit = _QUANT_LIMITS[self.data_format]
+            raw_min = np.full(n_channels, -limit)
+            raw_max = np.full(n_channels, limit)
+        for i, name in enumerate(self.channel_names):
+            lines.append(",".join([
+                str(i + 1), name, "", "", self.units[i],
+                _format_number(self.a[i]), _format_number(self.b[i]), "0",
+                _format_number(raw_min[i]), _format_number(raw_max[i]),
+                "1", "1", "P",
+            ]))
+        rates = self.rates or [[self.sampling_rate, 0]]
+        lines += [_format_number(self.line_frequency), str(len(rates))]
+        lines += [f"{_format_number(rate)},{end}" for rate, end in rates]
+        lines += [
+            _format_time(self.start_time),
+            _format_time(self.start_time),
+            self.data_format,
+            _format_number(self.timemult),
+            "0,0",
+            "0,0",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def write_comtrade_stream(
+    path: str,
+    channel_names: Sequence[str],
+    blocks: Iterable[NDArray[np.floating]],
+    sampling_rate: float,
+    data_format: str = "BINARY",
+    **kwargs: Any,
+) -> Tuple[str, str]:
+    """Записывает COMTRADE из потока блоков формы (каналы, отсчёты).
+
+    Для записей длиннее ~71 минуты при 1 мкс на единицу метки нужно передать
+    `expected_samples`, иначе запись прервётся с ValueError и недописанные
+    файлы будут удалены. Возвращает пути к файлам .cfg и .dat.
+    """
+    with ComtradeWriter(path, channel_names, sampling_rate, data_format, **kwargs) as writer:
+        for block in blocks:
+            writer.write_block(block)
+    return writer.cfg_path, writer.dat_path
+
+
+def write_comtrade_sections(
+    path: str,
+    channel_names: Sequence[str],
+    sections: Iterable[Tuple[float, NDArray[np.floating]]],
+    sampling_rate: float,
+    data_format: str = "BINARY",
+    **kwargs: Any,
+) -> Tuple[str, str]:
+    """Записывает многочастотную запись из пар (частота, блок (каналы, отсчёты)).
+
+    `sampling_rate` — опорная частота записи (для выбора множителя меток
+    времени по `expected_samples`). Если участки переданы списком, множитель
+    подбирается по их суммарной длительности ещё до записи данных.
+    Возвращает пути к файлам .cfg и .dat.
+    """
+    if isinstance(sections, Sequence):
+        duration = sum(block.shape[1] / rate for rate, block in sections)
+        kwargs["expected_samples"] = max(
+            kwargs.get("expected_samples") or 0, math.ceil(duration * sampling_rate)
+        )
+    with ComtradeWriter(path, channel_names, sampling_rate, data_format, **kwargs) as writer:
+        for rate, block in sections:
+            writer.write_block(block, rate)
+    return writer.cfg_path, writer.dat_path
+
+
+def write_comtrade(
+    path: str,
+    signals: Sequence[Any],
+    sampling_rate: float,
+    data_format: str = "BINARY",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    **kwargs: Any,
+) -> Tuple[str, str]:
+    """Записывает сигналы (объекты с атрибутами name и y) в файлы COMTRADE.
+
+    Сигналы с другой частотой (атрибут sampling_rate) передискретизируются
+    на `sampling_rate`. После этого все сигналы должны иметь одинаковое
+    число отсчётов. Сигналы с частотой 0 (неравномерные записи) не
+    экспортируются: ValueError со списком имён. Возвращает пути к файлам
+    .cfg и .dat.
+    """
+    if not signals:
+        raise ValueError("Нет сигналов для экспорта")
+    irregular = [signal.name for signal in signals if getattr(signal, "sampling_rate", sampling_rate) <= 0]
+    if irregular:
+        raise ValueError(f"Сигналы с неравномерной дискретизацией нельзя экспортировать: {', '.join(irregular)}")
+    arrays = []
+    for signal in signals:
+        rate = getattr(signal, "sampling_rate", sampling_rate)
+        if rate != sampling_rate:
+            arrays.append(resample(signal.y, rate, sampling_rate))
+        else:
+            # Отсчёты импортированной записи читаются блоками при записи
+            arrays.append(signal.y if isinstance(signal.y, ScaledView) else np.asarray(signal.y))
+    n_samples = len(arrays[0])
+    if any(len(y) != n_samples for y in arrays):
+        raise ValueError("Все сигналы должны иметь одинаковое число отсчётов")
+
+    mins = np.array([y.min() if n_samples else 0.0 for y in arrays])
+    maxs = np.array([y.max() if n_samples else 0.0 for y in arrays])
+    block = np.empty((len(arrays), min(block_size, max(n_samples, 1))), dtype=np.float64)
+
+    def blocks() -> Iterable[NDArray[np.floating]]:
+        for start in range(0, n_samples, block_size):
+            stop = min(start + block_size, n_samples)
+            chunk = block[:, :stop - start]
+            for row, y in zip(chunk, arrays):
+                row[:] = y[start:stop]
+            yield chunk
+
+    return write_comtrade_stream(
+        path, [signal.name for signal in signals], blocks(), sampling_rate, data_format,
+        ranges=(mins, maxs), expected_samples=n_samples, **kwargs,
+    )
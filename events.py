@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, List
+
+
+class Event:
+    """Простейший механизм уведомлений без зависимости от Qt.
+
+    Повторяет интерфейс сигналов Qt (connect/disconnect/emit), поэтому
+    модель данных можно использовать в рабочих процессах и без QApplication.
+    Обработчики вызываются синхронно в потоке, вызвавшем emit().
+    """
+
+    __slots__ = ("_handlers", "_lock")
+
+    def __init__(self) -> None:
+        self._handlers: List[Callable[..., Any]] = []
+        self._lock = threading.Lock()
+
+    def connect(self, handler: Callable[..., Any]) -> None:
+        with self._lock:
+            self._handlers.append(handler)
+
+    def disconnect(self, handler: Callable[..., Any]) -> None:
+        """Отключает обработчик. Бросает TypeError, если он не был подключён."""
+        with self._lock:
+            try:
+                self._handlers.remove(handler)
+            except ValueError:
+                raise TypeError("Обработчик не подключён к событию") from None
+
+    def emit(self, *args: Any) -> None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            handler(*args)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+import profiling
+import signal_generator
+from signal_types import resolve_spec
+
+# Имя времени от начала участка, доступное в уравнениях участков
+SEGMENT_TIME: str = "segment_time"
+
+
+class Segment:
+    """Участок сценария: уравнение и параметры, действующие с момента `start`.
+
+    Уравнение видит абсолютное время `time` и время от начала участка
+    `segment_time`. При `continuous_phase` фаза участка подбирается так,
+    чтобы синусоида продолжалась без разрыва от предыдущего участка, а
+    затем к ней добавляется скачок `phase_step` (градусы).
+    """
+
+    __slots__ = ("start", "params", "equation", "continuous_phase", "phase_step")
+
+    def __init__(
+        self,
+        start: float,
+        params: Dict[str, Any],
+        equation: str,
+        continuous_phase: bool = False,
+        phase_step: float = 0.0,
+    ) -> None:
+        self.start: float = float(start)
+        self.params: Dict[str, Any] = params
+        self.equation: str = equation
+        self.continuous_phase: bool = continuous_phase
+        self.phase_step: float = float(phase_step)
+
+    @property
+    def local_time(self) -> bool:
+        """Использует ли уравнение время от начала участка."""
+        return SEGMENT_TIME in signal_generator.compile_equation(self.equation).names
+
+
+class ChannelSequence:
+    """Канал, составленный из последовательных участков (нагрузка, КЗ, отключение...).
+
+    Участок действует от своего `start` до начала следующего. Каждый участок
+    вычисляется только на своём срезе отсчётов и пишется сразу в общий
+    выходной массив, поэтому сценарий из многих участков стоит примерно
+    как одно вычисление на всю длину записи. До первого участка — нули.
+    """
+
+    def __init__(self, name: str, segments: Sequence[Segment]) -> None:
+        if not segments:
+            raise ValueError(f"В канале {name!r} нет участков")
+        starts = [segment.start for segment in segments]
+        if any(b <= a for a, b in zip(starts, starts[1:])):
+            raise ValueError(f"Участки канала {name!r} должны идти по возрастанию времени начала")
+        self.name: str = name
+        self.segments: List[Segment] = list(segments)
+
+    def resolved_params(self) -> List[Dict[str, Any]]:
+        """Возвращает параметры участков с подобранной непрерывной фазой.
+
+        Для непрерывности на границе t_b фаза нового участка равна
+        φ1 + 360·(f1·τ1 − f2·τ2) + скачок, где τ — время каждого
+        уравнения в момент t_b (абсолютное или от начала участка).
+        """
+        resolved: List[Dict[str, Any]] = []
+        for index, segment in enumerate(self.segments):
+            params = dict(segment.params)
+            if segment.continuous_phase and index > 0:
+                previous, previous_params = self.segments[index - 1], resolved[-1]
+                for source in (previous_params, params):
+                    if "frequency" not in source or "phase" not in source:
+                        raise ValueError(
+                            f"Непрерывная фаза в канале {self.name!r} требует параметров frequency и phase"
+                        )
+                boundary = segment.start
+                tau_previous = boundary - previous.start if previous.local_time else boundary
+                tau_current = 0.0 if segment.local_time else boundary
+                phase = (
+                    float(previous_params["phase"])
+                    + 360.0 * (float(previous_params["frequency"]) * tau_previous
+                               - float(params["frequency"]) * tau_current)
+                    + segment.phase_step
+                )
+                params["phase"] = (phase + 180.0) % 360.0 - 180.0
+            resolved.append(params)
+        return resolved
+
+    def sample_ranges(self, n_samples: int, sampling_rate: int) -> List[Tuple[int, int]]:
+        """Возвращает срезы отсчётов [i0, i1) участков (пустые для вне записи)."""
+        starts = [min(n_samples, max(0, int(round(s.start * sampling_rate)))) for s in self.segments]
+        return list(zip(starts, starts[1:] + [n_samples]))
+
+    @profiling.profiled("ChannelSequence.generate")
+    def generate(
+        self,
+        duration: float = signal_generator.DEFAULT_DURATION,
+        sampling_rate: int = signal_generator.DEFAULT_SAMPLING_RATE,
+        out: Optional[NDArray[np.float64]] = None,
+    ) -> Tuple[NDArray[np.floating], NDArray[np.float64]]:
+        """Вычисляет канал в `out` (или в новый массив) и возвращает (t, y).
+
+        Ошибки вычисления уравнений пробрасываются как ValueError.
+        """
+        t = signal_generator.get_time_base(duration, sampling_rate)
+        if out is None:
+            out = np.empty(len(t), dtype=np.float64)
+        elif out.shape != t.shape:
+            raise ValueError("Размер выходного массива не соответствует длине записи")
+
+        ranges = self.sample_ranges(len(t), sampling_rate)
+        out[:ranges[0][0]] = 0.0
+        for segment, params, (i0, i1) in zip(self.segments, self.resolved_params(), ranges):
+            if i1 <= i0:
+                continue
+            compiled = signal_generator.compile_equation(segment.equation)
+            t_slice = t[i0:i1]
+            sources = {SEGMENT_TIME: t_slice - segment.start} if segment.local_time else None
+            signal_generator._evaluate_array(compiled, t_slice, params, sources, out[i0:i1], sampling_rate)
+        return t, out
+
+
+def segment_from_spec(spec: Dict[str, Any], configs: List[Dict[str, Any]]) -> Segment:
+    """Создаёт участок из описания {"start", "type"|"equation", "params", ...}."""
+    params, equation = resolve_spec(spec, configs)
+    return Segment(
+        spec.get("start", 0.0),
+        params,
+        equation,
+        continuous_phase=bool(spec.get("continuous_phase", False)),
+        phase_step=spec.get("phase_step", 0.0),
+    )
+
+
+def sequence_from_spec(channel: Dict[str, Any], configs: List[Dict[str, Any]]) -> ChannelSequence:
+    """Создаёт канал из описания {"name", "segments": [...]}."""
+    name = channel.get("name", "Безымянный")
+    return ChannelSequence(name, [segment_from_spec(spec, configs) for spec in channel.get("segments", [])])
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import ast
+import numbers
+import operator
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# Размер блока в отсчётах: несколько буферов float64 такого размера помещаются в кэш L2
+FUSED_BLOCK_SIZE: int = 8192
+
+_BINARY_UFUNCS: Dict[type, np.ufunc] = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.remainder,
+    ast.Pow: np.power,
+}
+_BINARY_SCALAR: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_UFUNCS: Dict[type, np.ufunc] = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+_UNARY_SCALAR: Dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+# Встроенные функции, которые в уравнениях означают ufunc numpy
+_BUILTIN_UFUNCS: Dict[str, np.ufunc] = {"abs": np.absolute}
+
+
+class UnsupportedExpression(Exception):
+    """Уравнение не укладывается в грамматику слитного вычислителя."""
+
+
+# Узлы плана: ("const", значение), ("name", имя), ("binop"/"unary", тип оператора, операнды...),
+# ("call", ufunc, аргументы)
+_Node = Tuple[Any, ...]
+# Операнды программы: ("s", скаляр), ("a", входной массив), ("r", номер буфера)
+_Operand = Tuple[str, Any]
+
+
+def _plan_node(node: ast.AST) -> _Node:
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise UnsupportedExpression("нечисловая константа")
+        return ("const", node.value)
+    if isinstance(node, ast.Name):
+        return ("name", node.id)
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_UFUNCS:
+        return ("binop", type(node.op), _plan_node(node.left), _plan_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_UFUNCS:
+        return ("unary", type(node.op), _plan_node(node.operand))
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "numpy":
+        value = getattr(np, node.attr, None)
+        if isinstance(value, float):
+            return ("const", value)
+        raise UnsupportedExpression(f"numpy.{node.attr}")
+    if isinstance(node, ast.Call) and not node.keywords:
+        func = node.func
+        ufunc: Optional[np.ufunc] = None
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "numpy":
+            candidate = getattr(np, func.attr, None)
+            if isinstance(candidate, np.ufunc):
+                ufunc = candidate
+        elif isinstance(func, ast.Name):
+            ufunc = _BUILTIN_UFUNCS.get(func.id)
+        if ufunc is not None and ufunc.nout == 1 and ufunc.nin == len(node.args):
+            return ("call", ufunc, tuple(_plan_node(arg) for arg in node.args))
+    raise UnsupportedExpression(type(node).__name__)
+
+
+class _Program:
+    """Линейная программа для конкретных параметров: скаляры уже свёрнуты."""
+
+    def __init__(self) -> None:
+        self.steps: List[Tuple[np.ufunc, Tuple[_Operand, ...], int]] = []
+        self.n_registers: int = 0
+        self._free: List[int] = []
+
+    def register(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self.n_registers += 1
+        return self.n_registers - 1
+
+    def release(self, operand: _Operand) -> None:
+        if operand[0] == "r":
+            self._free.append(operand[1])
+
+
+_scratch = threading.local()
+
+
+def _scratch_buffers(count: int, block_size: int) -> List[NDArray[np.float64]]:
+    """Возвращает переиспользуемые буферы текущего потока (не меньше `count`)."""
+    buffers: List[NDArray[np.float64]] = getattr(_scratch, "buffers", [])
+    if buffers and len(buffers[0]) != block_size:
+        buffers = []
+    while len(buffers) < count:
+        buffers.append(np.empty(block_size, dtype=np.float64))
+    _scratch.buffers = buffers
+    return buffers
+
+
+class FusedPlan:
+    """План вычисления уравнения блоками без полноразмерных временных массивов.
+
+    Уравнение разбирается один раз. При вычислении скалярные подвыражения
+    (параметры, константы) сворачиваются, а операции над массивами
+    выполняются как ufunc numpy с `out=` поблочно: промежуточные значения
+    живут в нескольких буферах размером с блок, переиспользуемых между
+    вызовами, и только результат занимает полную длину.
+
+    Поддерживаются числа, имена, арифметические операторы, numpy.pi/numpy.e,
+    ufunc numpy с позиционными аргументами и abs(). Для остального
+    конструктор бросает UnsupportedExpression — тогда уравнение вычисляется
+    через asteval.
+    """
+
+    def __init__(self, node: ast.Module) -> None:
+        body = node.body
+        if len(body) != 1 or not isinstance(body[0], ast.Expr):
+            raise UnsupportedExpression("ожидается одно выражение")
+        self.root: _Node = _plan_node(body[0].value)
+
+    def _bind(
+        self,
+        node: _Node,
+        symbols: Mapping[str, Any],
+        n: int,
+        program: _Program,
+    ) -> _Operand:
+        kind = node[0]
+        if kind == "const":
+            return ("s", node[1])
+        if kind == "name":
+            if node[1] not in symbols:
+                raise UnsupportedExpression(f"неизвестное имя {node[1]}")
+            value = symbols[node[1]]
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                return ("s", value)
+            if isinstance(value, np.ndarray) and value.shape == (n,):
+                return ("a", value)
+            raise UnsupportedExpression(f"значение {node[1]} не скаляр и не массив длины записи")
+
+        if kind == "binop":
+            operands = (self._bind(node[2], symbols, n, program), self._bind(node[3], symbols, n, program))
+            ufunc = _BINARY_UFUNCS[node[1]]
+            scalar_op: Callable[..., Any] = _BINARY_SCALAR[node[1]]
+        elif kind == "unary":
+            operands = (self._bind(node[2], symbols, n, program),)
+            ufunc = _UNARY_UFUNCS[node[1]]
+            scalar_op = _UNARY_SCALAR[node[1]]
+        else:
+            operands = tuple(self._bind(arg, symbols, n, program) for arg in node[2])
+            ufunc = scalar_op = node[1]
+
+        if all(op[0] == "s" for op in operands):
+            # Скалярное подвыражение считается один раз, как в asteval
+            try:
+                return ("s", scalar_op(*(op[1] for op in operands)))
+            except ArithmeticError as e:
+                raise ValueError(str(e)) from e
+
+        # Результат пишется в буфер одного из операндов, если он больше не нужен
+        target = next((op[1] for op in operands if op[0] == "r"), None)
+        for op in operands:
+            if op[0] == "r" and op[1] != target:
+                program.release(op)
+        if target is None:
+            target = program.register()
+        program.steps.append((ufunc, operands, target))
+        return ("r", target)
+
+    def evaluate(
+        self,
+        symbols: Mapping[str, Any],
+        n: int,
+        out: Optional[NDArray[np.float64]] = None,
+        block_size: int = FUSED_BLOCK_SIZE,
+    ) -> NDArray[np.float64]:
+        """Вычисляет уравнение для `n` отсчётов и возвращает массив float64.
+
+        `symbols` — значения имён уравнения: скаляры или массивы длины `n`.
+        Бросает UnsupportedExpression, если значения не подходят плану.
+        """
+        program = _Program()
+        result = self._bind(self.root, symbols, n, program)
+        if out is None:
+            out = np.empty(n, dtype=np.float64)
+
+        if result[0] == "s":
+            out.fill(result[1])
+            return out
+        if result[0] == "a":
+            np.copyto(out, result[1])
+            return out
+
+        buffers = _scratch_buffers(program.n_registers, block_size)
+        last = len(program.steps) - 1
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            size = stop - start
+            registers = [buf[:size] for buf in buffers]
+            for i, (ufunc, operands, target) in enumerate(program.steps):
+                args = [
+                    op[1] if op[0] == "s" else op[1][start:stop] if op[0] == "a" else registers[op[1]]
+                    for op in operands
+                ]
+                # Последняя операция пишет сразу в результат
+                ufunc(*args, out=out[start:stop] if i == last else registers[target])
+        return out
+
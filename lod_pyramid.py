@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# Размер корзины первого уровня и коэффициент укрупнения между уровнями
+BASE_BUCKET: int = 8
+LEVEL_FACTOR: int = 4
+# Корзин первого уровня, считаемых за один проход: отсчёты читаются кусками,
+# а не одним полноразмерным массивом (важно для данных, отображённых из файла)
+BUILD_CHUNK_BUCKETS: int = 1 << 16
+
+
+class _Level:
+    """Один уровень огибающей: min/max по корзинам фиксированного размера."""
+
+    __slots__ = ("bucket", "mins", "maxs", "dirty")
+
+    def __init__(self, bucket: int, mins: NDArray[np.floating], maxs: NDArray[np.floating]) -> None:
+        self.bucket: int = bucket
+        self.mins: NDArray[np.floating] = mins
+        self.maxs: NDArray[np.floating] = maxs
+        # Диапазон «грязных» корзин [lo, hi), которые нужно пересчитать
+        self.dirty: Optional[Tuple[int, int]] = None
+
+
+def _reduce(
+    mins: NDArray[np.floating],
+    maxs: NDArray[np.floating],
+    factor: int,
+    out_mins: NDArray[np.floating],
+    out_maxs: NDArray[np.floating],
+) -> None:
+    """Сворачивает по `factor` соседних значений min/max в выходные массивы."""
+    full = (len(mins) // factor) * factor
+    if full:
+        np.min(mins[:full].reshape(-1, factor), axis=1, out=out_mins[:full // factor])
+        np.max(maxs[:full].reshape(-1, factor), axis=1, out=out_maxs[:full // factor])
+    if full < len(mins):
+        out_mins[-1] = mins[full:].min()
+        out_maxs[-1] = maxs[full:].max()
+
+
+class MinMaxPyramid:
+    """Многоуровневая min/max-огибающая сигнала для быстрой отрисовки.
+
+    Уровни строятся лениво при первом запросе. query() выбирает уровень,
+    у которого число корзин в видимом диапазоне не превышает ширину области
+    в пикселях, и возвращает только видимую часть, поэтому пики не теряются,
+    а объём передаваемых в график данных не зависит от длины записи.
+    """
+
+    def __init__(self, t: NDArray[np.floating], y: NDArray[np.floating]) -> None:
+        self.t: NDArray[np.floating] = t
+        self.y: NDArray[np.floating] = y
+        self.version: int = 0
+        self._levels: List[_Level] = []
+
+    def invalidate(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        t: Optional[NDArray[np.floating]] = None,
+        y: Optional[NDArray[np.floating]] = None,
+    ) -> None:
+        """Помечает отсчёты [start, stop) изменившимися.
+
+        Если передан массив другой длины, уровни сбрасываются целиком;
+        иначе пересчитываются только затронутые корзины.
+        """
+        if t is not None:
+            self.t = t
+        if y is not None:
+            if self.y is None or len(y) != len(self.y):
+                self._levels.clear()
+            self.y = y
+        self.version += 1
+        stop = len(self.y) if stop is None else stop
+        if stop <= start:
+            return
+        for level in self._levels:
+            lo = start // level.bucket
+            hi = -(-stop // level.bucket)
+            if level.dirty is not None:
+                lo, hi = min(lo, level.dirty[0]), max(hi, level.dirty[1])
+            level.dirty = (lo, hi)
+
+    def _build_level(self, index: int) -> _Level:
+        if index == 0:
+            bucket = BASE_BUCKET
+            n = -(-len(self.y) // bucket)
+            level = _Level(bucket, np.empty(n, dtype=self.y.dtype), np.empty(n, dtype=self.y.dtype))
+            for first in range(0, n, BUILD_CHUNK_BUCKETS):
+                last = min(first + BUILD_CHUNK_BUCKETS, n)
+                chunk = self.y[first * bucket:last * bucket]
+                _reduce(chunk, chunk, bucket, level.mins[first:last], level.maxs[first:last])
+        else:
+            below = self._level(index - 1)
+            bucket = below.bucket * LEVEL_FACTOR
+            n = -(-len(below.mins) // LEVEL_FACTOR)
+            level = _Level(bucket, np.empty(n, dtype=below.mins.dtype), np.empty(n, dtype=below.maxs.dtype))
+            _reduce(below.mins, below.maxs, LEVEL_FACTOR, level.mins, level.maxs)
+        return level
+
+    def _level(self, index: int) -> _Level:
+        """Возвращает уровень `index`, достраивая и очищая его при необходимости."""
+        while len(self._levels) <= index:
+            self._levels.append(self._build_level(len(self._levels)))
+        level = self._levels[index]
+        if level.dirty is not None:
+            lo, hi = level.dirty
+            level.dirty = None
+            if index == 0:
+                src_mins = src_maxs = self.y[lo * level.bucket:hi * level.bucket]
+                factor = level.bucket
+            else:
+                below = self._level(index - 1)
+                src_mins = below.mins[lo * LEVEL_FACTOR:hi * LEVEL_FACTOR]
+                src_maxs = below.maxs[lo * LEVEL_FACTOR:hi * LEVEL_FACTOR]
+                factor = LEVEL_FACTOR
+            _reduce(src_mins, src_maxs, factor, level.mins[lo:hi], level.maxs[lo:hi])
+        return level
+
+    def query(
+        self,
+        x0: float,
+        x1: float,
+        pixels: int,
+    ) -> Tuple[NDArray[np.floating], NDArray[np.floating]]:
+        """Возвращает (t, y) для отрисовки диапазона [x0, x1] шириной `pixels`.
+
+        Если отсчётов в диапазоне не больше 2 * pixels, возвращаются исходные
+        данные (срезы без копирования); иначе — чередующиеся min/max корзин.
+        """
+        n_total = len(self.y)
+        if n_total == 0:
+            return self.t[:0], self.y[:0]
+        pixels = max(int(pixels), 1)
+        i0 = max(int(np.searchsorted(self.t, x0, side="right")) - 1, 0)
+        i1 = min(int(np.searchsorted(self.t, x1, side="left")) + 1, n_total)
+        if i1 - i0 <= 2 * pixels:
+            return self.t[i0:i1], self.y[i0:i1]
+
+        # Самый мелкий уровень, у которого корзин в диапазоне не больше числа пикселей
+        index = 0
+        bucket = BASE_BUCKET
+        while (i1 - i0) / bucket > pixels:
+            index += 1
+            bucket *= LEVEL_FACTOR
+        level = self._level(index)
+        b0 = i0 // bucket
+        b1 = min(-(-i1 // bucket), len(level.mins))
+
+        count = b1 - b0
+        x = np.empty(2 * count, dtype=self.t.dtype)
+        y = np.empty(2 * count, dtype=level.mins.dtype)
+        starts = np.arange(b0, b1) * bucket
+        x[0::2] = self.t[starts]
+        x[1::2] = self.t[np.minimum(starts + bucket // 2, n_total - 1)]
+        y[0::2] = level.mins[b0:b1]
+        y[1::2] = level.maxs[b0:b1]
+        return x, y
@@ -1,31 +1,50 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout,
-    QPushButton, QDockWidget, QListWidget, QListWidgetItem
+    QPushButton, QDockWidget, QListView,
+    QFileDialog, QInputDialog, QMessageBox
 )
 from PySide6.QtGui import QAction
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QModelIndex
+import shiboken6
 
 from widgets.params_widget import ParamsWidget
-from plot_view import PlotView
+from widgets.signal_list_model import SignalListModel
+from widgets.trace_panel import TracePanel
 from signal_model import Signal
 from signal_library import SignalLibrary
+from signal_graph import DependencyCycleError, SourceRenameError
+from qt_adapter import QtSignalLibrary, QtSignalRegenerator
 from floating_window import FloatingPlotWindow
 import json
 
+if TYPE_CHECKING:
+    # pyqtgraph импортируется лениво: он нужен только при создании первого графика
+    from plot_view import PlotView
+
 class MainWindow(QMainWindow):
     def __init__(self) -> None:  # type: ignore[override]
         super().__init__()
         self.setWindowTitle("Генератор сигналов")
         self.signal_library: SignalLibrary = SignalLibrary()
+        self.qt_signal_library: QtSignalLibrary = QtSignalLibrary(self.signal_library, self)
+        self.regenerator: QtSignalRegenerator = QtSignalRegenerator(self)
+        # Производные сигналы пересчитываются в том же фоновом пуле, а не в GUI-потоке
+        self.signal_library.graph.regenerator = self.regenerator
+        # Сигнал, загруженный в панель параметров для правки: только к нему
+        # применяются правки без кнопки «Обновить в библиотеке»
+        self._editing_signal: Optional[Signal] = None
+        # Общая модель списка сигналов для библиотеки и всех окон графиков
+        self.signal_list_model: SignalListModel = SignalListModel(self.qt_signal_library, self)
         self.plot_views: List[PlotView] = []
         self.floating_windows: List[FloatingPlotWindow] = []
 
         self.init_ui()
         self.create_menu()
-        self.create_plot_view()
+        # Первый график создаётся после показа окна, чтобы не задерживать запуск импортом pyqtgraph
+        QTimer.singleShot(0, self.create_plot_view)
 
     def init_ui(self) -> None:
         """Инициализация пользовательского интерфейса главного окна."""
@@ -37,6 +56,9 @@ class MainWindow(QMainWindow):
         # --- Библиотека сигналов (слева) ---
         self.setup_library_dock()
 
+        # --- Панель производительности (снизу, скрыта по умолчанию) ---
+        self.setup_trace_dock()
+
         self.resize(1400, 800)
 
     def create_menu(self) -> None:
@@ -52,9 +74,26 @@ class MainWindow(QMainWindow):
         new_float_win_action.triggered.connect(self.create_floating_window)
         file_menu.addAction(new_float_win_action)
 
+        file_menu.addSeparator()
+        import_action = QAction("Импорт COMTRADE...", self)
+        import_action.triggered.connect(self.import_comtrade)
+        file_menu.addAction(import_action)
+
+        export_action = QAction("Экспорт в COMTRADE...", self)
+        export_action.triggered.connect(self.export_comtrade)
+        file_menu.addAction(export_action)
+
+        view_menu = menu.addMenu("Вид")
+        view_menu.addAction(self.trace_dock.toggleViewAction())
+
     def create_plot_view(self, target_window: QMainWindow | None = None) -> None:
         """Создает и добавляет новое окно с графиком в указанное окно (или в главное)."""
-        plot_view = PlotView(f"График {len(self.plot_views) + 1}", target_window or self, self.signal_library)
+        from plot_view import PlotView
+
+        plot_view = PlotView(
+            f"График {len(self.plot_views) + 1}", target_window or self,
+            self.qt_signal_library, self.signal_list_model,
+        )
         self.plot_views.append(plot_view)
         if target_window is None:
             target_window = self
@@ -67,6 +106,9 @@ class MainWindow(QMainWindow):
         self.params_widget = ParamsWidget()
         self.params_widget.add_button.clicked.connect(self.add_signal)
         self.params_widget.update_button.clicked.connect(self.update_signal_in_library)
+        self.params_widget.params_changed.connect(self.apply_live_edit)
+        # Выбор типа начинает описание нового сигнала: правки больше не применяются к выбранному
+        self.params_widget.signal_type_combo.activated.connect(self.stop_live_edit)
         
         params_dock.setWidget(self.params_widget)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, params_dock)
@@ -77,9 +119,11 @@ class MainWindow(QMainWindow):
         library_widget = QWidget()
         library_layout = QVBoxLayout(library_widget)
 
-        self.library_list_widget = QListWidget()
-        self.library_list_widget.itemClicked.connect(self.load_signal_to_params)
-        library_layout.addWidget(self.library_list_widget)
+        self.library_list_view = QListView()
+        self.library_list_view.setModel(self.signal_list_model)
+        self.library_list_view.setUniformItemSizes(True)
+        self.library_list_view.clicked.connect(self.load_signal_to_params)
+        library_layout.addWidget(self.library_list_view)
 
         delete_lib_button = QPushButton("Удалить из библиотеки")
         delete_lib_button.clicked.connect(self.remove_signal)
@@ -88,6 +132,12 @@ class MainWindow(QMainWindow):
         library_dock.setWidget(library_widget)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, library_dock)
 
+    def setup_trace_dock(self) -> None:
+        self.trace_dock = QDockWidget("Производительность", self)
+        self.trace_dock.setWidget(TracePanel())
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.trace_dock)
+        self.trace_dock.hide()
+
     def create_floating_window(self) -> None:
         count = len(self.floating_windows) + 1
         title = f"Плавающее окно {count}"
@@ -98,43 +148,167 @@ class MainWindow(QMainWindow):
         floating_win.show()
 
     def on_floating_window_closed(self, window: FloatingPlotWindow) -> None:
+        # Окно удаляется вместе с графиками (WA_DeleteOnClose): их воспроизведение
+        # останавливается сейчас, пока объекты ещё существуют
+        for plot_view in [view for view in self.plot_views if view.parent() is window]:
+            plot_view.stop_playback()
+            self.plot_views.remove(plot_view)
         if window in self.floating_windows:
             self.floating_windows.remove(window)
         for index, window in enumerate(self.floating_windows):
             window.setWindowTitle(f"Плавающее окно {index + 1}")
 
+    def current_signal(self) -> Optional[Signal]:
+        """Возвращает сигнал, выбранный в списке библиотеки."""
+        return self.signal_list_model.signal_at(self.library_list_view.currentIndex().row())
+
+    def apply_live_edit(self) -> None:
+        """Применяет правки из панели, если в ней открыт сигнал библиотеки."""
+        if self._editing_signal is not None and self._editing_signal is self.current_signal():
+            self.update_signal_in_library()
+
+    def stop_live_edit(self) -> None:
+        self._editing_signal = None
+
     def add_signal(self) -> None:
-        """Добавляет новый сигнал в библиотеку."""
+        """Добавляет новый сигнал в библиотеку; данные рассчитываются в фоне."""
+        self.stop_live_edit()
         params, equation = self.params_widget.get_params_and_equation()
-        new_signal = Signal(params, equation)
+        sampling_rate = self.params_widget.sampling_rate()
+        new_signal = Signal(params, equation, sampling_rate=sampling_rate, generate=False)
         self.signal_library.add_signal(new_signal)
-        self.library_list_widget.addItem(new_signal.name)
+        try:
+            self.signal_library.graph.check(new_signal, params, equation)
+        except DependencyCycleError as e:
+            self.signal_library.remove_signal(new_signal)
+            QMessageBox.warning(self, "Добавление сигнала", str(e))
+            return
+        sources = self.signal_library.graph.source_loader(params, equation, sampling_rate)
+        self.regenerator.submit(new_signal, params, equation, sources)
 
     def update_signal_in_library(self) -> None:
-        current_row = self.library_list_widget.currentRow()
-        if current_row == -1: return
+        signal_to_update = self.current_signal()
+        if signal_to_update is None: return
 
-        signal_to_update = self.signal_library[current_row]
         params, equation = self.params_widget.get_params_and_equation()
-        signal_to_update.update(params, equation)
+        sampling_rate = self.params_widget.sampling_rate()
+        if not signal_to_update.regenerable:
+            # Записанные отсчёты не заменяются сгенерированными: меняется только имя
+            params = dict(signal_to_update.params, name=params["name"])
+            equation = signal_to_update.equation
+        try:
+            self.signal_library.graph.check(signal_to_update, params, equation)
+        except (DependencyCycleError, SourceRenameError) as e:
+            QMessageBox.warning(self, "Обновление сигнала", str(e))
+            return
+        if not signal_to_update.regenerable:
+            signal_to_update.set_params(params)
+            return
+        if self._only_name_changed(signal_to_update, params, equation, sampling_rate):
+            # Переименование не меняет отсчёты: без пересчёта и повторной передачи данных
+            signal_to_update.set_params(params)
+            return
+        sources = self.signal_library.graph.source_loader(params, equation, sampling_rate)
+        # Предыдущий незавершённый пересчёт этого сигнала отменяется
+        self.regenerator.submit(signal_to_update, params, equation, sources, sampling_rate)
+
+        # Список и графики обновятся сами по событию сигнала, когда придут новые данные
+
+    def _only_name_changed(
+        self, signal: Signal, params: Dict[str, Any], equation: str, sampling_rate: int
+    ) -> bool:
+        """Отличаются ли новые параметры от текущих только именем сигнала.
 
-        self.library_list_widget.item(current_row).setText(signal_to_update.name)
+        Пока пересчёт сигнала не завершён, его результат принёс бы старое
+        имя, поэтому в этом случае переименование идёт полным путём.
+        """
+        def without_name(values: Dict[str, Any]) -> Dict[str, Any]:
+            return {key: value for key, value in values.items() if key != "name"}
 
-        for pv in self.plot_views:
-            pv.update_displayed_signal(signal_to_update)
+        return (
+            signal.has_data
+            and equation == signal.equation
+            and sampling_rate == signal.sampling_rate
+            and without_name(params) == without_name(signal.params)
+            and not self.regenerator.is_pending(signal)
+        )
 
     def remove_signal(self) -> None:
         """Удаляет сигнал из библиотеки и обновляет графики."""
-        current_row = self.library_list_widget.currentRow()
-        if current_row == -1: return
+        signal_to_remove = self.current_signal()
+        if signal_to_remove is None: return
 
-        signal_to_remove = self.signal_library[current_row]
+        if signal_to_remove is self._editing_signal:
+            self.stop_live_edit()
+        self.regenerator.cancel(signal_to_remove)
         self.signal_library.remove_signal(signal_to_remove)
-        self.library_list_widget.takeItem(current_row)
 
-    def load_signal_to_params(self, item: QListWidgetItem) -> None:
-        row = self.library_list_widget.row(item)
-        if row > -1:
-            signal = self.signal_library[row]
-            self.params_widget.set_params(signal.params)
+    def load_signal_to_params(self, index: QModelIndex) -> None:
+        signal = self.signal_list_model.signal_at(index.row())
+        if signal is not None:
+            self.params_widget.set_params(
+                signal.params, signal.equation, signal.sampling_rate, editable=signal.regenerable
+            )
+            self._editing_signal = signal
+
+    def import_comtrade(self) -> None:
+        """Загружает аналоговые каналы записи COMTRADE в библиотеку сигналов."""
+        from comtrade_reader import open_comtrade
+
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт COMTRADE", "", "COMTRADE (*.cfg *.CFG)")
+        if not path:
+            return
+        try:
+            record = open_comtrade(path)
+            signals = record.to_signals()
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Импорт COMTRADE", f"Не удалось прочитать запись: {e}")
+            return
+        if not signals:
+            QMessageBox.information(self, "Импорт COMTRADE", "В записи нет аналоговых каналов.")
+            return
+        self.signal_library.add_many(signals)
+
+    def export_comtrade(self) -> None:
+        """Экспортирует все сигналы библиотеки в файлы COMTRADE (.cfg/.dat)."""
+        from comtrade_writer import DATA_FORMATS, write_comtrade
+        from resampling import common_rate
+
+        # Сигналы, данные которых ещё считаются, в экспорт не попадают
+        signals = [signal for signal in self.signal_library if signal.has_data]
+        if not signals:
+            QMessageBox.information(self, "Экспорт в COMTRADE", "Библиотека сигналов пуста.")
+            return
+        # Неравномерные записи (частота 0) нельзя привести к общей сетке отсчётов
+        irregular = [signal.name for signal in signals if signal.sampling_rate <= 0]
+        signals = [signal for signal in signals if signal.sampling_rate > 0]
+        if irregular:
+            message = "Сигналы с неравномерной дискретизацией не будут экспортированы:\n" + ", ".join(irregular)
+            if not signals:
+                QMessageBox.information(self, "Экспорт в COMTRADE", message)
+                return
+            if QMessageBox.question(self, "Экспорт в COMTRADE", message + "\n\nПродолжить?") != QMessageBox.StandardButton.Yes:
+                return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт в COMTRADE", "", "COMTRADE (*.cfg)")
+        if not path:
+            return
+        data_format, ok = QInputDialog.getItem(
+            self, "Экспорт в COMTRADE", "Формат данных:", list(DATA_FORMATS), 1, False
+        )
+        if not ok:
+            return
+
+        try:
+            # Сигналы с разной частотой приводятся к наибольшей из них
+            sampling_rate = common_rate([signal.sampling_rate for signal in signals])
+            write_comtrade(path, signals, sampling_rate, data_format)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Экспорт в COMTRADE", f"Не удалось записать файлы: {e}")
 
+    def closeEvent(self, event) -> None:
+        for plot_view in self.plot_views:
+            if shiboken6.isValid(plot_view):
+                plot_view.stop_playback()
+        self.regenerator.shutdown()
+        super().closeEvent(event)
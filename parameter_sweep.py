@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
+
+import signal_generator
+from signal_model import Signal
+from signal_types import default_params, find_signal_type, load_signal_types
+
+# Ограничение памяти на один проход вычисления по умолчанию, байт
+DEFAULT_SWEEP_MEMORY_CAP: int = 256 * 1024 * 1024
+# Оценка числа одновременно живущих массивов размером с результат при вычислении
+SWEEP_TEMPORARY_FACTOR: int = 4
+
+# Диапазон: список значений или {"start", "stop", "step"} / {"start", "stop", "num"}
+RangeSpec = Union[Sequence[float], NDArray[np.floating], Mapping[str, float]]
+
+
+def expand_range(spec: RangeSpec) -> NDArray[np.float64]:
+    """Разворачивает описание диапазона в массив значений.
+
+    {"start": 0, "stop": 359, "step": 1} включает stop, если он попадает на
+    шаг; {"start": 45, "stop": 55, "num": 11} — равномерная сетка с концами.
+    """
+    if isinstance(spec, Mapping):
+        start, stop = float(spec["start"]), float(spec["stop"])
+        if "num" in spec:
+            return np.linspace(start, stop, int(spec["num"]))
+        step = float(spec.get("step", 1.0))
+        if step == 0 or (stop - start) / step < 0:
+            raise ValueError(f"Неверный шаг диапазона: {spec}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return start + step * np.arange(count)
+    values = np.asarray(spec, dtype=np.float64).ravel()
+    if values.size == 0:
+        raise ValueError("Пустой диапазон значений параметра")
+    return values
+
+
+class ParameterSweep:
+    """Генерация одного уравнения для множества наборов параметров.
+
+    Перебираемые параметры подставляются в уравнение столбцами (k, 1), а
+    время — строкой (1, n), поэтому уравнение вычисляется один раз на
+    пачку вариантов за счёт broadcasting numpy, а не по вызову на вариант.
+    Пачки подбираются так, чтобы вычисление не превышало `memory_cap`.
+
+    mode="grid" — все сочетания значений (декартово произведение),
+    mode="zip" — значения берутся попарно, диапазоны одной длины.
+    """
+
+    def __init__(
+        self,
+        equation: str,
+        ranges: Mapping[str, RangeSpec],
+        params: Optional[Mapping[str, Any]] = None,
+        mode: str = "grid",
+        duration: float = signal_generator.DEFAULT_DURATION,
+        sampling_rate: int = signal_generator.DEFAULT_SAMPLING_RATE,
+        memory_cap: int = DEFAULT_SWEEP_MEMORY_CAP,
+    ) -> None:
+        if not ranges:
+            raise ValueError("Не задано ни одного перебираемого параметра")
+        self.equation: str = equation
+        self.params: Dict[str, Any] = dict(params or {})
+        self.duration: float = duration
+        self.sampling_rate: int = sampling_rate
+        self.memory_cap: int = memory_cap
+        self.keys: List[str] = list(ranges)
+        self.columns: Dict[str, NDArray[np.float64]] = self._variant_columns(ranges, mode)
+        self._compiled = signal_generator.compile_equation(equation)
+
+    @classmethod
+    def from_type(
+        cls,
+        signal_type: Union[str, Dict[str, Any]],
+        ranges: Mapping[str, RangeSpec],
+        params: Optional[Mapping[str, Any]] = None,
+        **kwargs: Any,
+    ) -> "ParameterSweep":
+        """Создаёт перебор для типа из signal_types.json (по имени или описанию).
+
+        Неперебираемые параметры берутся по умолчанию из типа и из `params`.
+        """
+        config = signal_type
+        if isinstance(signal_type, str):
+            config = find_signal_type(load_signal_types(), signal_type)
+            if config is None:
+                raise ValueError(f"Неизвестный тип сигнала: {signal_type}")
+        base = default_params(config)
+        base["name"] = config["name"]
+        base["type"] = config["name"]
+        base.update(params or {})
+        unknown = [key for key in ranges if key not in base]
+        if unknown:
+            raise ValueError(f"У типа {config['name']!r} нет параметров: {', '.join(unknown)}")
+        return cls(config.get("equation", "0"), ranges, base, **kwargs)
+
+    @staticmethod
+    def _variant_columns(ranges: Mapping[str, RangeSpec], mode: str) -> Dict[str, NDArray[np.float64]]:
+        values = [expand_range(spec) for spec in ranges.values()]
+        if mode == "grid":
+            grids = np.meshgrid(*values, indexing="ij")
+            return {key: grid.ravel() for key, grid in zip(ranges, grids)}
+        if mode == "zip":
+            if len({len(v) for v in values}) != 1:
+                raise ValueError("В режиме zip все диапазоны должны быть одной длины")
+            return dict(zip(ranges, values))
+        raise ValueError(f"Неизвестный режим перебора: {mode}")
+
+    @property
+    def n_variants(self) -> int:
+        return len(self.columns[self.keys[0]])
+
+    @property
+    def n_samples(self) -> int:
+        return int(self.sampling_rate * self.duration)
+
+    @property
+    def rows_per_chunk(self) -> int:
+        """Число вариантов, вычисляемых за один проход."""
+        row_bytes = max(self.n_samples, 1) * np.dtype(np.float64).itemsize * SWEEP_TEMPORARY_FACTOR
+        return max(1, min(self.n_variants, self.memory_cap // row_bytes))
+
+    def variant_params(self, index: int) -> Dict[str, Any]:
+        """Параметры варианта `index` как для обычного сигнала (с именем варианта)."""
+        params = dict(self.params)
+        for key in self.keys:
+            params[key] = float(self.columns[key][index])
+        suffix = ", ".join(f"{key}={params[key]:g}" for key in self.keys)
+        params["name"] = f"{self.params.get('name', 'Сигнал')} [{suffix}]"
+        return params
+
+    def time_base(self) -> NDArray[np.floating]:
+        return signal_generator.get_time_base(self.duration, self.sampling_rate)
+
+    def iter_chunks(self) -> Iterator[Tuple[int, NDArray[np.float64]]]:
+        """Вычисляет варианты пачками; возвращает (первый вариант, массив (k, n)).
+
+        Ошибки вычисления уравнения пробрасываются как ValueError.
+        """
+        t = self.time_base()
+        time_row = t[np.newaxis, :]
+        step = self.rows_per_chunk
+        for start in range(0, self.n_variants, step):
+            stop = min(start + step, self.n_variants)
+            params = dict(self.params)
+            for key in self.keys:
+                params[key] = self.columns[key][start:stop, np.newaxis]
+            result = signal_generator._evaluate(self._compiled, time_row, params, sampling_rate=self.sampling_rate)
+            if not isinstance(result, (np.ndarray, int, float)):
+                raise ValueError("Результат уравнения имеет неверный тип")
+            try:
+                block = np.broadcast_to(np.asarray(result, dtype=np.float64), (stop - start, len(t)))
+            except ValueError:
+                raise ValueError("Размер результата уравнения не соответствует перебору")
+            yield start, np.ascontiguousarray(block)
+
+    def generate(self) -> Tuple[NDArray[np.floating], NDArray[np.float64]]:
+        """Возвращает (t, Y), где строка Y[i] — вариант i."""
+        t = self.time_base()
+        values = np.empty((self.n_variants, len(t)), dtype=np.float64)
+        for start, block in self.iter_chunks():
+            values[start:start + len(block)] = block
+        return t, values
+
+    def to_signals(self) -> List[Signal]:
+        """Создаёт по сигналу на вариант (для библиотеки, графиков и экспорта)."""
+        t, values = self.generate()
+        signals: List[Signal] = []
+        for index, row in enumerate(values):
+            params = self.variant_params(index)
+            signal = Signal(params, self.equation, self.duration, self.sampling_rate, generate=False)
+            signal.set_data(params, self.equation, t, row)
+            signals.append(signal)
+        return signals
+
+
+def sweep_variants(ranges: Mapping[str, RangeSpec], mode: str = "grid") -> List[Dict[str, float]]:
+    """Возвращает список наборов значений перебираемых параметров."""
+    columns = ParameterSweep._variant_columns(ranges, mode)
+    count = len(next(iter(columns.values()))) if columns else 0
+    return [{key: float(values[i]) for key, values in columns.items()} for i in range(count)]
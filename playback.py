@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import abc
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# Отсчётов на канал в одном кадре (20 мс при 4 кГц)
+FRAME_SIZE: int = 80
+# Ёмкость кольцевого буфера в кадрах
+RING_FRAMES: int = 256
+# Если воспроизведение отстало больше чем на столько кадров, кадры пропускаются
+MAX_LAG_FRAMES: int = 8
+
+# Формат кадра выборочных значений (little-endian):
+# заголовок — сигнатура, версия, флаги, число каналов, число отсчётов,
+# номер кадра, индекс первого отсчёта, частота дискретизации;
+# далее float32 по отсчётам: s0c0, s0c1, ..., s1c0, ...
+SV_MAGIC: bytes = b"CGSV"
+SV_VERSION: int = 1
+SV_HEADER = struct.Struct("<4sBBHHIQf")
+# Максимальный размер полезной нагрузки UDP-датаграммы
+_UDP_MAX_PAYLOAD: int = 65507
+
+# (номер кадра, индекс первого отсчёта, кадр (каналы x отсчёты))
+FrameSink = Callable[[int, int, NDArray[np.float64]], None]
+
+
+class PlaybackEngine:
+    """Воспроизведение сигналов в реальном времени кадрами фиксированного размера.
+
+    Отсчёты всех каналов один раз собираются в общую матрицу; рабочий поток
+    с темпом частоты дискретизации копирует очередной кадр в заранее
+    выделенный кольцевой буфер и передаёт его приёмникам (например,
+    UdpSink/TcpSink). Во внутреннем цикле новые массивы не создаются:
+    индексы кадра и сам кадр — постоянные буферы, копирование идёт через
+    `np.take(..., out=)`. Буфер хранится как (кадры, каналы, отсчёты), так
+    что каждый кадр непрерывен в памяти и numpy пишет в него без
+    промежуточной копии. Запись воспроизводится по кругу.
+
+    drift — насколько последний кадр опоздал относительно реального времени;
+    если отставание превышает MAX_LAG_FRAMES кадров, пропущенные кадры не
+    догоняются, а учитываются в dropped_frames.
+    """
+
+    def __init__(
+        self,
+        channels: Sequence[NDArray[np.floating]],
+        sampling_rate: int,
+        frame_size: int = FRAME_SIZE,
+        ring_frames: int = RING_FRAMES,
+        loop: bool = True,
+    ) -> None:
+        if not channels:
+            raise ValueError("Нет каналов для воспроизведения")
+        lengths = {len(y) for y in channels}
+        if len(lengths) != 1 or 0 in lengths:
+            raise ValueError("Каналы для воспроизведения должны быть непустыми и одной длины")
+        if frame_size <= 0 or ring_frames < 4:
+            raise ValueError("Неверный размер кадра или кольцевого буфера")
+        self.sampling_rate: int = int(sampling_rate)
+        self.frame_size: int = frame_size
+        self.ring_frames: int = ring_frames
+        self.loop: bool = loop
+        self.n_channels: int = len(channels)
+        self.n_samples: int = lengths.pop()
+        self._source: NDArray[np.float64] = np.array(channels, dtype=np.float64)
+        self.ring: NDArray[np.float64] = np.zeros((ring_frames, self.n_channels, frame_size))
+        # Кадры кольцевого буфера (непрерывные представления): создаются один раз
+        self._slots: List[NDArray[np.float64]] = list(self.ring)
+        # Смещения каналов в плоском буфере для latest()
+        self._channel_offsets = (np.arange(self.n_channels, dtype=np.int64) * frame_size)[:, None]
+        self._offsets = np.arange(frame_size, dtype=np.int64)
+        self._indices = np.empty(frame_size, dtype=np.int64)
+        self._sinks: List[FrameSink] = []
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Номер последнего записанного кадра (-1 — ещё ни одного)
+        self.frame_index: int = -1
+        self.frames_produced: int = 0
+        self.dropped_frames: int = 0
+        self.drift: float = 0.0
+        self.max_drift: float = 0.0
+
+    @property
+    def frame_period(self) -> float:
+        return self.frame_size / self.sampling_rate
+
+    @property
+    def capacity(self) -> int:
+        """Ёмкость кольцевого буфера в отсчётах на канал."""
+        return self.ring_frames * self.frame_size
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_sink(self, sink: FrameSink) -> None:
+        """Добавляет приёмник кадров; вызывается из потока воспроизведения."""
+        self._sinks.append(sink)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="playback", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        period = self.frame_period
+        origin = time.perf_counter()
+        frame = 0
+        while not self._stop.is_set():
+            if not self.loop and frame * self.frame_size >= self.n_samples:
+                break
+            # Кадр k готов к отправке в момент окончания его интервала
+            deadline = origin + (frame + 1) * period
+            delay = deadline - time.perf_counter()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            lag = time.perf_counter() - deadline
+            if lag > MAX_LAG_FRAMES * period:
+                skipped = int(lag / period)
+                frame += skipped
+                self.dropped_frames += skipped
+                lag -= skipped * period
+            self.drift = lag
+            self.max_drift = max(self.max_drift, lag)
+            self._produce(frame)
+            frame += 1
+
+    def _produce(self, frame: int) -> None:
+        slot = self._slots[frame % self.ring_frames]
+        first = frame * self.frame_size
+        np.add(self._offsets, first, out=self._indices)
+        np.take(self._source, self._indices, axis=1, out=slot, mode="wrap")
+        with self._lock:
+            self.frame_index = frame
+            self.frames_produced += 1
+        for sink in self._sinks:
+            sink(frame, first, slot)
+
+    def latest(self, out: NDArray[np.float64]) -> int:
+        """Копирует последние out.shape[1] отсчётов в `out` по порядку времени.
+
+        Возвращает индекс первого скопированного отсчёта (отрицательный, пока
+        буфер не заполнен — такие отсчёты нулевые). Окно должно быть хотя бы
+        на два кадра меньше кольцевого буфера.
+        """
+        width = out.shape[1]
+        if width > self.capacity - 2 * self.frame_size:
+            raise ValueError("Окно больше кольцевого буфера")
+        with self._lock:
+            end = (self.frame_index + 1) * self.frame_size
+        first = end - width
+        # Отсчёт s канала c лежит в плоском буфере по адресу
+        # (кадр * каналы + c) * размер кадра + позиция в кадре
+        positions = np.arange(first, end) % self.capacity
+        frames, within = np.divmod(positions, self.frame_size)
+        indices = frames * (self.n_channels * self.frame_size) + within + self._channel_offsets
+        np.take(self.ring.reshape(-1), indices, out=out)
+        return first
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "frames": self.frames_produced,
+            "dropped_frames": self.dropped_frames,
+            "drift_ms": self.drift * 1000,
+            "max_drift_ms": self.max_drift * 1000,
+        }
+
+
+class SampledValueEncoder:
+    """Упаковывает кадры в компактный двоичный формат в один постоянный буфер."""
+
+    def __init__(self, n_channels: int, frame_size: int, sampling_rate: int) -> None:
+        self.n_channels: int = n_channels
+        self.frame_size: int = frame_size
+        self.sampling_rate: int = sampling_rate
+        self.packet: bytearray = bytearray(SV_HEADER.size + 4 * n_channels * frame_size)
+        # Полезная нагрузка как массив (отсчёты x каналы) поверх того же буфера
+        self._payload = np.frombuffer(self.packet, dtype="<f4", offset=SV_HEADER.size).reshape(
+            frame_size, n_channels
+        )
+
+    def encode(self, frame: int, first_sample: int, values: NDArray[np.float64]) -> bytearray:
+        SV_HEADER.pack_into(
+            self.packet, 0, SV_MAGIC, SV_VERSION, 0,
+            self.n_channels, self.frame_size, frame & 0xFFFFFFFF, first_sample, self.sampling_rate,
+        )
+        np.copyto(self._payload, values.T, casting="same_kind")
+        return self.packet
+
+
+def decode_frame(data: bytes) -> Tuple[Dict[str, Any], NDArray[np.float32]]:
+    """Разбирает кадр: возвращает заголовок и массив (каналы x отсчёты)."""
+    magic, version, flags, n_channels, n_samples, frame, first, rate = SV_HEADER.unpack_from(data, 0)
+    if magic != SV_MAGIC or version != SV_VERSION:
+        raise ValueError("Неизвестный формат кадра")
+    values = np.frombuffer(data, dtype="<f4", count=n_channels * n_samples, offset=SV_HEADER.size)
+    header = {
+        "flags": flags, "n_channels": n_channels, "n_samples": n_samples,
+        "frame": frame, "first_sample": first, "sampling_rate": rate,
+    }
+    return header, values.reshape(n_samples, n_channels).T
+
+
+class _SocketSink(SampledValueEncoder, abc.ABC):
+    def __init__(self, engine: PlaybackEngine, host: str, port: int) -> None:
+        super().__init__(engine.n_channels, engine.frame_size, engine.sampling_rate)
+        self.address: Tuple[str, int] = (host, port)
+        self.sent_frames: int = 0
+        self.send_errors: int = 0
+        self.sock: Optional[socket.socket] = None
+
+    def __call__(self, frame: int, first_sample: int, values: NDArray[np.float64]) -> None:
+        if self.sock is None:
+            return
+        try:
+            self._send(self.encode(frame, first_sample, values))
+            self.sent_frames += 1
+        except OSError:
+            self.send_errors += 1
+
+    @abc.abstractmethod
+    def _send(self, packet: bytearray) -> None:
+        """Отправляет готовый пакет кадра по сокету."""
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class UdpSink(_SocketSink):
+    """Отправляет каждый кадр одной UDP-датаграммой."""
+
+    def __init__(self, engine: PlaybackEngine, host: str = "127.0.0.1", port: int = 5000) -> None:
+        super().__init__(engine, host, port)
+        if len(self.packet) > _UDP_MAX_PAYLOAD:
+            raise ValueError("Кадр не помещается в UDP-датаграмму: уменьшите размер кадра или число каналов")
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, packet: bytearray) -> None:
+        self.sock.sendto(packet, self.address)
+
+
+class TcpSink(_SocketSink):
+    """Передаёт кадры подряд по TCP-соединению с локальным приёмником."""
+
+    def __init__(self, engine: PlaybackEngine, host: str = "127.0.0.1", port: int = 5000) -> None:
+        super().__init__(engine, host, port)
+        self.sock = socket.create_connection(self.address, timeout=2.0)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, packet: bytearray) -> None:
+        self.sock.sendall(packet)
+
+
+def open_sink(engine: PlaybackEngine, target: str) -> _SocketSink:
+    """Создаёт приёмник по адресу вида udp://127.0.0.1:5000 или tcp://host:port."""
+    scheme, _, address = target.partition("://")
+    host, _, port = address.rpartition(":")
+    if scheme not in ("udp", "tcp") or not host or not port.isdigit():
+        raise ValueError(f"Неверный адрес потока: {target!r} (ожидается udp://хост:порт или tcp://хост:порт)")
+    sink_class = UdpSink if scheme == "udp" else TcpSink
+    return sink_class(engine, host, int(port))
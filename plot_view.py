@@ -1,43 +1,109 @@
 from __future__ import annotations
 
-from typing import Dict, Callable
+from typing import Dict, List, Optional
+import numpy as np
 from PySide6.QtWidgets import (
-    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
-    QCheckBox, QScrollArea, QPushButton, QColorDialog
+    QDockWidget, QWidget, QHBoxLayout, QVBoxLayout, QListView, QColorDialog,
+    QPushButton, QLineEdit, QLabel, QMessageBox, QComboBox, QDoubleSpinBox
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
-from functools import partial
+from PySide6.QtCore import Qt, QTimer, QModelIndex
+from PySide6.QtGui import QColor, QPen
 import pyqtgraph as pg
 
+import profiling
+from lod_pyramid import MinMaxPyramid
 from widgets.plot_widget import PlotWidget
-from signal_model import Signal
-from signal_library import SignalLibrary
+from widgets.signal_list_model import CheckableSignalProxy, SignalListModel
+from signal_model import Signal, SignalChange
+from qt_adapter import QtSignalLibrary
+from playback import PlaybackEngine, open_sink
+from resampling import common_rate, resample
+from signal_analysis import ANALYSIS_TRACES, DEFAULT_LINE_FREQUENCY, default_analyzer
+from render_scheduler import X_LINK_GROUPS, default_scheduler, is_rendered, x_link_group
+
+# Предельная частота перерисовки при воспроизведении, Гц
+PLAYBACK_REDRAW_HZ: int = 30
+# Ширина бегущего окна при воспроизведении, с
+PLAYBACK_WINDOW_SECONDS: float = 1.0
+
+
+def _analysis_pen(signal: Signal) -> QPen:
+    """Производные кривые рисуются пунктиром цвета исходного сигнала."""
+    return pg.mkPen(color=signal.color, width=1, style=Qt.PenStyle.DashLine)
+
 
 class PlotView(QDockWidget):
-    def __init__(self, title: str, parent, signal_library: SignalLibrary):  # type: ignore[override]
+    def __init__(self, title: str, parent, signal_library: QtSignalLibrary, signal_model: SignalListModel):  # type: ignore[override]
         super().__init__(title, parent)
-        self.signal_library: SignalLibrary = signal_library
+        self.signal_library: QtSignalLibrary = signal_library
         self.signal_plot_items: Dict[Signal, pg.PlotDataItem] = {}
-        self.checkboxes: Dict[Signal, QCheckBox] = {}
-        self.color_buttons: Dict[Signal, QPushButton] = {}
-        self.signal_connections: Dict[Signal, Callable[[], None]] = {}
+        # Накопленные за кадр изменения и версии данных, уже переданных в график
+        self.pending_changes: Dict[Signal, SignalChange] = {}
+        self.uploaded_versions: Dict[Signal, int] = {}
+        # Производные кривые анализа (см. signal_analysis), наложенные на сигналы
+        self.analysis_items: Dict[Signal, pg.PlotDataItem] = {}
+
+        # Воспроизведение в реальном времени (см. playback)
+        self.playback: Optional[PlaybackEngine] = None
+        self._playback_sink = None
+        self._playback_items: List[pg.PlotDataItem] = []
+        self._playback_timer = QTimer(self)
+        self._playback_timer.setInterval(1000 // PLAYBACK_REDRAW_HZ)
+        self._playback_timer.timeout.connect(self._refresh_playback)
 
         main_dock_widget = QWidget()
         self.setWidget(main_dock_widget)
         layout = QHBoxLayout(main_dock_widget)
 
-        # Левая панель для чекбоксов
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setMaximumWidth(250)
-        
-        self.checkbox_container = QWidget()
-        self.checkbox_layout = QVBoxLayout(self.checkbox_container)
-        self.checkbox_layout.addStretch()
-        
-        scroll_area.setWidget(self.checkbox_container)
-        layout.addWidget(scroll_area)
+        # Левая панель: общий список сигналов с флажками этого окна
+        self.signal_list = CheckableSignalProxy(signal_model, self)
+        self.signal_list.check_changed.connect(self._on_check_changed)
+        self.signal_list_view = QListView()
+        self.signal_list_view.setModel(self.signal_list)
+        self.signal_list_view.setUniformItemSizes(True)
+        self.signal_list_view.setToolTip("Двойной щелчок — выбрать цвет сигнала")
+        self.signal_list_view.doubleClicked.connect(self._on_signal_double_clicked)
+        left_panel = QWidget()
+        left_panel.setMaximumWidth(250)
+        left_layout = QVBoxLayout(left_panel)
+        left_layout.setContentsMargins(0, 0, 0, 0)
+        left_layout.addWidget(self.signal_list_view)
+
+        # Общий диапазон оси X с графиками других окон той же группы
+        self.x_link_combo = QComboBox()
+        self.x_link_combo.addItem("Ось X: своя", None)
+        for index in range(1, X_LINK_GROUPS + 1):
+            self.x_link_combo.addItem(f"Ось X: группа {index}", f"group-{index}")
+        self.x_link_combo.currentIndexChanged.connect(self._on_x_link_changed)
+        left_layout.addWidget(self.x_link_combo)
+
+        # Наложение результатов анализа на отмеченные сигналы
+        self.analysis_combo = QComboBox()
+        self.analysis_combo.addItem("Анализ: нет", None)
+        for kind, label in ANALYSIS_TRACES.items():
+            self.analysis_combo.addItem(label, kind)
+        self.analysis_combo.currentIndexChanged.connect(self.refresh_analysis)
+        left_layout.addWidget(self.analysis_combo)
+        self.line_frequency_spin = QDoubleSpinBox()
+        self.line_frequency_spin.setRange(1.0, 1000.0)
+        self.line_frequency_spin.setValue(DEFAULT_LINE_FREQUENCY)
+        self.line_frequency_spin.setSuffix(" Гц")
+        self.line_frequency_spin.setToolTip("Частота сети для окон анализа")
+        self.line_frequency_spin.valueChanged.connect(self.refresh_analysis)
+        left_layout.addWidget(self.line_frequency_spin)
+
+        # Воспроизведение отмеченных сигналов и поток выборочных значений
+        self.stream_target_edit = QLineEdit()
+        self.stream_target_edit.setPlaceholderText("udp://127.0.0.1:5000")
+        self.stream_target_edit.setToolTip("Куда передавать кадры при воспроизведении (пусто — не передавать)")
+        left_layout.addWidget(self.stream_target_edit)
+        self.playback_button = QPushButton("Воспроизведение")
+        self.playback_button.setCheckable(True)
+        self.playback_button.toggled.connect(self._on_playback_toggled)
+        left_layout.addWidget(self.playback_button)
+        self.playback_label = QLabel()
+        left_layout.addWidget(self.playback_label)
+        layout.addWidget(left_panel)
 
         # Правая панель для графика
         self.plot_widget = PlotWidget()
@@ -48,73 +114,24 @@ class PlotView(QDockWidget):
         self.setFeatures(QDockWidget.DockWidgetFeature.DockWidgetMovable | QDockWidget.DockWidgetFeature.DockWidgetFloatable | QDockWidget.DockWidgetFeature.DockWidgetClosable)
 
         # Подключаемся к сигналам библиотеки
-        self.signal_library.signal_added.connect(self._add_signal_widget)
-        self.signal_library.signal_removed.connect(self._remove_signal_widget)
-
-        # Инициализируем виджеты для уже существующих сигналов
-        for signal in self.signal_library.get_all_signals():
-            self._add_signal_widget(signal)
-
-    def _add_signal_widget(self, signal: Signal) -> None:
-        """Добавляет виджет для управления сигналом."""
-        if signal in self.checkboxes:
-            return
+        self.signal_library.signals_removed.connect(self._on_signals_removed)
+        self.signal_library.signal_updated.connect(self._on_signal_updated)
 
-        container = QWidget()
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        checkbox = QCheckBox(signal.name)
-        checkbox.stateChanged.connect(partial(self._on_checkbox_state_changed, signal))
-        
-        color_button = QPushButton()
-        color_button.setFixedSize(24, 24)
-        color_button.setStyleSheet(f"background-color: rgb{signal.color}; border: 1px solid black;")
-        color_button.clicked.connect(partial(self._on_color_button_clicked, signal))
-
-        layout.addWidget(checkbox)
-        layout.addWidget(color_button)
-        
-        self.checkbox_layout.insertWidget(self.checkbox_layout.count() - 1, container)
-        self.checkboxes[signal] = checkbox
-        self.color_buttons[signal] = color_button
-
-        # Подключаемся к сигналу updated
-        connection = partial(self.update_displayed_signal, signal)
-        signal.updated.connect(connection)
-        self.signal_connections[signal] = connection
-
-    def _remove_signal_widget(self, signal: Signal) -> None:
-        """Удаляет виджет для управления сигналом."""
-        if signal not in self.checkboxes:
-            return
-
-        # Отключаемся от сигнала
-        if signal in self.signal_connections:
-            try:
-                signal.updated.disconnect(self.signal_connections.pop(signal))
-            except (RuntimeError, TypeError):
-                pass
-
-        # Удаляем виджет-контейнер
-        container_widget = self.checkboxes[signal].parentWidget()
-        if container_widget:
-            container_widget.setParent(None)
-            container_widget.deleteLater()
-
-        self.checkboxes.pop(signal)
-        self.color_buttons.pop(signal)
-
-        if signal in self.signal_plot_items:
+    def _on_signals_removed(self, signals: List[Signal]) -> None:
+        for signal in signals:
+            self.pending_changes.pop(signal, None)
             self.hide_signal(signal)
 
-    def _on_checkbox_state_changed(self, signal: Signal, state: int) -> None:
-        if state == Qt.CheckState.Checked.value:
+    def _on_check_changed(self, signal: Signal, checked: bool) -> None:
+        if checked:
             self.display_signal(signal)
         else:
             self.hide_signal(signal)
 
-    def _on_color_button_clicked(self, signal: Signal) -> None:
+    def _on_signal_double_clicked(self, index: QModelIndex) -> None:
+        signal = self.signal_list.sourceModel().signal_at(index.row())
+        if signal is None:
+            return
         current_color = QColor(*signal.color)
         color = QColorDialog.getColor(current_color, self, "Выберите цвет")
 
@@ -122,30 +139,187 @@ class PlotView(QDockWidget):
             signal.set_color((color.red(), color.green(), color.blue()))
 
     def display_signal(self, signal: Signal) -> None:
-        if signal in self.signal_plot_items:
+        # Данные ещё считаются в фоне: график появится, когда придёт результат
+        if signal in self.signal_plot_items or not signal.has_data or self.playback is not None:
             return
         
-        plot_item = self.plot_widget.add_plot(signal.t, signal.y, signal.color)
+        plot_item = self.plot_widget.add_plot(signal.t, signal.y, signal.color, signal.lod)
         self.signal_plot_items[signal] = plot_item
+        self.uploaded_versions[signal] = signal.data_version
+        self.update_analysis(signal)
 
     def hide_signal(self, signal: Signal) -> None:
         if signal not in self.signal_plot_items:
             return
 
         plot_item = self.signal_plot_items.pop(signal)
+        self.uploaded_versions.pop(signal, None)
         self.plot_widget.remove_plot(plot_item)
+        self._remove_analysis(signal)
 
-    def update_displayed_signal(self, signal: Signal) -> None:
-        # Обновляем график, если сигнал на нем отображен
+    def _on_x_link_changed(self) -> None:
+        name = self.x_link_combo.currentData()
+        self.plot_widget.set_x_link_group(x_link_group(name) if name else None)
+
+    def analysis_kind(self) -> Optional[str]:
+        return self.analysis_combo.currentData()
+
+    def update_analysis(self, signal: Signal) -> None:
+        """Строит (или убирает) производную кривую анализа для показанного сигнала."""
+        self._remove_analysis(signal)
+        kind = self.analysis_kind()
+        if kind is None or signal not in self.signal_plot_items:
+            return
+        trace = default_analyzer.trace(signal, kind, self.line_frequency_spin.value())
+        if trace is None or len(trace[0]) == 0:
+            return
+        t, values = trace
+        plot_item = self.plot_widget.add_plot(t, values, signal.color, MinMaxPyramid(t, values))
+        plot_item.setPen(_analysis_pen(signal))
+        self.analysis_items[signal] = plot_item
+
+    def refresh_analysis(self) -> None:
+        for signal in list(self.signal_plot_items):
+            self.update_analysis(signal)
+
+    def _remove_analysis(self, signal: Signal) -> None:
+        plot_item = self.analysis_items.pop(signal, None)
+        if plot_item is not None:
+            self.plot_widget.remove_plot(plot_item)
+
+    def _on_signal_updated(self, signal: Signal, changes: SignalChange) -> None:
+        """Накапливает изменения; они применяются не чаще одного раза за кадр.
+
+        Кадры задаёт общий планировщик (см. render_scheduler): пока окно
+        скрыто или его вкладка неактивна, изменения копятся и применяются
+        при показе. Имя и цвет в списке обновляет общая модель, здесь —
+        только график.
+        """
+        if not self.signal_list.is_checked(signal):
+            return
+        self.pending_changes[signal] = self.pending_changes.get(signal, SignalChange.NONE) | changes
+        default_scheduler().schedule(self, self._apply_pending_changes)
+
+    @profiling.profiled("PlotView.apply_changes")
+    def _apply_pending_changes(self) -> None:
+        pending, self.pending_changes = self.pending_changes, {}
+        for signal, changes in pending.items():
+            self.update_displayed_signal(signal, changes)
+
+    def update_displayed_signal(self, signal: Signal, changes: SignalChange = SignalChange.ALL) -> None:
         if signal in self.signal_plot_items:
             plot_item = self.signal_plot_items[signal]
-            self.plot_widget.update_plot(plot_item, signal.t, signal.y)
-            plot_item.setPen(pg.mkPen(color=signal.color, width=2))
-        
-        # Обновляем текст чекбокса, если имя изменилось
-        if signal in self.checkboxes:
-            self.checkboxes[signal].setText(signal.name)
-            # Обновляем цвет кнопки
-            button = self.color_buttons.get(signal)
-            if button:
-                button.setStyleSheet(f"background-color: rgb{signal.color}; border: 1px solid black;")
+            # Отсчёты передаются в график, только если они действительно изменились
+            if SignalChange.DATA in changes and self.uploaded_versions.get(signal) != signal.data_version:
+                self.plot_widget.update_plot(plot_item, signal.t, signal.y)
+                self.uploaded_versions[signal] = signal.data_version
+                self.update_analysis(signal)
+            if SignalChange.STYLE in changes:
+                plot_item.setPen(pg.mkPen(color=signal.color, width=2))
+                if signal in self.analysis_items:
+                    self.analysis_items[signal].setPen(_analysis_pen(signal))
+        elif SignalChange.DATA in changes and self.signal_list.is_checked(signal):
+            self.display_signal(signal)
+
+    def checked_signals(self) -> List[Signal]:
+        model = self.signal_list.sourceModel()
+        signals = (model.signal_at(row) for row in range(model.rowCount()))
+        return [signal for signal in signals if signal is not None and self.signal_list.is_checked(signal)]
+
+    def _on_playback_toggled(self, checked: bool) -> None:
+        if checked:
+            if not self.start_playback():
+                self.playback_button.blockSignals(True)
+                self.playback_button.setChecked(False)
+                self.playback_button.blockSignals(False)
+        else:
+            self.stop_playback()
+
+    def start_playback(self) -> bool:
+        """Запускает воспроизведение отмеченных сигналов бегущим окном."""
+        signals = [signal for signal in self.checked_signals() if signal.has_data]
+        if not signals:
+            QMessageBox.information(self, "Воспроизведение", "Отметьте сигналы с рассчитанными данными.")
+            return False
+        # Сигналы с разной частотой приводятся к наибольшей; воспроизводятся
+        # те, что после этого совпадают по длине с первым
+        signals = [s for s in signals if s.sampling_rate > 0]
+        if not signals:
+            QMessageBox.information(self, "Воспроизведение", "У отмеченных сигналов нет постоянной частоты дискретизации.")
+            return False
+        rate = int(common_rate([s.sampling_rate for s in signals]))
+        channels = [
+            s.y if s.sampling_rate == rate else resample(s.y, s.sampling_rate, rate) for s in signals
+        ]
+        pairs = [(s, y) for s, y in zip(signals, channels) if len(y) == len(channels[0])]
+        signals = [s for s, _ in pairs]
+        engine = PlaybackEngine([y for _, y in pairs], rate)
+        target = self.stream_target_edit.text().strip()
+        if target:
+            try:
+                self._playback_sink = open_sink(engine, target)
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Воспроизведение", f"Не удалось открыть поток: {e}")
+                return False
+            engine.add_sink(self._playback_sink)
+
+        for signal in list(self.signal_plot_items):
+            self.hide_signal(signal)
+        width = min(
+            int(PLAYBACK_WINDOW_SECONDS * engine.sampling_rate),
+            engine.capacity - 2 * engine.frame_size,
+        )
+        self._playback_window = np.zeros((engine.n_channels, width))
+        self._playback_offsets = np.arange(width, dtype=np.float64)
+        # Пока не пришёл первый кадр, окно стоит в начале записи
+        self._playback_x = self._playback_offsets / engine.sampling_rate
+        self._playback_items = [
+            self.plot_widget.add_plot(self._playback_x, row, signal.color)
+            for signal, row in zip(signals, self._playback_window)
+        ]
+        self.playback = engine
+        engine.start()
+        self._playback_timer.start()
+        return True
+
+    def stop_playback(self) -> None:
+        """Останавливает воспроизведение и возвращает статичные графики."""
+        if self.playback is None:
+            return
+        self._playback_timer.stop()
+        self.playback.stop()
+        self.playback = None
+        if self._playback_sink is not None:
+            self._playback_sink.close()
+            self._playback_sink = None
+        for item in self._playback_items:
+            self.plot_widget.remove_plot(item)
+        self._playback_items = []
+        self.playback_label.clear()
+        self.plot_widget.enableAutoRange()
+        for signal in self.checked_signals():
+            self.display_signal(signal)
+
+    def _refresh_playback(self) -> None:
+        engine = self.playback
+        # Скрытое окно не рисует бегущее окно; кадры продолжают идти в поток
+        if engine is None or not is_rendered(self):
+            return
+        first = engine.latest(self._playback_window)
+        np.add(self._playback_offsets, first, out=self._playback_x)
+        self._playback_x /= engine.sampling_rate
+        for item, row in zip(self._playback_items, self._playback_window):
+            item.setData(self._playback_x, row)
+        stats = engine.stats()
+        text = (
+            f"Кадров: {stats['frames']}, пропущено: {stats['dropped_frames']}\n"
+            f"Дрейф: {stats['drift_ms']:.1f} мс (макс. {stats['max_drift_ms']:.1f})"
+        )
+        if self._playback_sink is not None:
+            text += f"\nОтправлено: {self._playback_sink.sent_frames}, ошибок: {self._playback_sink.send_errors}"
+        self.playback_label.setText(text)
+
+    def closeEvent(self, event) -> None:
+        self.playback_button.setChecked(False)
+        self.x_link_combo.setCurrentIndex(0)
+        super().closeEvent(event)
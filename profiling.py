@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterator, List, Optional, TypeVar
+
+# Переменная окружения: включить профилирование при запуске
+PROFILE_ENV: str = "COMTRADE_GEN_PROFILE"
+# Сколько последних длительностей этапа хранится для статистики
+STAGE_HISTORY: int = 1024
+# Сколько последних событий хранится для экспорта трассы
+TRACE_CAPACITY: int = 100_000
+# Границы корзин гистограммы, мкс: 1, 2, 4, ... ~ 8.4 с
+HISTOGRAM_EDGES_US: List[float] = [float(2 ** i) for i in range(24)]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NULL_SPAN: ContextManager[None] = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("count", "total_ns", "durations")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.durations: Deque[int] = deque(maxlen=STAGE_HISTORY)
+
+
+class Profiler:
+    """Сборщик длительностей этапов и событий трассы.
+
+    Хранит для каждого этапа скользящее окно последних длительностей (по
+    нему считаются перцентили и гистограмма) и общий буфер событий для
+    экспорта в формате Chrome Trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+        self._events: Deque[tuple] = deque(maxlen=TRACE_CAPACITY)
+        self._origin_ns: int = time.perf_counter_ns()
+
+    def record(self, name: str, start_ns: int, duration_ns: int) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = _Stage()
+            stage.count += 1
+            stage.total_ns += duration_ns
+            stage.durations.append(duration_ns)
+            self._events.append((name, start_ns, duration_ns, thread_id))
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns() - start)
+
+    def span(self, name: str) -> ContextManager[None]:
+        """Контекстный менеджер, измеряющий этап `name` (пустой, если выключено)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает статистику этапов; времена в миллисекундах.
+
+        count и mean — за всё время, остальное — по скользящему окну.
+        histogram — число замеров окна в корзинах HISTOGRAM_EDGES_US.
+        """
+        with self._lock:
+            snapshot = {
+                name: (stage.count, stage.total_ns, list(stage.durations))
+                for name, stage in self._stages.items()
+            }
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, (count, total_ns, durations) in snapshot.items():
+            ordered = sorted(durations)
+            histogram = [0] * len(HISTOGRAM_EDGES_US)
+            for duration in durations:
+                us = duration / 1000
+                index = next((i for i, edge in enumerate(HISTOGRAM_EDGES_US) if us <= edge), len(histogram) - 1)
+                histogram[index] += 1
+            result[name] = {
+                "count": count,
+                "mean_ms": total_ns / count / 1e6,
+                "last_ms": durations[-1] / 1e6,
+                "p50_ms": ordered[len(ordered) // 2] / 1e6,
+                "p95_ms": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] / 1e6,
+                "max_ms": ordered[-1] / 1e6,
+                "histogram": histogram,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._events.clear()
+            self._origin_ns = time.perf_counter_ns()
+
+    def export_chrome_trace(self, path: str) -> int:
+        """Записывает события в JSON формата Chrome Trace. Возвращает их число."""
+        with self._lock:
+            events = list(self._events)
+            origin = self._origin_ns
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            for name, start, duration, thread_id in events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        return len(trace_events)
+
+
+profiler: Profiler = Profiler()
+profiler.enabled = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def enable(enabled: bool = True) -> None:
+    """Включает или выключает сбор замеров."""
+    profiler.enabled = enabled
+
+
+def is_enabled() -> bool:
+    return profiler.enabled
+
+
+def span(name: str) -> ContextManager[None]:
+    """Измеряет блок кода как этап `name`: `with profiling.span("..."):`."""
+    return profiler.span(name)
+
+
+def profiled(name: Optional[str] = None) -> Callable[[F], F]:
+    """Декоратор: измеряет каждый вызов функции как этап `name`.
+
+    Когда профилирование выключено, стоимость — одна проверка флага.
+    """
+    def decorator(func: F) -> F:
+        stage = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(stage, start, time.perf_counter_ns() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return profiler.stats()
+
+
+def reset() -> None:
+    profiler.reset()
+
+
+def export_chrome_trace(path: str) -> int:
+    return profiler.export_chrome_trace(path)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from numpy.typing import NDArray
+from PySide6.QtCore import QObject, Signal as QtSignal
+
+from signal_model import Signal, SignalChange
+from signal_library import SignalLibrary
+from regeneration import SignalRegenerator, Sources
+
+
+class QtSignalLibrary(QObject):
+    """Qt-адаптер над SignalLibrary для виджетов.
+
+    Переизлучает события библиотеки и её сигналов как сигналы Qt, поэтому
+    виджеты получают уведомления в GUI-потоке (даже если событие возникло
+    в рабочем потоке) и автоматически отключаются при уничтожении.
+    """
+    # Списки сигналов: пакетные операции библиотеки приходят одним уведомлением
+    signals_added = QtSignal(list)
+    signals_removed = QtSignal(list)
+    # (сигнал, SignalChange)
+    signal_updated = QtSignal(object, object)
+
+    def __init__(self, library: SignalLibrary, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.library: SignalLibrary = library
+        self._update_handlers: Dict[int, Callable[[SignalChange], None]] = {}
+
+        library.signals_added.connect(self._on_signals_added)
+        library.signals_removed.connect(self._on_signals_removed)
+        for signal in library:
+            self._watch(signal)
+
+    def _watch(self, signal: Signal) -> None:
+        handler = lambda changes: self.signal_updated.emit(signal, changes)  # noqa: E731
+        signal.updated.connect(handler)
+        self._update_handlers[signal.id] = handler
+
+    def _on_signals_added(self, signals: List[Signal]) -> None:
+        for signal in signals:
+            self._watch(signal)
+        self.signals_added.emit(signals)
+
+    def _on_signals_removed(self, signals: List[Signal]) -> None:
+        for signal in signals:
+            handler = self._update_handlers.pop(signal.id, None)
+            if handler is not None:
+                signal.updated.disconnect(handler)
+        self.signals_removed.emit(signals)
+
+    def get_all_signals(self) -> List[Signal]:
+        return self.library.get_all_signals()
+
+    def __iter__(self) -> Iterator[Signal]:
+        return iter(self.library)
+
+
+class QtSignalRegenerator(QObject):
+    """Qt-обёртка над SignalRegenerator.
+
+    Результаты фоновой генерации переносятся в GUI-поток через сигнал Qt
+    и применяются к сигналу одним вызовом set_data, если за это время
+    не поступил более новый запрос.
+    """
+    result_ready = QtSignal(object, int, object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.regenerator: SignalRegenerator = SignalRegenerator(self._on_result)
+        self.result_ready.connect(self._apply_result)
+
+    def submit(
+        self,
+        signal: Signal,
+        params: Dict[str, Any],
+        equation: str,
+        sources: Optional[Sources] = None,
+        sampling_rate: Optional[int] = None,
+    ) -> Future:
+        return self.regenerator.submit(signal, params, equation, sources, sampling_rate)
+
+    def cancel(self, signal: Signal) -> None:
+        self.regenerator.cancel(signal)
+
+    def is_pending(self, signal: Signal) -> bool:
+        return self.regenerator.is_pending(signal)
+
+    def pending_request(self, signal: Signal) -> Optional[Tuple[Dict[str, Any], str, int]]:
+        return self.regenerator.pending_request(signal)
+
+    def shutdown(self) -> None:
+        self.regenerator.shutdown()
+
+    def _on_result(
+        self,
+        signal: Signal,
+        request: int,
+        params: Dict[str, Any],
+        equation: str,
+        t: NDArray[Any],
+        y: NDArray[Any],
+        sampling_rate: int,
+    ) -> None:
+        # Вызывается в рабочем потоке: сигнал Qt доставит результат в GUI-поток
+        self.result_ready.emit(signal, request, (params, equation, t, y, sampling_rate))
+
+    def _apply_result(self, signal: Signal, request: int, payload: tuple) -> None:
+        if self.regenerator.finish(signal, request):
+            signal.set_data(*payload)
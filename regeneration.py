@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Union
+from numpy.typing import NDArray
+
+import signal_generator
+from signal_model import Signal
+
+# Обработчик готового результата: (сигнал, номер запроса, параметры, уравнение, t, y, частота)
+ResultHandler = Callable[[Signal, int, Dict[str, Any], str, NDArray[Any], NDArray[Any], int], None]
+# Данные источников или функция, собирающая их уже в рабочем потоке
+Sources = Union[Mapping[str, Any], Callable[[], Mapping[str, Any]]]
+
+
+def _generate(
+    params: Dict[str, Any], equation: str, duration: float, sampling_rate: int, sources: Optional[Sources]
+) -> Tuple[NDArray[Any], NDArray[Any]]:
+    if callable(sources):
+        sources = sources()
+    return signal_generator.generate_signal_data(params, equation, duration, sampling_rate, sources)
+
+
+class SignalRegenerator:
+    """Фоновая генерация данных сигналов в пуле потоков.
+
+    Для каждого сигнала актуален только последний запрос: при новом запросе
+    предыдущий отменяется (если ещё не начат) или его результат отбрасывается.
+    Обработчик `on_result` вызывается в рабочем потоке; перенос результата
+    в GUI-поток выполняет qt_adapter.QtSignalRegenerator.
+    """
+
+    def __init__(self, on_result: Optional[ResultHandler] = None, max_workers: Optional[int] = None) -> None:
+        self.on_result: Optional[ResultHandler] = on_result
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="signal-gen")
+        self._lock = threading.Lock()
+        # Сигнал -> (номер запроса, future, параметры, уравнение, частота)
+        self._requests: Dict[Signal, Tuple[int, Future, Dict[str, Any], str, int]] = {}
+        self._next_request: int = 0
+
+    def submit(
+        self,
+        signal: Signal,
+        params: Dict[str, Any],
+        equation: str,
+        sources: Optional[Sources] = None,
+        sampling_rate: Optional[int] = None,
+    ) -> Future:
+        """Ставит пересчёт сигнала в очередь и возвращает future с (t, y).
+
+        `sources` — данные сигналов-источников для производного сигнала (или
+        функция без аргументов, возвращающая их; вызывается в рабочем потоке),
+        `sampling_rate` — новая частота сигнала (по умолчанию текущая).
+        """
+        rate = signal.sampling_rate if sampling_rate is None else sampling_rate
+        with self._lock:
+            previous = self._requests.get(signal)
+            if previous is not None:
+                previous[1].cancel()
+            self._next_request += 1
+            request = self._next_request
+            future = self._executor.submit(
+                _generate, params, equation, signal.duration, rate, sources,
+            )
+            self._requests[signal] = (request, future, params, equation, rate)
+        future.add_done_callback(lambda f: self._on_done(signal, request, params, equation, rate, f))
+        return future
+
+    def is_current(self, signal: Signal, request: int) -> bool:
+        """Проверяет, что запрос `request` — последний для сигнала."""
+        with self._lock:
+            current = self._requests.get(signal)
+            return current is not None and current[0] == request
+
+    def is_pending(self, signal: Signal) -> bool:
+        """Есть ли у сигнала незавершённый запрос пересчёта."""
+        with self._lock:
+            return signal in self._requests
+
+    def pending_request(self, signal: Signal) -> Optional[Tuple[Dict[str, Any], str, int]]:
+        """Параметры, уравнение и частота незавершённого запроса сигнала (или None)."""
+        with self._lock:
+            current = self._requests.get(signal)
+            return None if current is None else current[2:]
+
+    def finish(self, signal: Signal, request: int) -> bool:
+        """Снимает запрос с учёта, если он последний. Возвращает True в этом случае."""
+        with self._lock:
+            current = self._requests.get(signal)
+            if current is None or current[0] != request:
+                return False
+            del self._requests[signal]
+            return True
+
+    def cancel(self, signal: Signal) -> None:
+        """Отменяет незавершённый пересчёт сигнала (например, при удалении)."""
+        with self._lock:
+            current = self._requests.pop(signal, None)
+        if current is not None:
+            current[1].cancel()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._requests)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(
+        self,
+        signal: Signal,
+        request: int,
+        params: Dict[str, Any],
+        equation: str,
+        sampling_rate: int,
+        future: Future,
+    ) -> None:
+        if future.cancelled() or future.exception() is not None:
+            self.finish(signal, request)
+            return
+        if self.on_result is None:
+            self.finish(signal, request)
+            return
+        if not self.is_current(signal, request):
+            return
+        t, y = future.result()
+        self.on_result(signal, request, params, equation, t, y, sampling_rate)
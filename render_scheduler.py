@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Tuple
+from PySide6.QtCore import QEvent, QObject, QPoint, QRect, QTimer
+from PySide6.QtWidgets import QWidget
+import shiboken6
+
+import profiling
+
+# Длительность кадра: все запросы перерисовки за это время объединяются, мс
+FRAME_INTERVAL_MS: int = 16
+# Число общих групп связи оси X между графиками
+X_LINK_GROUPS: int = 4
+
+RenderCallback = Callable[[], None]
+
+
+# События, после которых отложенный виджет может снова оказаться на экране
+_REVEAL_EVENTS = (QEvent.Type.Show, QEvent.Type.Move, QEvent.Type.Resize)
+
+
+def is_rendered(widget: QWidget) -> bool:
+    """Виден ли виджет на экране: скрытые, свёрнутые и неактивные вкладки не рисуются.
+
+    Неактивные вкладки пристыкованных окон Qt не скрывает, а уносит за
+    пределы окна, поэтому проверяется и положение виджета в окне.
+    """
+    if not shiboken6.isValid(widget) or not widget.isVisible():
+        return False
+    window = widget.window()
+    if window.isMinimized():
+        return False
+    area = QRect(widget.mapTo(window, QPoint(0, 0)), widget.size())
+    return area.intersects(window.rect())
+
+
+class RenderScheduler(QObject):
+    """Общий планировщик перерисовки для всех графиков и окон.
+
+    Виджеты не перерисовываются сами по каждому событию, а ставят в очередь
+    функцию отрисовки; повторные запросы той же функции до конца кадра
+    сливаются в один. Раз в кадр очередь выполняется одним таймером на всё
+    приложение. Запросы скрытых виджетов (закрытые окна, неактивные вкладки,
+    свёрнутые окна) не выполняются, а откладываются до их показа.
+    """
+
+    def __init__(self, interval_ms: int = FRAME_INTERVAL_MS, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        # Запросы текущего кадра и отложенные до показа: функция -> виджет
+        self._pending: Dict[RenderCallback, QWidget] = {}
+        self._deferred: Dict[RenderCallback, QWidget] = {}
+        self.frames: int = 0
+        self.renders: int = 0
+        self.merged: int = 0
+        self.skipped: int = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._run_frame)
+
+    def schedule(self, widget: QWidget, callback: RenderCallback) -> None:
+        """Ставит `callback` (обычно связанный метод `widget`) в ближайший кадр."""
+        if callback in self._pending:
+            self.merged += 1
+            return
+        self._deferred.pop(callback, None)
+        self._pending[callback] = widget
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self, widget: QWidget) -> None:
+        """Снимает все запросы виджета (например, перед его удалением)."""
+        for queue in (self._pending, self._deferred):
+            for callback in [c for c, w in queue.items() if w is widget]:
+                del queue[callback]
+
+    @profiling.profiled("RenderScheduler.frame")
+    def _run_frame(self) -> None:
+        self.frames += 1
+        done: List[RenderCallback] = []
+        # Запросы, появившиеся во время кадра (например, пересчёт огибающей
+        # после смены диапазона), выполняются в этом же кадре, но каждая
+        # функция — не более одного раза
+        while True:
+            ready = [(c, w) for c, w in self._pending.items() if c not in done]
+            if not ready:
+                break
+            for callback, widget in ready:
+                del self._pending[callback]
+                done.append(callback)
+                if not shiboken6.isValid(widget):
+                    continue
+                if not is_rendered(widget):
+                    self._defer(callback, widget)
+                    continue
+                self.renders += 1
+                callback()
+        if self._pending:
+            self._timer.start()
+        # Виджеты удалённых окон больше не покажутся
+        for callback in [c for c, w in self._deferred.items() if not shiboken6.isValid(w)]:
+            del self._deferred[callback]
+
+    def _defer(self, callback: RenderCallback, widget: QWidget) -> None:
+        self.skipped += 1
+        if widget not in self._deferred.values():
+            widget.installEventFilter(self)
+        self._deferred[callback] = widget
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() in _REVEAL_EVENTS:
+            # Показанный виджет догоняет пропущенные кадры в ближайшем кадре;
+            # если он всё ещё не виден, запросы снова отложатся
+            for callback in [c for c, w in self._deferred.items() if w is watched]:
+                self.schedule(self._deferred[callback], callback)
+            if watched not in self._deferred.values():
+                watched.removeEventFilter(self)
+        return False
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "frames": self.frames,
+            "renders": self.renders,
+            "merged": self.merged,
+            "skipped": self.skipped,
+            "pending": len(self._pending),
+            "deferred": len(self._deferred),
+        }
+
+
+class XLinkGroup(QObject):
+    """Группа графиков с общим диапазоном оси X.
+
+    Изменение диапазона в любом графике группы запоминается и применяется к
+    остальным через планировщик перерисовки: серия событий прокрутки даёт не
+    больше одного обновления каждого графика за кадр, а скрытые графики
+    получают последний диапазон при показе.
+    """
+
+    def __init__(self, name: str, scheduler: RenderScheduler, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.name: str = name
+        self.scheduler: RenderScheduler = scheduler
+        self.x_range: Optional[Tuple[float, float]] = None
+        self._members: List = []
+
+    @property
+    def members(self) -> List:
+        self._members = [m for m in self._members if shiboken6.isValid(m)]
+        return list(self._members)
+
+    def add(self, plot_widget) -> None:
+        """Добавляет график (PlotWidget); он сразу получает общий диапазон группы."""
+        if plot_widget in self._members:
+            return
+        self._members.append(plot_widget)
+        plot_widget.getViewBox().sigXRangeChanged.connect(self._on_x_range_changed)
+        if self.x_range is not None:
+            self.scheduler.schedule(plot_widget, plot_widget.apply_linked_x_range)
+
+    def remove(self, plot_widget) -> None:
+        if plot_widget not in self._members:
+            return
+        self._members.remove(plot_widget)
+        if shiboken6.isValid(plot_widget):
+            plot_widget.getViewBox().sigXRangeChanged.disconnect(self._on_x_range_changed)
+
+    def _on_x_range_changed(self, view_box, x_range) -> None:
+        x_range = (float(x_range[0]), float(x_range[1]))
+        # Диапазон, только что применённый из группы, обратно не рассылается
+        if x_range == self.x_range:
+            return
+        self.x_range = x_range
+        for member in self.members:
+            if member.getViewBox() is not view_box:
+                self.scheduler.schedule(member, member.apply_linked_x_range)
+
+
+_default_scheduler: Optional[RenderScheduler] = None
+_x_link_groups: Dict[str, XLinkGroup] = {}
+
+
+def default_scheduler() -> RenderScheduler:
+    """Общий планировщик приложения (создаётся при первом обращении, после QApplication)."""
+    global _default_scheduler
+    if _default_scheduler is None or not shiboken6.isValid(_default_scheduler):
+        _default_scheduler = RenderScheduler()
+    return _default_scheduler
+
+
+def x_link_group(name: str) -> XLinkGroup:
+    """Возвращает общую группу связи оси X с именем `name`, создавая её при необходимости."""
+    group = _x_link_groups.get(name)
+    if group is None or not shiboken6.isValid(group):
+        group = XLinkGroup(name, default_scheduler())
+        _x_link_groups[name] = group
+    return group
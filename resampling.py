@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from fractions import Fraction
+from functools import lru_cache
+from typing import Iterator, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from numpy.typing import NDArray
+
+# Полуширина фильтра в периодах отсчётов более низкой из двух частот
+FILTER_HALF_TAPS: int = 16
+# Параметр окна Кайзера (≈ 80 дБ подавления в полосе заграждения)
+KAISER_BETA: float = 8.0
+# Частота среза относительно частоты Найквиста более низкой частоты
+CUTOFF_ROLLOFF: float = 0.9
+# Наибольший числитель/знаменатель отношения частот
+MAX_RATIO_TERM: int = 1000
+
+# Участок записи: (частота дискретизации, длительность в секундах)
+Section = Tuple[float, float]
+
+
+def rate_ratio(src_rate: float, dst_rate: float) -> Tuple[int, int]:
+    """Возвращает несократимое отношение частот (up, down): dst/src = up/down."""
+    if src_rate <= 0 or dst_rate <= 0:
+        raise ValueError(f"Неверные частоты дискретизации: {src_rate} -> {dst_rate}")
+    ratio = (Fraction(dst_rate).limit_denominator(MAX_RATIO_TERM)
+             / Fraction(src_rate).limit_denominator(MAX_RATIO_TERM))
+    ratio = ratio.limit_denominator(MAX_RATIO_TERM)
+    return ratio.numerator, ratio.denominator
+
+
+@lru_cache(maxsize=64)
+def design_filter(up: int, down: int) -> NDArray[np.float64]:
+    """Проектирует многофазный ФНЧ для передискретизации up/down.
+
+    Окно Кайзера на sinc при частоте up·src; результат — матрица (up, K),
+    где строка r — фаза фильтра, а K — число отводов на выходной отсчёт.
+    Проект зависит только от (up, down) и кэшируется; массив только для чтения.
+    """
+    half = FILTER_HALF_TAPS * max(up, down)
+    length = 2 * half + 1
+    cutoff = CUTOFF_ROLLOFF * 0.5 / max(up, down)
+    n = np.arange(length) - half
+    h = np.sinc(2.0 * cutoff * n) * np.kaiser(length, KAISER_BETA)
+    # Единичное усиление на постоянном токе для каждой фазы после вставки нулей
+    h *= up / h.sum()
+    taps = -(-length // up)
+    padded = np.zeros(taps * up)
+    padded[:length] = h
+    phases = np.ascontiguousarray(padded.reshape(taps, up).T)
+    phases.setflags(write=False)
+    return phases
+
+
+def output_length(n_samples: int, src_rate: float, dst_rate: float) -> int:
+    """Число отсчётов той же длительности на частоте dst_rate."""
+    up, down = rate_ratio(src_rate, dst_rate)
+    return -(-n_samples * up // down)
+
+
+def resample(
+    x: NDArray[np.floating],
+    src_rate: float,
+    dst_rate: float,
+    first: int = 0,
+    count: Optional[int] = None,
+) -> NDArray[np.float64]:
+    """Передискретизирует x (по последней оси) с частоты src_rate на dst_rate.
+
+    Вычисляются только выходные отсчёты [first, first + count) сетки
+    dst_rate, начинающейся в момент x[0]; из x читается лишь нужный для них
+    участок, поэтому длинную запись можно переводить по кускам. Вне x
+    сигнал считается нулевым. Многофазная схема: выходной отсчёт m — это
+    свёртка K входных отсчётов с фазой фильтра (m·down + D) mod up, а все
+    отсчёты одной фазы вычисляются одной векторной операцией.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n_in = x.shape[-1]
+    up, down = rate_ratio(src_rate, dst_rate)
+    if count is None:
+        count = max(output_length(n_in, src_rate, dst_rate) - first, 0)
+    if up == down:
+        out = np.zeros(x.shape[:-1] + (count,))
+        lo, hi = max(first, 0), min(first + count, n_in)
+        if hi > lo:
+            out[..., lo - first:hi - first] = x[..., lo:hi]
+        return out
+
+    phases = design_filter(up, down)
+    taps = phases.shape[1]
+    delay = FILTER_HALF_TAPS * max(up, down)
+    out = np.zeros(x.shape[:-1] + (count,))
+    if count <= 0:
+        return out
+
+    # Участок входа, который нужен для выходных отсчётов [first, first + count)
+    last = first + count - 1
+    lo = (first * down + delay) // up - (taps - 1)
+    hi = (last * down + delay) // up + 1
+    window = np.zeros(x.shape[:-1] + (hi - lo,))
+    src_lo, src_hi = max(lo, 0), min(hi, n_in)
+    if src_hi > src_lo:
+        window[..., src_lo - lo:src_hi - lo] = x[..., src_lo:src_hi]
+
+    step = window.strides[-1]
+    for residue in range(min(up, count)):
+        position = (first + residue) * down + delay
+        n_phase = len(range(residue, count, up))
+        # Строка j — входные отсчёты base + j·down - (K-1) ... base + j·down (без копии)
+        start = position // up - lo - (taps - 1)
+        rows = as_strided(
+            window[..., start:],
+            shape=window.shape[:-1] + (n_phase, taps),
+            strides=window.strides[:-1] + (down * step, step),
+            writeable=False,
+        )
+        out[..., residue::up] = rows @ phases[position % up, ::-1]
+    return out
+
+
+def resample_signal(
+    t: NDArray[np.floating],
+    y: NDArray[np.floating],
+    src_rate: float,
+    dst_rate: float,
+) -> Tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Возвращает (t, y) сигнала на частоте dst_rate с тем же началом."""
+    values = resample(y, src_rate, dst_rate)
+    start = float(t[0]) if len(t) else 0.0
+    return start + np.arange(values.shape[-1]) / dst_rate, values
+
+
+def section_bounds(sections: Sequence[Section]) -> Iterator[Tuple[float, int, int]]:
+    """Возвращает (частота, первый отсчёт на сетке частоты, число отсчётов) участков.
+
+    Участки идут подряд с начала записи; граница участка округляется до
+    ближайшего отсчёта его частоты.
+    """
+    start = 0.0
+    for rate, duration in sections:
+        if rate <= 0 or duration < 0:
+            raise ValueError(f"Неверный участок записи: частота {rate}, длительность {duration}")
+        first = int(round(start * rate))
+        count = int(round((start + duration) * rate)) - first
+        yield rate, first, count
+        start = (first + count) / rate
+
+
+def iter_sections(
+    channels: Sequence[Tuple[NDArray[np.floating], float]],
+    sections: Sequence[Section],
+) -> Iterator[Tuple[float, NDArray[np.float64]]]:
+    """Собирает многочастотную запись из каналов со своими частотами.
+
+    channels — пары (отсчёты, частота); для каждого участка возвращает
+    (частота, блок (каналы, отсчёты)). Каналы не пересчитываются и не
+    переводятся целиком на высшую частоту: каждый участок вычисляется
+    только из своего отрезка исходных отсчётов.
+    """
+    for rate, first, count in section_bounds(sections):
+        block = np.empty((len(channels), count))
+        for row, (y, src_rate) in zip(block, channels):
+            row[:] = resample(y, src_rate, rate, first, count)
+        yield rate, block
+
+
+def common_rate(rates: Sequence[float]) -> float:
+    """Частота, на которой можно совместить каналы без потери полосы (наибольшая)."""
+    positive = [rate for rate in rates if rate > 0]
+    if not positive:
+        raise ValueError("Нет каналов с известной частотой дискретизации")
+    return max(positive)
+
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+
+import profiling
+from signal_model import Signal
+
+# Номинальная частота сети по умолчанию, Гц
+DEFAULT_LINE_FREQUENCY: float = 50.0
+# Наибольший номер гармоники в спектре по умолчанию
+MAX_HARMONIC: int = 15
+
+# Производные кривые для наложения на графики: ключ -> подпись
+ANALYSIS_TRACES: Dict[str, str] = {
+    "magnitude": "Амплитуда (период)",
+    "half_cycle_magnitude": "Амплитуда (полупериод)",
+    "angle": "Угол, град",
+    "rms": "Действующее значение",
+    "thd": "Коэфф. гармоник, %",
+}
+
+
+def samples_per_cycle(sampling_rate: float, frequency: float, cycles: float = 1.0) -> int:
+    """Число отсчётов в окне из `cycles` периодов частоты `frequency`."""
+    if sampling_rate <= 0 or frequency <= 0:
+        raise ValueError("Для анализа нужны положительные частота дискретизации и частота сети")
+    n = int(round(cycles * sampling_rate / frequency))
+    if n < 2:
+        raise ValueError("Окно анализа короче двух отсчётов: увеличьте частоту дискретизации")
+    return n
+
+
+def _window_sums(values: NDArray[Any], n: int) -> NDArray[Any]:
+    """Скользящие суммы по n отсчётам: элемент i — сумма values[i:i + n]."""
+    sums = np.cumsum(values)
+    out = sums[n - 1:].copy()
+    out[1:] -= sums[:-n]
+    return out
+
+
+@profiling.profiled("analysis.phasor")
+def sliding_phasor(
+    y: NDArray[np.floating],
+    sampling_rate: float,
+    frequency: float = DEFAULT_LINE_FREQUENCY,
+    harmonic: int = 1,
+    cycles: float = 1.0,
+) -> NDArray[np.complex128]:
+    """Скользящий вектор гармоники по окну из `cycles` периодов (ДПФ, как в терминалах).
+
+    Элемент i относится к окну, заканчивающемуся отсчётом i + N - 1.
+    Модуль — амплитуда, угол отсчитывается от косинуса с нулевой фазой в
+    момент первого отсчёта, поэтому для установившейся синусоиды вектор
+    постоянен. Окна обновляются рекурсивно (разность накопленных сумм),
+    а не перебором окон в Python. Полупериодное окно (cycles=0.5)
+    быстрее реагирует, но не подавляет постоянную составляющую.
+    """
+    n = samples_per_cycle(sampling_rate, frequency, cycles)
+    if len(y) < n:
+        return np.zeros(0, dtype=np.complex128)
+    omega = 2.0 * np.pi * harmonic * frequency / sampling_rate
+    rotated = np.exp(-1j * omega * np.arange(len(y))) * y
+    phasors = _window_sums(rotated, n)
+    phasors *= 2.0 / n
+    return phasors
+
+
+@profiling.profiled("analysis.rms")
+def sliding_rms(
+    y: NDArray[np.floating],
+    sampling_rate: float,
+    frequency: float = DEFAULT_LINE_FREQUENCY,
+    cycles: float = 1.0,
+) -> NDArray[np.float64]:
+    """Скользящее действующее значение по окну из `cycles` периодов."""
+    n = samples_per_cycle(sampling_rate, frequency, cycles)
+    if len(y) < n:
+        return np.zeros(0)
+    y = np.asarray(y, dtype=np.float64)
+    mean_square = _window_sums(y * y, n)
+    mean_square /= n
+    # Разность накопленных сумм может дать -0.0 на нулевом участке
+    np.maximum(mean_square, 0.0, out=mean_square)
+    return np.sqrt(mean_square, out=mean_square)
+
+
+@profiling.profiled("analysis.spectrum")
+def harmonic_spectrum(
+    y: NDArray[np.floating],
+    sampling_rate: float,
+    frequency: float = DEFAULT_LINE_FREQUENCY,
+    max_harmonic: int = MAX_HARMONIC,
+    hop: Optional[int] = None,
+) -> Tuple[NDArray[np.int64], NDArray[np.complex128]]:
+    """Спектр гармоник 0..max_harmonic по окнам в один период с шагом `hop`.
+
+    Возвращает индексы последних отсчётов окон и матрицу (окна, гармоники)
+    с векторами гармоник (столбец 0 — постоянная составляющая). Окна берутся
+    представлением без копирования и умножаются на матрицу ДПФ одним
+    матричным произведением. По умолчанию окна идут подряд (hop = N).
+    """
+    n = samples_per_cycle(sampling_rate, frequency)
+    hop = hop or n
+    if len(y) < n:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, max_harmonic + 1), dtype=np.complex128)
+    windows = sliding_window_view(np.asarray(y, dtype=np.float64), n)[::hop]
+    starts = np.arange(len(windows)) * hop
+    harmonics = np.arange(max_harmonic + 1)
+    omega = 2.0 * np.pi * frequency / sampling_rate
+    basis = np.exp(-1j * omega * np.outer(np.arange(n), harmonics)) * (2.0 / n)
+    basis[:, 0] /= 2.0
+    spectrum = windows @ basis
+    # Та же опорная фаза, что у sliding_phasor: от первого отсчёта записи
+    spectrum *= np.exp(-1j * omega * np.outer(starts, harmonics))
+    return starts + n - 1, spectrum
+
+
+def total_harmonic_distortion(spectrum: NDArray[np.complex128]) -> NDArray[np.float64]:
+    """Коэффициент гармоник (доля от основной) для каждой строки спектра."""
+    magnitudes = np.abs(spectrum)
+    fundamental = magnitudes[:, 1]
+    higher = np.sqrt(np.sum(magnitudes[:, 2:] ** 2, axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(fundamental > 0, higher / fundamental, 0.0)
+
+
+class SignalAnalyzer:
+    """Анализ сигналов библиотеки с кэшем результатов по версии данных.
+
+    Результат хранится, пока не изменится `data_version` сигнала; кэш не
+    удерживает сами сигналы. Вычисления выполняются только для сигналов
+    с постоянной частотой дискретизации.
+    """
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        self._results: "weakref.WeakKeyDictionary[Signal, Dict[tuple, Tuple[int, Any]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _cached(self, signal: Signal, key: tuple, compute) -> Any:
+        version = signal.data_version
+        with self._lock:
+            entry = self._results.get(signal, {}).get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            results = self._results.setdefault(signal, {})
+            # Результаты прежних версий данных больше не понадобятся
+            for stale in [k for k, (v, _) in results.items() if v != version]:
+                del results[stale]
+            results[key] = (version, result)
+        return result
+
+    def phasor(
+        self,
+        signal: Signal,
+        frequency: float = DEFAULT_LINE_FREQUENCY,
+        harmonic: int = 1,
+        cycles: float = 1.0,
+    ) -> Tuple[NDArray[np.floating], NDArray[np.complex128]]:
+        """Возвращает (время конца окна, вектор) гармоники сигнала."""
+        def compute():
+            values = sliding_phasor(signal.y, signal.sampling_rate, frequency, harmonic, cycles)
+            return signal.t[len(signal.t) - len(values):], values
+        return self._cached(signal, ("phasor", frequency, harmonic, cycles), compute)
+
+    def rms(
+        self, signal: Signal, frequency: float = DEFAULT_LINE_FREQUENCY, cycles: float = 1.0
+    ) -> Tuple[NDArray[np.floating], NDArray[np.float64]]:
+        """Возвращает (время конца окна, действующее значение)."""
+        def compute():
+            values = sliding_rms(signal.y, signal.sampling_rate, frequency, cycles)
+            return signal.t[len(signal.t) - len(values):], values
+        return self._cached(signal, ("rms", frequency, cycles), compute)
+
+    def spectrum(
+        self, signal: Signal, frequency: float = DEFAULT_LINE_FREQUENCY, max_harmonic: int = MAX_HARMONIC
+    ) -> Tuple[NDArray[np.floating], NDArray[np.complex128]]:
+        """Возвращает (время конца окна, спектр (окна, гармоники)) по периодам."""
+        def compute():
+            ends, values = harmonic_spectrum(signal.y, signal.sampling_rate, frequency, max_harmonic)
+            return signal.t[ends], values
+        return self._cached(signal, ("spectrum", frequency, max_harmonic), compute)
+
+    def trace(
+        self, signal: Signal, kind: str, frequency: float = DEFAULT_LINE_FREQUENCY
+    ) -> Optional[Tuple[NDArray[np.floating], NDArray[np.float64]]]:
+        """Производная кривая вида `kind` (см. ANALYSIS_TRACES) или None, если её не построить."""
+        if not signal.has_data or signal.sampling_rate <= 0:
+            return None
+        try:
+            if kind == "rms":
+                return self.rms(signal, frequency)
+            if kind == "thd":
+                t, spectrum = self.spectrum(signal, frequency)
+                return self._cached(signal, ("thd", frequency), lambda: (t, 100.0 * total_harmonic_distortion(spectrum)))
+            cycles = 0.5 if kind == "half_cycle_magnitude" else 1.0
+            t, phasors = self.phasor(signal, frequency, cycles=cycles)
+            if kind == "angle":
+                return self._cached(signal, ("angle", frequency), lambda: (t, np.degrees(np.angle(phasors))))
+            if kind in ("magnitude", "half_cycle_magnitude"):
+                return self._cached(signal, (kind, frequency), lambda: (t, np.abs(phasors)))
+        except ValueError as e:
+            print(f"Ошибка анализа сигнала {signal.name}: {e}")
+            return None
+        raise ValueError(f"Неизвестный вид анализа: {kind}")
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "signals": len(self._results)}
+
+
+default_analyzer: SignalAnalyzer = SignalAnalyzer()
@@ -1,51 +1,360 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+import ast
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
 import numpy as np
 from numpy.typing import NDArray
 from asteval import Interpreter
 
+import fused_eval
+import profiling
+import waveform_cache
+from waveform_kernels import EQUATION_FUNCTIONS
 
+# Параметры записи по умолчанию
+DEFAULT_DURATION: float = 2.0
+DEFAULT_SAMPLING_RATE: int = 4000
+# Максимальное число скомпилированных уравнений в кэше
+EQUATION_CACHE_SIZE: int = 256
+# Максимальное число простаивающих интерпретаторов в пуле
+INTERPRETER_POOL_SIZE: int = 8
+
+
+class CompiledEquation:
+    """Разобранное и проверенное уравнение, готовое к многократному вычислению."""
+
+    __slots__ = ("text", "node", "names", "fused")
+
+    def __init__(self, text: str, node: ast.Module) -> None:
+        self.text: str = text
+        self.node: ast.Module = node
+        # Имена, которые уравнение читает (параметры, time, другие сигналы...)
+        self.names: FrozenSet[str] = frozenset(
+            n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)
+        )
+        # План слитного вычисления: None — ещё не строился, False — не поддерживается
+        self.fused: Optional[fused_eval.FusedPlan | bool] = None
+
+    def fused_plan(self) -> Optional[fused_eval.FusedPlan]:
+        """Возвращает план слитного вычисления или None, если нужен asteval."""
+        if self.fused is None:
+            try:
+                self.fused = fused_eval.FusedPlan(self.node)
+            except fused_eval.UnsupportedExpression:
+                self.fused = False
+        return self.fused or None
+
+
+class _EquationCache:
+    """LRU-кэш скомпилированных уравнений с счётчиками попаданий и промахов."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._items: "OrderedDict[str, CompiledEquation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, equation: str) -> CompiledEquation:
+        with self._lock:
+            compiled = self._items.get(equation)
+            if compiled is not None:
+                self._items.move_to_end(equation)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        # Разбор выполняется вне блокировки: он не зависит от состояния кэша
+        compiled = _compile(equation)
+        with self._lock:
+            self._items[equation] = compiled
+            self._items.move_to_end(equation)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return compiled
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class _InterpreterPool:
+    """Пул переиспользуемых интерпретаторов asteval.
+
+    Создание Interpreter() заполняет таблицу символов сотнями функций,
+    поэтому интерпретаторы не пересоздаются, а возвращаются в пул.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self._idle: List[Interpreter] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Interpreter]:
+        with self._lock:
+            aeval = self._idle.pop() if self._idle else None
+        if aeval is None:
+            aeval = Interpreter()
+            aeval.symtable['numpy'] = np
+            # Пакетные ядра: ряд гармоник и воспроизводимый шум
+            aeval.symtable.update(EQUATION_FUNCTIONS)
+        try:
+            yield aeval
+        finally:
+            with self._lock:
+                if len(self._idle) < self.maxsize:
+                    self._idle.append(aeval)
+
+
+_equation_cache = _EquationCache(EQUATION_CACHE_SIZE)
+_interpreter_pool = _InterpreterPool(INTERPRETER_POOL_SIZE)
+
+
+def _compile(equation: str) -> CompiledEquation:
+    """Разбирает уравнение и проверяет, что это одно выражение."""
+    try:
+        node = ast.fix_missing_locations(ast.parse(equation, mode="exec"))
+    except SyntaxError as e:
+        raise ValueError(f"Синтаксическая ошибка в уравнении: {e.msg}") from e
+    if len(node.body) != 1 or not isinstance(node.body[0], ast.Expr):
+        raise ValueError("Уравнение должно состоять из одного выражения")
+    return CompiledEquation(equation, node)
+
+
+def compile_equation(equation: str) -> CompiledEquation:
+    """Возвращает скомпилированное уравнение из кэша (или компилирует его)."""
+    return _equation_cache.get(equation)
+
+
+def equation_cache_info() -> Dict[str, int]:
+    """Возвращает статистику кэша уравнений: hits, misses, size, maxsize."""
+    return _equation_cache.info()
+
+
+def clear_equation_cache() -> None:
+    """Очищает кэш уравнений и сбрасывает счётчики."""
+    _equation_cache.clear()
+
+
+def _symbols(
+    t: NDArray[np.floating],
+    params: Dict[str, Any],
+    sources: Optional[Mapping[str, Any]] = None,
+    sampling_rate: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Собирает значения имён уравнения: сигналы, параметры, time, sampling_rate, phase_rad."""
+    symbols: Dict[str, Any] = dict(sources or {})
+    if sampling_rate is not None:
+        symbols['sampling_rate'] = sampling_rate
+    symbols.update(params)
+    symbols['time'] = t
+    # Специальная обработка фазы: конвертируем градусы в радианы
+    if 'phase' in symbols:
+        symbols['phase_rad'] = np.deg2rad(symbols['phase'])
+    return symbols
+
+
+def _evaluate(
+    compiled: CompiledEquation,
+    t: NDArray[np.floating],
+    params: Dict[str, Any],
+    sources: Optional[Mapping[str, Any]] = None,
+    sampling_rate: Optional[float] = None,
+) -> Any:
+    """Вычисляет уравнение на интерпретаторе из пула.
+
+    В таблицу символов подставляются только `time`, `sampling_rate`,
+    параметры, `phase_rad` и данные других сигналов (`sources`); после
+    вычисления таблица возвращается в исходное состояние.
+    """
+    symbols = _symbols(t, params, sources, sampling_rate)
+
+    with _interpreter_pool.acquire() as aeval:
+        symtable = aeval.symtable
+        shadowed = {key: symtable[key] for key in symbols if key in symtable}
+        symtable.update(symbols)
+        aeval.error = []
+        aeval.error_msg = None
+        aeval.expr = compiled.text
+        try:
+            result = aeval.run(compiled.node)
+        except Exception as e:
+            if not aeval.error:
+                raise
+            raise ValueError(aeval.error[-1].get_error()[1]) from e
+        else:
+            if aeval.error:
+                raise ValueError(aeval.error[-1].get_error()[1])
+            return result
+        finally:
+            aeval.error = []
+            for key in symbols:
+                if key in shadowed:
+                    symtable[key] = shadowed[key]
+                else:
+                    symtable.pop(key, None)
+
+
+_time_bases: "weakref.WeakValueDictionary[Tuple[float, int, float], NDArray[np.floating]]" = (
+    weakref.WeakValueDictionary()
+)
+_time_bases_lock = threading.Lock()
+
+
+def get_time_base(duration: float, sampling_rate: int, start: float = 0.0) -> NDArray[np.floating]:
+    """Возвращает общий для всех сигналов массив времени (только для чтения).
+
+    Массив живёт, пока на него ссылается хотя бы один сигнал, график или экспортёр.
+    """
+    key = (float(duration), int(sampling_rate), float(start))
+    with _time_bases_lock:
+        t = _time_bases.get(key)
+        if t is None:
+            t = np.linspace(start, start + duration, int(sampling_rate * duration), endpoint=False)
+            t.flags.writeable = False
+            _time_bases[key] = t
+    return t
+
+
+def time_base_info() -> Dict[str, int]:
+    """Возвращает число живых временных баз и занимаемую ими память в байтах."""
+    with _time_bases_lock:
+        bases = list(_time_bases.values())
+    return {"count": len(bases), "nbytes": sum(t.nbytes for t in bases)}
+
+
+# Размер блока по умолчанию для потоковой генерации (в отсчётах)
+DEFAULT_BLOCK_SIZE: int = 65536
+
+
+def _coerce_result(y_obj: Any, t: NDArray[np.floating]) -> NDArray[np.floating]:
+    """Проверяет результат уравнения и приводит его к форме массива времени."""
+    if not isinstance(y_obj, (np.ndarray, int, float)):
+        raise ValueError("Результат уравнения имеет неверный тип")
+    y_arr: NDArray[np.floating] = np.asarray(y_obj, dtype=float)
+    if y_arr.shape != t.shape:
+        # Пытаемся broadcast / привести к нужной длине
+        try:
+            y_arr = np.broadcast_to(y_arr, t.shape).astype(float, copy=False)
+        except ValueError:
+            raise ValueError("Размер результата уравнения не соответствует размеру времени")
+    return y_arr
+
+
+def _evaluate_array(
+    compiled: CompiledEquation,
+    t: NDArray[np.floating],
+    params: Dict[str, Any],
+    sources: Optional[Mapping[str, Any]] = None,
+    out: Optional[NDArray[np.float64]] = None,
+    sampling_rate: Optional[float] = None,
+) -> NDArray[np.floating]:
+    """Вычисляет уравнение в массив длины `t` (или в `out`, если он задан).
+
+    Сначала пробует слитный блочный вычислитель (fused_eval), который не
+    создаёт полноразмерных временных массивов; неподдерживаемые уравнения
+    и значения вычисляются через asteval.
+    """
+    plan = compiled.fused_plan()
+    if plan is not None:
+        try:
+            return plan.evaluate(_symbols(t, params, sources, sampling_rate), len(t), out)
+        except fused_eval.UnsupportedExpression:
+            pass
+    y_arr = _coerce_result(_evaluate(compiled, t, params, sources, sampling_rate), t)
+    if out is None:
+        return y_arr
+    out[...] = y_arr
+    return out
+
+
+@profiling.profiled("generate_signal_data")
 def generate_signal_data(
     params: Dict[str, Any],
     equation: str,
-    duration: float = 2.0,
-    sampling_rate: int = 4000,
+    duration: float = DEFAULT_DURATION,
+    sampling_rate: int = DEFAULT_SAMPLING_RATE,
+    sources: Optional[Mapping[str, Any]] = None,
 ) -> Tuple[NDArray[np.floating], NDArray[np.floating]]:
     """Генерирует временной ряд и значения сигнала, используя уравнение.
 
-    Всегда возвращает массивы numpy одинаковой длины.
+    `sources` — данные других сигналов по именам, на которые может ссылаться
+    уравнение (см. signal_graph). Всегда возвращает массивы numpy одинаковой длины.
+
+    Длинные сигналы без источников берутся из постоянного кэша
+    (waveform_cache), если они уже рассчитывались с теми же входами;
+    тогда y — отображённый в память массив только для чтения.
     """
-    t: NDArray[np.floating] = np.linspace(0, duration, int(sampling_rate * duration), endpoint=False)
-
-    aeval = Interpreter()
-    
-    # Добавляем numpy и временной ряд в контекст
-    aeval.symtable['numpy'] = np
-    aeval.symtable['time'] = t
-    
-    # Добавляем все параметры из GUI в контекст
-    for key, value in params.items():
-        aeval.symtable[key] = value
+    t: NDArray[np.floating] = get_time_base(duration, sampling_rate)
 
-    # Специальная обработка фазы: конвертируем градусы в радианы
-    if 'phase' in aeval.symtable:
-        aeval.symtable['phase_rad'] = np.deg2rad(aeval.symtable['phase'])
+    cache = waveform_cache.default_cache
+    key: Optional[str] = None
+    if not sources and cache.enabled and len(t) >= waveform_cache.CACHE_MIN_SAMPLES:
+        try:
+            key = cache.key(params, equation, duration, sampling_rate)
+        except TypeError as e:
+            print(f"Ошибка ключа кэша сигналов: {e}")
+        if key is not None:
+            with profiling.span("waveform_cache.get"):
+                cached = cache.get(key)
+            if cached is not None and cached.shape == t.shape:
+                return t, cached
 
     # Вычисляем уравнение
     try:
-        y_obj = aeval.eval(equation)
-        if not isinstance(y_obj, (np.ndarray, int, float)):
-            raise ValueError("Результат уравнения имеет неверный тип")
-        y_arr: NDArray[np.floating] = np.asarray(y_obj, dtype=float)
-        if y_arr.shape != t.shape:
-            # Пытаемся broadcast / привести к нужной длине
-            try:
-                y_arr = np.broadcast_to(y_arr, t.shape).astype(float, copy=False)
-            except ValueError:
-                raise ValueError("Размер результата уравнения не соответствует размеру времени")
+        with profiling.span("equation.compile"):
+            compiled = compile_equation(equation)
+        with profiling.span("equation.evaluate"):
+            y_arr = _evaluate_array(compiled, t, params, sources, sampling_rate=sampling_rate)
     except Exception as e:  # noqa: BLE001 - хотим показывать любые ошибки расчёта
         print(f"Ошибка при вычислении уравнения: {e}")
-        y_arr = np.zeros_like(t, dtype=float)
+        return t, np.zeros_like(t, dtype=float)
 
+    if key is not None:
+        with profiling.span("waveform_cache.put"):
+            cache.put(key, y_arr)
     return t, y_arr
+
+
+def iter_signal_blocks(
+    params: Dict[str, Any],
+    equation: str,
+    duration: float = DEFAULT_DURATION,
+    sampling_rate: int = DEFAULT_SAMPLING_RATE,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[Tuple[int, NDArray[np.floating], NDArray[np.floating]]]:
+    """Потоково генерирует сигнал блоками по `block_size` отсчётов.
+
+    Возвращает кортежи (индекс первого отсчёта, t, y). Время каждого блока
+    вычисляется из глобального индекса отсчёта тем же способом, что и в
+    generate_signal_data, поэтому склеенные блоки совпадают с полной записью
+    и фаза между блоками не скачет. В отличие от generate_signal_data ошибки
+    вычисления не подавляются, а пробрасываются как ValueError.
+    """
+    if block_size <= 0:
+        raise ValueError("Размер блока должен быть положительным")
+    n_samples = int(sampling_rate * duration)
+    if n_samples == 0:
+        return
+    step = duration / n_samples
+    compiled = compile_equation(equation)
+    for start in range(0, n_samples, block_size):
+        stop = min(start + block_size, n_samples)
+        t = np.arange(start, stop, dtype=float) * step
+        yield start, t, _evaluate_array(compiled, t, params, sampling_rate=sampling_rate)
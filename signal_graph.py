@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from collections import deque
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set
+import numpy as np
+from numpy.typing import NDArray
+
+import signal_generator
+from resampling import resample
+from signal_model import Signal
+from waveform_kernels import EQUATION_FUNCTIONS
+
+if TYPE_CHECKING:
+    from regeneration import SignalRegenerator
+    from signal_library import SignalLibrary
+
+# Имена, которые всегда означают встроенные символы уравнения, а не сигналы
+RESERVED_NAMES: FrozenSet[str] = frozenset(
+    {"time", "numpy", "phase_rad", "sampling_rate"} | set(EQUATION_FUNCTIONS)
+)
+
+
+class DependencyCycleError(ValueError):
+    """Уравнения сигналов ссылаются друг на друга по кругу."""
+
+
+class SourceRenameError(ValueError):
+    """Переименование сигнала оборвало бы ссылки на него в уравнениях других сигналов."""
+
+
+class SignalGraph:
+    """Граф зависимостей производных сигналов библиотеки.
+
+    Уравнение может ссылаться на другой сигнал библиотеки по имени (если имя
+    является идентификатором Python), например `Ia + Ib + Ic`. При изменении
+    данных сигнала пересчитываются только зависящие от него сигналы, в
+    топологическом порядке. Данные источников передаются в уравнение
+    как есть (источник с другой частотой предварительно передискретизируется
+    на частоту сигнала), а сигнал, входы которого не изменились, не
+    пересчитывается.
+
+    Если задан `regenerator` (например, qt_adapter.QtSignalRegenerator),
+    зависимые сигналы не считаются в обработчике события, а ставятся в
+    фоновый пересчёт; сбор и передискретизация источников тоже выполняются
+    в рабочем потоке. Без него пересчёт синхронный.
+    """
+
+    def __init__(self, library: "SignalLibrary") -> None:
+        self.library: SignalLibrary = library
+        # id сигнала -> ключ входов, по которым он был рассчитан последний раз
+        self._memo: Dict[int, tuple] = {}
+        self._refreshing: bool = False
+        self.regenerator: Optional[SignalRegenerator] = None
+
+    def _by_name(self, override: Optional[Signal] = None, override_name: Optional[str] = None) -> Dict[str, Signal]:
+        by_name: Dict[str, Signal] = {}
+        for signal in self.library:
+            name = override_name if signal is override and override_name is not None else signal.name
+            if name.isidentifier() and name not in RESERVED_NAMES:
+                by_name.setdefault(name, signal)
+        return by_name
+
+    def dependencies_of(
+        self,
+        params: Mapping[str, Any],
+        equation: str,
+        by_name: Optional[Dict[str, Signal]] = None,
+    ) -> List[Signal]:
+        """Возвращает сигналы библиотеки, на которые ссылается уравнение."""
+        try:
+            names = signal_generator.compile_equation(equation).names
+        except ValueError:
+            return []
+        by_name = self._by_name() if by_name is None else by_name
+        return [by_name[name] for name in sorted(names) if name in by_name and name not in params]
+
+    def dependencies(self, signal: Signal, by_name: Optional[Dict[str, Signal]] = None) -> List[Signal]:
+        return self.dependencies_of(signal.params, signal.equation, by_name)
+
+    def sources_for(
+        self,
+        params: Mapping[str, Any],
+        equation: str,
+        sampling_rate: Optional[float] = None,
+    ) -> Dict[str, NDArray[Any]]:
+        """Возвращает данные сигналов-источников для уравнения (по именам).
+
+        При заданной `sampling_rate` источники с другой частотой приводятся к ней.
+        """
+        return _source_data(self.dependencies_of(params, equation), sampling_rate)
+
+    def source_loader(
+        self,
+        params: Mapping[str, Any],
+        equation: str,
+        sampling_rate: Optional[float] = None,
+    ) -> Callable[[], Dict[str, NDArray[Any]]]:
+        """Как sources_for, но данные собираются при вызове (в рабочем потоке регенератора)."""
+        return partial(_source_data, self.dependencies_of(params, equation), sampling_rate)
+
+    def dependents(self, signal: Signal) -> List[Signal]:
+        """Сигналы, уравнения которых ссылаются на `signal` напрямую."""
+        by_name = self._by_name()
+        return [other for other in self.library if signal in self.dependencies(other, by_name)]
+
+    def check(self, signal: Signal, params: Mapping[str, Any], equation: str) -> None:
+        """Проверяет, что новые параметры и уравнение сигнала не создают цикл.
+
+        Бросает DependencyCycleError с цепочкой имён, образующих цикл, и
+        SourceRenameError, если сигнал переименовывается, а на его прежнее
+        имя ссылаются другие сигналы (их данные перестали бы обновляться).
+        """
+        new_name = str(params.get("name", signal.name))
+        if new_name != signal.name:
+            users = [other.name for other in self.dependents(signal)]
+            if users:
+                raise SourceRenameError(
+                    f"Сигнал {signal.name} используется в уравнениях: {', '.join(users)}. "
+                    "Сначала измените эти уравнения"
+                )
+        by_name = self._by_name(signal, str(params.get("name", signal.name)))
+
+        def deps(node: Signal) -> List[Signal]:
+            if node is signal:
+                return self.dependencies_of(params, equation, by_name)
+            return self.dependencies(node, by_name)
+
+        # Поиск пути от сигнала обратно к нему самому
+        stack: List[List[Signal]] = [[signal]]
+        visited: Set[int] = set()
+        while stack:
+            path = stack.pop()
+            for dep in deps(path[-1]):
+                if dep is signal:
+                    chain = " -> ".join(s.name for s in path + [dep])
+                    raise DependencyCycleError(f"Циклическая зависимость сигналов: {chain}")
+                if dep.id not in visited:
+                    visited.add(dep.id)
+                    stack.append(path + [dep])
+
+    def dependents_order(self, changed: Iterable[Signal]) -> List[Signal]:
+        """Возвращает все сигналы, зависящие от `changed`, в порядке пересчёта.
+
+        Сигналы, входящие в цикл, в результат не попадают.
+        """
+        by_name = self._by_name()
+        dependents: Dict[int, List[Signal]] = {}
+        deps_of: Dict[int, List[Signal]] = {}
+        for signal in self.library:
+            deps_of[signal.id] = self.dependencies(signal, by_name)
+            for dep in deps_of[signal.id]:
+                dependents.setdefault(dep.id, []).append(signal)
+
+        # Грязный подграф: всё, что достижимо от изменившихся сигналов
+        roots = list(changed)
+        dirty: Dict[int, Signal] = {}
+        queue = deque(roots)
+        while queue:
+            for dependent in dependents.get(queue.popleft().id, []):
+                if dependent.id not in dirty:
+                    dirty[dependent.id] = dependent
+                    queue.append(dependent)
+
+        # Алгоритм Кана внутри грязного подграфа
+        in_degree = {
+            sid: sum(1 for dep in deps_of[sid] if dep.id in dirty) for sid in dirty
+        }
+        ready = deque(signal for sid, signal in dirty.items() if in_degree[sid] == 0)
+        order: List[Signal] = []
+        while ready:
+            signal = ready.popleft()
+            order.append(signal)
+            for dependent in dependents.get(signal.id, []):
+                if dependent.id in in_degree:
+                    in_degree[dependent.id] -= 1
+                    if in_degree[dependent.id] == 0:
+                        ready.append(dependent)
+        if len(order) < len(dirty):
+            cyclic = ", ".join(s.name for sid, s in dirty.items() if in_degree[sid] > 0)
+            print(f"Ошибка: циклическая зависимость сигналов ({cyclic}), они не пересчитаны")
+        return order
+
+    def refresh(self, changed: Signal) -> List[Signal]:
+        """Пересчитывает сигналы, зависящие от `changed`.
+
+        Возвращает пересчитанные сигналы (при заданном `regenerator` — поставленные
+        в очередь). В фоновом режиме сигнал, источник которого ещё считается,
+        пропускается: он будет пересчитан, когда придут новые данные источника.
+        Сигнал, у которого уже есть незавершённый запрос (например, правка
+        пользователя), перезапускается с параметрами этого запроса и свежими
+        источниками, а не с сохранёнными параметрами.
+        """
+        if self._refreshing:
+            # Вложенные уведомления от пересчитываемых сигналов уже учтены в порядке обхода
+            return []
+        self._refreshing = True
+        try:
+            regenerator = self.regenerator
+            recomputed: List[Signal] = []
+            waiting: Set[int] = set()
+            by_name = self._by_name()
+            for signal in self.dependents_order([changed]):
+                pending = regenerator.pending_request(signal) if regenerator is not None else None
+                if pending is not None:
+                    params, equation, rate = pending
+                    deps = self.dependencies_of(params, equation, by_name)
+                else:
+                    deps = self.dependencies(signal, by_name)
+                if regenerator is not None and any(
+                    dep.id in waiting or regenerator.is_pending(dep) for dep in deps
+                ):
+                    waiting.add(signal.id)
+                    continue
+                if pending is not None:
+                    # Результат ещё не применён, поэтому ключ пересчёта не запоминается
+                    regenerator.submit(signal, params, equation, partial(_source_data, deps, rate), rate)
+                    recomputed.append(signal)
+                    waiting.add(signal.id)
+                    continue
+                key = (
+                    signal.equation,
+                    repr(sorted(signal.params.items())),
+                    signal.duration,
+                    signal.sampling_rate,
+                    tuple((dep.id, dep.data_version) for dep in deps),
+                )
+                if self._memo.get(signal.id) == key:
+                    continue
+                self._memo[signal.id] = key
+                recomputed.append(signal)
+                if regenerator is not None:
+                    regenerator.submit(
+                        signal, signal.params, signal.equation,
+                        partial(_source_data, deps, signal.sampling_rate),
+                    )
+                    waiting.add(signal.id)
+                    continue
+                sources = _source_data(deps, signal.sampling_rate)
+                t, y = signal_generator.generate_signal_data(
+                    signal.params, signal.equation, signal.duration, signal.sampling_rate, sources
+                )
+                signal.set_data(signal.params, signal.equation, t, y)
+            return recomputed
+        finally:
+            self._refreshing = False
+
+    def forget(self, signal: Signal) -> None:
+        self._memo.pop(signal.id, None)
+
+
+def _source_data(deps: Iterable[Signal], sampling_rate: Optional[float]) -> Dict[str, NDArray[Any]]:
+    sources: Dict[str, NDArray[Any]] = {}
+    for dep in deps:
+        if not dep.has_data:
+            continue
+        if sampling_rate and dep.sampling_rate > 0 and dep.sampling_rate != sampling_rate:
+            sources[dep.name] = resample(dep.y, dep.sampling_rate, sampling_rate)
+        else:
+            # Отсчёты импортированной записи масштабируются здесь, один раз
+            sources[dep.name] = np.asarray(dep.y)
+    return sources
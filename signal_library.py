@@ -1,40 +1,105 @@
 from __future__ import annotations
 
-from typing import List, Iterator
-from PySide6.QtCore import QObject, Signal as QtSignal
-from signal_model import Signal
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Iterator, Optional, Union
+import profiling
+from events import Event
+from signal_model import Signal, SignalChange
+from signal_graph import SignalGraph
 
-class SignalLibrary(QObject):
+class SignalLibrary:
     """
     Модель, управляющая коллекцией сигналов.
     Инкапсулирует логику добавления, удаления и доступа к сигналам.
+    Не зависит от Qt; для виджетов см. qt_adapter.QtSignalLibrary.
+
+    Сигналы индексируются по стабильному идентификатору Signal.id, порядок
+    добавления сохраняется. События `signals_added` и `signals_removed`
+    передают список сигналов: пакетные операции уведомляют один раз.
+
+    Граф `graph` пересчитывает производные сигналы (уравнения со ссылками
+    на другие сигналы по имени), когда меняются данные или имя источника.
     """
-    signal_added = QtSignal(Signal)
-    signal_removed = QtSignal(Signal)
-    
+
     def __init__(self) -> None:
-        super().__init__()
-        self._signals: List[Signal] = []
+        self.signals_added: Event = Event()
+        self.signals_removed: Event = Event()
+        self._signals: Dict[int, Signal] = {}
+        self._change_handlers: Dict[int, Callable[[SignalChange], None]] = {}
+        self.graph: SignalGraph = SignalGraph(self)
 
     def add_signal(self, signal: Signal) -> None:
         """Добавляет сигнал в библиотеку и уведомляет подписчиков."""
-        self._signals.append(signal)
-        self.signal_added.emit(signal)
+        self.add_many([signal])
+
+    def add_many(self, signals: Iterable[Signal]) -> List[Signal]:
+        """Добавляет несколько сигналов и отправляет одно уведомление.
+
+        Сигналы, уже находящиеся в библиотеке, пропускаются. Возвращает
+        список действительно добавленных сигналов.
+        """
+        added: List[Signal] = []
+        for signal in signals:
+            if signal.id not in self._signals:
+                self._signals[signal.id] = signal
+                handler = partial(self._on_signal_changed, signal)
+                signal.updated.connect(handler)
+                self._change_handlers[signal.id] = handler
+                added.append(signal)
+        if added:
+            with profiling.span("SignalLibrary.signals_added"):
+                self.signals_added.emit(added)
+        return added
 
     def remove_signal(self, signal: Signal) -> None:
         """Удаляет сигнал из библиотеки и уведомляет подписчиков."""
-        if signal in self._signals:
-            self._signals.remove(signal)
-            self.signal_removed.emit(signal)
+        self.remove_many([signal])
+
+    def remove_many(self, signals: Iterable[Union[Signal, int]]) -> List[Signal]:
+        """Удаляет сигналы (или их идентификаторы) и отправляет одно уведомление."""
+        removed: List[Signal] = []
+        for item in signals:
+            signal_id = item.id if isinstance(item, Signal) else item
+            signal = self._signals.pop(signal_id, None)
+            if signal is not None:
+                signal.updated.disconnect(self._change_handlers.pop(signal_id))
+                self.graph.forget(signal)
+                removed.append(signal)
+        if removed:
+            with profiling.span("SignalLibrary.signals_removed"):
+                self.signals_removed.emit(removed)
+        return removed
+
+    def _on_signal_changed(self, signal: Signal, changes: SignalChange) -> None:
+        if changes & (SignalChange.DATA | SignalChange.NAME):
+            with profiling.span("SignalLibrary.refresh_dependents"):
+                self.graph.refresh(signal)
+
+    def get(self, signal_id: int) -> Optional[Signal]:
+        """Возвращает сигнал по идентификатору или None."""
+        return self._signals.get(signal_id)
+
+    def __getstate__(self) -> dict:
+        return {"_signals": self._signals}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+        self.add_many(state["_signals"].values())
 
     def get_all_signals(self) -> List[Signal]:
-        """Возвращает список всех сигналов (мутируемый)."""
-        return self._signals
+        """Возвращает список всех сигналов в порядке добавления (копию)."""
+        return list(self._signals.values())
 
     def __iter__(self) -> Iterator[Signal]:
         """Позволяет итерироваться по сигналам в библиотеке."""
-        return iter(self._signals)
+        return iter(list(self._signals.values()))
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def __contains__(self, signal: object) -> bool:
+        return isinstance(signal, Signal) and self._signals.get(signal.id) is signal
 
     def __getitem__(self, index: int) -> Signal:
-        """Позволяет получать доступ к сигналам по индексу."""
-        return self._signals[index]
+        """Позволяет получать доступ к сигналам по позиции (O(n)); по id — см. get()."""
+        return self.get_all_signals()[index]
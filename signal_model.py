@@ -1,7 +1,15 @@
 from __future__ import annotations
-from typing import Dict, Any
+import enum
+import itertools
+import weakref
+from typing import Dict, Any, Optional
+import numpy as np
+from numpy.typing import NDArray
+import profiling
 import signal_generator
-from PySide6.QtCore import QObject, Signal as QtSignal
+import waveform_store
+from events import Event
+from lod_pyramid import MinMaxPyramid
 
 PLOT_COLORS: list[tuple[int, int, int]] = [
     (255, 0, 0),       # red
@@ -16,37 +24,149 @@ PLOT_COLORS: list[tuple[int, int, int]] = [
 
 color_index: int = 0
 
-class Signal(QObject):
-    """Класс для представления одного аналогового сигнала."""
-    updated: QtSignal = QtSignal()
+# Источник стабильных идентификаторов сигналов
+_signal_ids = itertools.count(1)
 
-    def __init__(self, params: Dict[str, Any], equation: str) -> None:
-        super().__init__()
+
+class SignalChange(enum.Flag):
+    """Что именно изменилось в сигнале (передаётся в событие `updated`)."""
+    NONE = 0
+    DATA = enum.auto()   # отсчёты t/y
+    STYLE = enum.auto()  # цвет и прочее оформление
+    NAME = enum.auto()   # имя сигнала
+    ALL = DATA | STYLE | NAME
+
+
+class Signal:
+    """Класс для представления одного аналогового сигнала.
+
+    Не зависит от Qt: объект можно передавать в рабочие процессы (pickle),
+    подписчики события `updated` при этом не сериализуются.
+
+    Событие `updated` передаёт набор изменений SignalChange; счётчик `version`
+    растёт при любом изменении, `data_version` — только при смене отсчётов.
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        equation: str,
+        duration: float = signal_generator.DEFAULT_DURATION,
+        sampling_rate: int = signal_generator.DEFAULT_SAMPLING_RATE,
+        generate: bool = True,
+    ) -> None:
         global color_index
+        self.id: int = next(_signal_ids)
+        self.updated: Event = Event()
         self.params: Dict[str, Any] = params
         self.equation: str = equation
-        self.plot_item = None
+        self.duration: float = duration
+        self.sampling_rate: int = sampling_rate
         self.t = None
         self.y = None
+        self.version: int = 0
+        self.data_version: int = 0
+        self._lod: Optional[MinMaxPyramid] = None
+        # False — отсчёты нельзя получить из уравнения (например, импортированная
+        # запись): сигнал не пересчитывается, а параметры меняются только через set_params
+        self.regenerable: bool = True
+        # Отсчёты живут в хранилище waveform_store; освобождаем их вместе с сигналом
+        weakref.finalize(self, waveform_store.release, self.id)
         self.color: tuple[int, int, int] = PLOT_COLORS[color_index % len(PLOT_COLORS)]
         color_index += 1
-        self.generate_data()
+        # generate=False: данные будут рассчитаны позже (например, в фоне) и переданы в set_data
+        if generate:
+            self.generate_data()
 
+    @property
+    def has_data(self) -> bool:
+        return self.y is not None
+
+    @profiling.profiled("Signal.generate_data")
     def generate_data(self) -> None:
         """Генерирует данные временного ряда (t, y) для сигнала."""
-        self.t, self.y = signal_generator.generate_signal_data(self.params, self.equation)
+        t, y = signal_generator.generate_signal_data(
+            self.params, self.equation, self.duration, self.sampling_rate
+        )
+        self._set_arrays(t, y)
 
-    def update(self, params: Dict[str, Any], equation: str) -> None:
-        """Обновляет параметры и уравнение, а затем пересчитывает данные."""
+    def _set_arrays(self, t: NDArray[np.floating], y: NDArray[np.floating]) -> None:
+        self.t, self.y = t, waveform_store.put(self.id, y)
+        self.data_version += 1
+        if self._lod is not None:
+            self._lod.invalidate(t=self.t, y=self.y)
+
+    def _set_params(self, params: Dict[str, Any], equation: str) -> SignalChange:
+        old_name = self.name
         self.params = params
         self.equation = equation
+        return SignalChange.DATA | (SignalChange.NAME if self.name != old_name else SignalChange.NONE)
+
+    def _notify(self, changes: SignalChange) -> None:
+        self.version += 1
+        with profiling.span("Signal.updated"):
+            self.updated.emit(changes)
+
+    def update(self, params: Dict[str, Any], equation: str) -> None:
+        """Обновляет параметры и уравнение, а затем пересчитывает данные."""
+        changes = self._set_params(params, equation)
         self.generate_data()
-        self.updated.emit()
+        self._notify(changes)
+
+    def set_params(self, params: Dict[str, Any]) -> None:
+        """Меняет только метаданные (например, имя) без пересчёта отсчётов.
+
+        Отсчёты и `data_version` не меняются, поэтому графики не перезагружают
+        данные. Годится, лишь когда новые параметры не влияют на уравнение.
+        """
+        old_name = self.name
+        self.params = params
+        if self.name != old_name:
+            self._notify(SignalChange.NAME)
+
+    def set_data(
+        self,
+        params: Dict[str, Any],
+        equation: str,
+        t: NDArray[np.floating],
+        y: NDArray[np.floating],
+        sampling_rate: Optional[int] = None,
+    ) -> None:
+        """Подменяет параметры и данные готовым результатом фоновой генерации.
+
+        `sampling_rate` — частота, с которой рассчитаны t и y, если она изменилась.
+        """
+        changes = self._set_params(params, equation)
+        if sampling_rate is not None:
+            self.sampling_rate = sampling_rate
+        self._set_arrays(t, y)
+        self._notify(changes)
 
     def set_color(self, color: tuple[int, int, int]) -> None:
         """Устанавливает новый цвет для сигнала."""
         self.color = color
-        self.updated.emit()
+        self._notify(SignalChange.STYLE)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Объём отсчётов сигнала в байтах: resident (RAM) и mapped (в файле)."""
+        return waveform_store.usage(self.id)
+
+    @property
+    def lod(self) -> MinMaxPyramid:
+        """Min/max-пирамида для отрисовки; строится лениво при первом обращении."""
+        if self._lod is None:
+            self._lod = MinMaxPyramid(self.t, self.y)
+        return self._lod
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["updated"]
+        state["_lod"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.updated = Event()
 
     @property
     def name(self) -> str:
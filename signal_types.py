@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Файл с описаниями встроенных типов сигналов лежит рядом с модулем
+SIGNAL_TYPES_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "signal_types.json")
+
+
+def load_signal_types(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Загружает описания типов сигналов (имя, параметры, уравнение)."""
+    try:
+        with open(path or SIGNAL_TYPES_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def find_signal_type(configs: List[Dict[str, Any]], name: str) -> Optional[Dict[str, Any]]:
+    """Возвращает описание типа сигнала по имени или None."""
+    return next((c for c in configs if c["name"] == name), None)
+
+
+def default_params(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Возвращает значения параметров типа сигнала по умолчанию."""
+    return {param["key"]: param["default"] for param in config.get("params", [])}
+
+
+def resolve_spec(spec: Dict[str, Any], configs: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+    """Возвращает параметры и уравнение из описания {"type"|"equation", "params"}.
+
+    Параметры, не указанные в описании, берутся по умолчанию из типа;
+    явное "equation" имеет приоритет над уравнением типа.
+    """
+    params: Dict[str, Any] = {}
+    equation = spec.get("equation")
+    type_name = spec.get("type")
+    if type_name is not None:
+        config = find_signal_type(configs, type_name)
+        if config is None:
+            raise ValueError(f"Неизвестный тип сигнала: {type_name}")
+        params.update(default_params(config))
+        if equation is None:
+            equation = config.get("equation", "0")
+    if equation is None:
+        raise ValueError(f"Для {spec.get('name', 'сигнала')!r} не задан ни тип, ни уравнение")
+    params.update(spec.get("params", {}))
+    if type_name is not None:
+        params["type"] = type_name
+    return params, equation
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import numpy as np
+from numpy.typing import NDArray
+
+# Переменные окружения для настройки кэша по умолчанию
+CACHE_DIR_ENV: str = "COMTRADE_GEN_CACHE_DIR"
+CACHE_SIZE_ENV: str = "COMTRADE_GEN_CACHE_MB"
+# Ограничение размера кэша по умолчанию, МиБ (0 — кэш выключен)
+DEFAULT_CACHE_SIZE_MB: int = 1024
+# Короткие сигналы дешевле пересчитать, чем читать с диска
+CACHE_MIN_SAMPLES: int = 65536
+# Меняется при изменении способа генерации: старые записи перестают совпадать
+CACHE_FORMAT_VERSION: int = 1
+
+_ENTRY_SUFFIX: str = ".npy"
+
+
+def _normalize(value: Any) -> Any:
+    """Приводит параметр к типам JSON без потери значений (массивы — целиком).
+
+    Неизвестные типы не хэшируются через repr (он сокращает длинные массивы
+    до «...»), а вызывают TypeError.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Mapping):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    raise TypeError(f"Параметр типа {type(value).__name__} нельзя использовать в ключе кэша")
+
+
+def _default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "comtrade-gen", "waveforms")
+
+
+class WaveformCache:
+    """Постоянный кэш сгенерированных отсчётов на диске.
+
+    Ключ — sha256 от (уравнение, параметры, длительность, частота), значение —
+    файл .npy, который открывается через np.load(mmap_mode="r"), то есть без
+    чтения в память. Запись идёт во временный файл того же каталога и
+    завершается атомарным os.replace, поэтому параллельные процессы и потоки
+    видят либо целую запись, либо никакой. Сверх `max_bytes` удаляются
+    записи, к которым дольше всего не обращались (время изменения файла
+    обновляется при каждом попадании).
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_SIZE_MB * 1024 * 1024) -> None:
+        self.directory: str = directory or _default_directory()
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.writes: int = 0
+        self.evictions: int = 0
+        self._lock = threading.Lock()
+        # Оценка объёма кэша; None — каталог ещё не просматривался
+        self._total: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(params: Mapping[str, Any], equation: str, duration: float, sampling_rate: float) -> str:
+        """Возвращает ключ записи: sha256 от всех входов генерации.
+
+        Имя сигнала на отсчёты не влияет и в ключ не входит. Для параметров
+        неподдерживаемых типов бросает TypeError (такие сигналы не кэшируются).
+        """
+        payload = json.dumps(
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "equation": equation,
+                "params": _normalize({key: value for key, value in params.items() if key != "name"}),
+                "duration": float(duration),
+                "sampling_rate": float(sampling_rate),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + _ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[NDArray[np.float64]]:
+        """Возвращает отображённый в память массив (только для чтения) или None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            values = np.load(path, mmap_mode="r", allow_pickle=False)
+            os.utime(path)
+        except FileNotFoundError:
+            values = None
+        except (OSError, ValueError) as e:
+            # Повреждённая запись: удаляем, чтобы её перезаписал следующий расчёт
+            print(f"Ошибка чтения кэша сигналов {path}: {e}")
+            self._remove(path)
+            values = None
+        with self._lock:
+            if values is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return values
+
+    def put(self, key: str, values: NDArray[np.floating]) -> None:
+        """Сохраняет отсчёты под ключом; ошибки записи не прерывают генерацию."""
+        if not self.enabled:
+            return
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, values, allow_pickle=False)
+                os.replace(tmp_path, path)
+            except BaseException:
+                self._remove(tmp_path)
+                raise
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"Ошибка записи кэша сигналов {path}: {e}")
+            return
+        with self._lock:
+            self.writes += 1
+            if self._total is not None:
+                self._total += size
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(время последнего обращения, размер, путь) всех записей кэша."""
+        entries: List[Tuple[float, int, str]] = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(_ENTRY_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Удаляет самые давно использованные записи сверх `max_bytes`. Возвращает их число."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                removed += 1
+        with self._lock:
+            self._total = total
+            self.evictions += removed
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            # Уже удалён другим процессом или ещё отображён (на Windows)
+            return False
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша и сбрасывает статистику."""
+        for _, _, path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._total = 0
+            self.hits = self.misses = self.writes = self.evictions = 0
+
+    def info(self) -> Dict[str, int]:
+        """Статистика: попадания, промахи, записи, вытеснения, объём и число записей."""
+        entries = self._entries()
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "bytes": sum(size for _, size, _ in entries),
+                "entries": len(entries),
+            }
+
+
+def _cache_from_environment() -> WaveformCache:
+    size_mb = os.environ.get(CACHE_SIZE_ENV)
+    return WaveformCache(
+        directory=os.environ.get(CACHE_DIR_ENV) or None,
+        max_bytes=int(float(size_mb) * 1024 * 1024) if size_mb else DEFAULT_CACHE_SIZE_MB * 1024 * 1024,
+    )
+
+
+default_cache: WaveformCache = _cache_from_environment()
+
+
+def configure_default_cache(
+    directory: Optional[str] = None,
+    max_bytes: int = DEFAULT_CACHE_SIZE_MB * 1024 * 1024,
+) -> WaveformCache:
+    """Заменяет кэш по умолчанию (max_bytes=0 выключает кэширование)."""
+    global default_cache
+    default_cache = WaveformCache(directory, max_bytes)
+    return default_cache
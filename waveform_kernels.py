@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+# Размер блока для рекуррентного суммирования гармоник (буферы в кэше процессора)
+HARMONIC_BLOCK_SIZE: int = 8192
+# Отсчётов шума на один независимый поток генератора; от этого числа зависят
+# значения шума, поэтому менять его можно только вместе с версией кэша сигналов
+NOISE_BLOCK_SIZE: int = 4096
+# Отсчётов, для которых индексы шума считаются за один шаг (ограничивает пик памяти)
+NOISE_CHUNK_SIZE: int = 1 << 16
+
+
+def harmonic_series(
+    time: NDArray[np.floating],
+    frequency: ArrayLike,
+    amplitudes: Sequence[float],
+    phases: Optional[Sequence[float]] = None,
+) -> NDArray[np.float64]:
+    """Сумма гармоник Σ A_h·sin(2π·h·f·t + φ_h), h = 1..len(amplitudes).
+
+    Фазы — в градусах (недостающие считаются нулевыми). sin и cos
+    вычисляются один раз для основной гармоники, а высшие получаются
+    рекуррентностью Чебышёва sin((h+1)θ) = 2cosθ·sin(hθ) − sin((h−1)θ)
+    (так же для cos) поблочно, без полноразмерных вызовов sin на каждую
+    гармонику.
+    """
+    a = np.atleast_1d(np.asarray(amplitudes, dtype=np.float64)).ravel()
+    phi = np.zeros_like(a)
+    if phases is not None:
+        given = np.atleast_1d(np.asarray(phases, dtype=np.float64)).ravel()[:len(a)]
+        phi[:len(given)] = np.deg2rad(given)
+    # A·sin(hθ + φ) = A·cosφ·sin(hθ) + A·sinφ·cos(hθ)
+    sin_weights = a * np.cos(phi)
+    cos_weights = a * np.sin(phi)
+
+    theta = np.asarray(2.0 * np.pi * np.asarray(frequency) * np.asarray(time), dtype=np.float64)
+    flat = theta.ravel()
+    out = np.zeros(flat.shape)
+    block = min(HARMONIC_BLOCK_SIZE, max(len(flat), 1))
+    s_prev, s_cur, c_prev, c_cur, two_cos, scratch = (np.empty(block) for _ in range(6))
+    for start in range(0, len(flat), block):
+        stop = min(start + block, len(flat))
+        n = stop - start
+        sp, sc, cp, cc, tc, tmp = s_prev[:n], s_cur[:n], c_prev[:n], c_cur[:n], two_cos[:n], scratch[:n]
+        acc = out[start:stop]
+        np.sin(flat[start:stop], out=sc)
+        np.cos(flat[start:stop], out=cc)
+        np.multiply(cc, 2.0, out=tc)
+        sp.fill(0.0)
+        cp.fill(1.0)
+        for h in range(len(a)):
+            if sin_weights[h]:
+                np.multiply(sc, sin_weights[h], out=tmp)
+                acc += tmp
+            if cos_weights[h]:
+                np.multiply(cc, cos_weights[h], out=tmp)
+                acc += tmp
+            if h + 1 == len(a):
+                break
+            # Переход к гармонике h + 2: новое значение пишется на место старшего из двух
+            np.multiply(tc, sc, out=tmp)
+            np.subtract(tmp, sp, out=sp)
+            sp, sc = sc, sp
+            np.multiply(tc, cc, out=tmp)
+            np.subtract(tmp, cp, out=cp)
+            cp, cc = cc, cp
+    return out.reshape(theta.shape)
+
+
+def seeded_noise(
+    time: NDArray[np.floating],
+    sampling_rate: float,
+    seed: Any = 0,
+) -> NDArray[np.float64]:
+    """Нормальный шум (σ = 1), воспроизводимый при любой разбивке записи.
+
+    Отсчёт с индексом i = round(t·sampling_rate) берётся из блока
+    i // NOISE_BLOCK_SIZE, а у каждого блока свой генератор
+    numpy.random.Generator, порождённый SeedSequence(seed, spawn_key=(блок,)).
+    Поэтому значения не зависят от того, считается ли запись целиком,
+    кусками (iter_signal_blocks) или в разных процессах. Зерно берётся по
+    модулю 2**32 (отрицательные значения допустимы).
+
+    Время из get_time_base/iter_signal_blocks возрастает, поэтому индексы
+    считаются кусками по NOISE_CHUNK_SIZE, а блоки заполняются по порядку
+    прямо в результат; произвольный порядок отсчётов обрабатывается через
+    сортировку индексов.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    flat_time = time.ravel()
+    out = np.empty(flat_time.shape)
+    entropy = int(seed) & 0xFFFFFFFF
+    scratch = np.empty(NOISE_BLOCK_SIZE)
+    previous = -1
+    for start in range(0, len(flat_time), NOISE_CHUNK_SIZE):
+        index = np.rint(flat_time[start:start + NOISE_CHUNK_SIZE] * sampling_rate).astype(np.int64)
+        if index[0] < previous or (len(index) > 1 and not (index[1:] >= index[:-1]).all()):
+            break
+        if index[0] < 0:
+            raise ValueError("Шум определён только для неотрицательного времени")
+        _fill_noise(index, entropy, out[start:start + len(index)], scratch)
+        previous = int(index[-1])
+    else:
+        return out.reshape(time.shape)
+    # Время не по возрастанию: заполнение в порядке индексов с перестановкой
+    index = np.rint(flat_time * sampling_rate).astype(np.int64)
+    if index.min() < 0:
+        raise ValueError("Шум определён только для неотрицательного времени")
+    order = np.argsort(index, kind="stable")
+    ordered = np.empty(index.shape)
+    _fill_noise(index[order], entropy, ordered, scratch)
+    out[order] = ordered
+    return out.reshape(time.shape)
+
+
+def _fill_noise(index: NDArray[np.int64], entropy: int, out: NDArray[np.float64], scratch: NDArray[np.float64]) -> None:
+    """Заполняет `out` шумом для неубывающих индексов отсчётов `index`."""
+    lo = 0
+    while lo < len(index):
+        block = int(index[lo]) // NOISE_BLOCK_SIZE
+        base = block * NOISE_BLOCK_SIZE
+        hi = int(np.searchsorted(index, base + NOISE_BLOCK_SIZE, side="left"))
+        rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(entropy, spawn_key=(block,))))
+        first, last = int(index[lo]) - base, int(index[hi - 1]) - base
+        if last - first == hi - lo - 1:
+            # Подряд идущие отсчёты: срез потока блока
+            if first == 0:
+                rng.standard_normal(out=out[lo:hi])
+            else:
+                rng.standard_normal(out=scratch[:last + 1])
+                out[lo:hi] = scratch[first:last + 1]
+        else:
+            rng.standard_normal(out=scratch)
+            np.take(scratch, index[lo:hi] - base, out=out[lo:hi])
+        lo = hi
+
+
+# Функции, доступные в уравнениях сигналов по имени
+EQUATION_FUNCTIONS: Dict[str, Any] = {
+    "harmonic_series": harmonic_series,
+    "seeded_noise": seeded_noise,
+}
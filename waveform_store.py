@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import atexit
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+# Переменные окружения для настройки хранилища по умолчанию
+DTYPE_ENV: str = "COMTRADE_GEN_SAMPLE_DTYPE"
+MEMORY_BUDGET_ENV: str = "COMTRADE_GEN_MEMORY_BUDGET_MB"
+SCRATCH_DIR_ENV: str = "COMTRADE_GEN_SCRATCH_DIR"
+
+
+class ScaledView:
+    """Отсчёты a * raw + b, масштабируемые только при обращении.
+
+    `raw` — обычно представление поверх отображённого в память файла
+    (например, канал записи COMTRADE в целых числах). Срез view[i0:i1]
+    читает и масштабирует только затронутые страницы, np.asarray(view)
+    даёт весь массив float64. Хранилище не копирует такие отсчёты и
+    учитывает их как mapped.
+    """
+
+    __slots__ = ("raw", "a", "b")
+
+    dtype: np.dtype = np.dtype(np.float64)
+    ndim: int = 1
+
+    def __init__(self, raw: NDArray[Any], a: float = 1.0, b: float = 0.0) -> None:
+        self.raw: NDArray[Any] = raw
+        self.a: float = float(a)
+        self.b: float = float(b)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.raw.shape
+
+    @property
+    def size(self) -> int:
+        return self.raw.size
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, key: Any) -> Union[NDArray[np.float64], float]:
+        values = np.asarray(self.raw[key], dtype=np.float64)
+        if self.a != 1.0:
+            values = values * self.a
+        if self.b != 0.0:
+            values = values + self.b
+        return values if values.ndim else float(values)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> NDArray[Any]:
+        values = self[:]
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def _raw_range(self) -> Tuple[float, float]:
+        # Масштаб монотонен: крайние значения берутся по исходным отсчётам без копии
+        ends = (self.a * float(np.nanmin(self.raw)) + self.b, self.a * float(np.nanmax(self.raw)) + self.b)
+        return min(ends), max(ends)
+
+    def min(self) -> float:
+        return self._raw_range()[0]
+
+    def max(self) -> float:
+        return self._raw_range()[1]
+
+
+Samples = Union[NDArray[np.floating], ScaledView]
+
+
+class WaveformStore:
+    """Хранилище отсчётов сигналов с политикой типа данных и бюджетом памяти.
+
+    Отсчёты приводятся к заданному типу (float32 или float64). Пока суммарный
+    объём в памяти не превышает `memory_budget` байт, массивы хранятся в RAM;
+    дальше новые массивы сбрасываются в отображаемые в память файлы в рабочем
+    каталоге. В обоих случаях возвращается ndarray (np.memmap — его подкласс),
+    поэтому графики и экспорт читают данные без копирования. Массивы, уже
+    отображённые из файла (например, записи waveform_cache) с подходящим
+    типом, хранятся как есть и учитываются как mapped, а не как RAM.
+    """
+
+    def __init__(
+        self,
+        dtype: DTypeLike = np.float64,
+        memory_budget: Optional[int] = None,
+        scratch_dir: Optional[str] = None,
+    ) -> None:
+        self.dtype: np.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError("Поддерживаются только типы float32 и float64")
+        self.memory_budget: Optional[int] = memory_budget
+        self._scratch_root: Optional[str] = scratch_dir
+        self._scratch_dir: Optional[str] = None
+        self._lock = threading.Lock()
+        # ключ -> (число байт, путь к своему файлу или None, отображён ли из файла)
+        self._entries: Dict[int, Tuple[int, Optional[str], bool]] = {}
+        self._file_counter: int = 0
+
+    def put(self, key: int, values: Samples) -> Samples:
+        """Сохраняет отсчёты под ключом `key` и возвращает хранимый массив.
+
+        Предыдущие отсчёты с тем же ключом освобождаются. ScaledView хранится
+        без масштабирования и копирования.
+        """
+        self.release(key)
+        if isinstance(values, ScaledView):
+            with self._lock:
+                self._entries[key] = (values.raw.nbytes, None, _file_backed(values.raw))
+            return values
+        values = np.asarray(values)
+        nbytes = values.size * self.dtype.itemsize
+        if values.dtype == self.dtype and values.flags.c_contiguous and _file_backed(values):
+            # Чужой файл (например, запись кэша сигналов): страницы читает ОС
+            with self._lock:
+                self._entries[key] = (nbytes, None, True)
+            return values
+        with self._lock:
+            spill = self.memory_budget is not None and self._resident_total() + nbytes > self.memory_budget
+            if spill:
+                self._file_counter += 1
+                path = os.path.join(self._scratch(), f"signal_{key}_{self._file_counter}.f{self.dtype.itemsize * 8}")
+            else:
+                path = None
+            self._entries[key] = (nbytes, path, path is not None)
+
+        if path is None:
+            # Без копирования, если тип и раскладка уже подходят
+            return np.ascontiguousarray(values, dtype=self.dtype)
+
+        mapped = np.memmap(path, dtype=self.dtype, mode="w+", shape=values.shape)
+        mapped[...] = values
+        mapped.flush()
+        return np.memmap(path, dtype=self.dtype, mode="r", shape=values.shape)
+
+    def release(self, key: int) -> None:
+        """Забывает отсчёты под ключом и удаляет их файл, если он был."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None and entry[1] is not None:
+            try:
+                os.remove(entry[1])
+            except OSError:
+                # Файл ещё отображён (например, на Windows) — удалится вместе с каталогом
+                pass
+
+    def usage(self, key: int) -> Dict[str, int]:
+        """Возвращает объём отсчётов сигнала: resident (RAM) и mapped (в файле)."""
+        with self._lock:
+            nbytes, _, mapped = self._entries.get(key, (0, None, False))
+        return {"resident": 0 if mapped else nbytes, "mapped": nbytes if mapped else 0}
+
+    def total_usage(self) -> Dict[str, int]:
+        """Возвращает суммарный объём отсчётов в RAM и в отображаемых файлах."""
+        with self._lock:
+            resident = self._resident_total()
+            mapped = sum(nbytes for nbytes, _, mapped in self._entries.values() if mapped)
+        return {"resident": resident, "mapped": mapped, "signals": len(self._entries)}
+
+    def close(self) -> None:
+        """Удаляет рабочий каталог со всеми сброшенными на диск отсчётами."""
+        with self._lock:
+            scratch, self._scratch_dir = self._scratch_dir, None
+            self._entries = {key: e for key, e in self._entries.items() if e[1] is None}
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _resident_total(self) -> int:
+        return sum(nbytes for nbytes, _, mapped in self._entries.values() if not mapped)
+
+    def _scratch(self) -> str:
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="comtrade-gen-", dir=self._scratch_root)
+        return self._scratch_dir
+
+
+def _file_backed(values: NDArray) -> bool:
+    """Отображён ли массив (или тот, представлением которого он является) из файла."""
+    base = values
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, "base", None)
+    return False
+
+
+def _store_from_environment() -> WaveformStore:
+    budget_mb = os.environ.get(MEMORY_BUDGET_ENV)
+    return WaveformStore(
+        dtype=os.environ.get(DTYPE_ENV, "float64"),
+        memory_budget=int(float(budget_mb) * 1024 * 1024) if budget_mb else None,
+        scratch_dir=os.environ.get(SCRATCH_DIR_ENV) or None,
+    )
+
+
+default_store: WaveformStore = _store_from_environment()
+# Прежние хранилища по умолчанию: живут, пока сигналы держат в них отсчёты
+_retired_stores: List[WaveformStore] = []
+_retired_lock = threading.Lock()
+
+
+@atexit.register
+def _close_default_store() -> None:
+    with _retired_lock:
+        stores, _retired_stores[:] = list(_retired_stores), []
+    for store in [default_store] + stores:
+        store.close()
+
+
+def configure_default_store(
+    dtype: DTypeLike = np.float64,
+    memory_budget: Optional[int] = None,
+    scratch_dir: Optional[str] = None,
+) -> WaveformStore:
+    """Заменяет хранилище по умолчанию (действует для новых данных сигналов).
+
+    Прежнее хранилище не закрывается сразу: отсчёты живых сигналов могут
+    быть отображены из его рабочего каталога. Оно закрывается, когда
+    освобождены все его отсчёты (или при выходе из программы).
+    """
+    global default_store
+    old = default_store
+    default_store = WaveformStore(dtype, memory_budget, scratch_dir)
+    if old.total_usage()["signals"]:
+        with _retired_lock:
+            _retired_stores.append(old)
+    else:
+        old.close()
+    return default_store
+
+
+def put(key: int, values: Samples) -> Samples:
+    """Сохраняет отсчёты сигнала в хранилище по умолчанию (см. WaveformStore.put)."""
+    _release_retired(key)
+    return default_store.put(key, values)
+
+
+def release(key: int) -> None:
+    """Освобождает отсчёты сигнала в том хранилище, где они лежат."""
+    default_store.release(key)
+    _release_retired(key)
+
+
+def usage(key: int) -> Dict[str, int]:
+    """Объём отсчётов сигнала (resident/mapped) с учётом прежних хранилищ."""
+    result = default_store.usage(key)
+    with _retired_lock:
+        stores = list(_retired_stores)
+    for store in stores:
+        for kind, nbytes in store.usage(key).items():
+            result[kind] += nbytes
+    return result
+
+
+def _release_retired(key: int) -> None:
+    with _retired_lock:
+        if not _retired_stores:
+            return
+        emptied = []
+        for store in _retired_stores:
+            store.release(key)
+            if not store.total_usage()["signals"]:
+                emptied.append(store)
+        for store in emptied:
+            _retired_stores.remove(store)
+    for store in emptied:
+        store.close()
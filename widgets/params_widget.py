@@ -1,19 +1,60 @@
 from __future__ import annotations
 
-import json
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QComboBox, QDoubleSpinBox, QLineEdit, QPushButton
+    QComboBox, QDoubleSpinBox, QLineEdit, QPushButton, QSpinBox
 )
+from PySide6.QtCore import QRegularExpression, QTimer, Signal as QtSignal
+from PySide6.QtGui import QRegularExpressionValidator
+
+import signal_generator
+from signal_types import load_signal_types
+
+# Задержка перед пересчётом после последнего изменения параметра, мс
+PARAMS_DEBOUNCE_MS: int = 250
+# Допустимый диапазон частоты дискретизации сигнала, Гц
+MIN_SAMPLING_RATE: int = 100
+MAX_SAMPLING_RATE: int = 1_000_000
+# Вектор чисел через запятую (допускает незаконченный ввод)
+VECTOR_PATTERN: str = r"[\s\d.,eE+-]*"
+
+
+def _format_vector(values: List[float]) -> str:
+    return ", ".join(f"{float(value):g}" for value in values)
+
+
+def _parse_vector(text: str) -> List[float]:
+    """Разбирает "1, 0.2, 0.1"; недописанные элементы пропускаются."""
+    values: List[float] = []
+    for part in text.split(","):
+        try:
+            values.append(float(part))
+        except ValueError:
+            continue
+    return values
+
 
 class ParamsWidget(QWidget):
+    # Испускается после серии правок параметров, когда пользователь остановился
+    params_changed = QtSignal()
+
     def __init__(self, parent=None) -> None:  # type: ignore[override]
         super().__init__(parent)
         self.param_spinboxes: Dict[str, QDoubleSpinBox] = {}
+        # Параметры-векторы (например, амплитуды гармоник): значения через запятую
+        self.param_vector_edits: Dict[str, QLineEdit] = {}
+        # False — сигнал нельзя пересчитать (например, импортированная запись):
+        # менять можно только имя
+        self._editable: bool = True
         self.signal_configs: List[Dict[str, Any]] = []
         self.load_signal_configs()
 
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(PARAMS_DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self.params_changed.emit)
+
         main_layout = QVBoxLayout(self)
         
         # Имя сигнала
@@ -29,9 +70,32 @@ class ParamsWidget(QWidget):
         self.signal_type_combo = QComboBox()
         self.signal_type_combo.addItems([config['name'] for config in self.signal_configs])
         self.signal_type_combo.currentIndexChanged.connect(self.update_param_fields)
+        # Выбор типа пользователем начинает описание нового сигнала
+        self.signal_type_combo.activated.connect(lambda _index: self.set_editable(True))
         signal_type_layout.addWidget(self.signal_type_combo)
         main_layout.addLayout(signal_type_layout)
 
+        # Уравнение: по умолчанию из типа сигнала; может ссылаться на другие
+        # сигналы библиотеки по имени, например "Ia + Ib + Ic"
+        equation_layout = QHBoxLayout()
+        equation_layout.addWidget(QLabel("Уравнение:"))
+        self.equation_edit = QLineEdit()
+        self.equation_edit.textEdited.connect(lambda _text: self._debounce_timer.start())
+        equation_layout.addWidget(self.equation_edit)
+        main_layout.addLayout(equation_layout)
+
+        # Частота дискретизации: у каждого сигнала своя
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("Частота дискретизации:"))
+        self.sampling_rate_spin = QSpinBox()
+        self.sampling_rate_spin.setRange(MIN_SAMPLING_RATE, MAX_SAMPLING_RATE)
+        self.sampling_rate_spin.setSingleStep(1000)
+        self.sampling_rate_spin.setSuffix(" Гц")
+        self.sampling_rate_spin.setValue(signal_generator.DEFAULT_SAMPLING_RATE)
+        self.sampling_rate_spin.valueChanged.connect(lambda _value: self._debounce_timer.start())
+        rate_layout.addWidget(self.sampling_rate_spin)
+        main_layout.addLayout(rate_layout)
+
         # Контейнер для динамических полей
         self.params_container_layout = QVBoxLayout()
         main_layout.addLayout(self.params_container_layout)
@@ -50,11 +114,7 @@ class ParamsWidget(QWidget):
         self.update_param_fields()
 
     def load_signal_configs(self) -> None:
-        try:
-            with open('signal_types.json', 'r', encoding='utf-8') as f:
-                self.signal_configs = json.load(f)
-        except FileNotFoundError:
-            self.signal_configs = []
+        self.signal_configs = load_signal_types()
 
     def update_param_fields(self) -> None:
         # Очистка старых полей
@@ -71,6 +131,7 @@ class ParamsWidget(QWidget):
                 item.layout().setParent(None)
 
         self.param_spinboxes.clear()
+        self.param_vector_edits.clear()
 
         # Создание новых полей
         selected_signal_name = self.signal_type_combo.currentText()
@@ -79,6 +140,8 @@ class ParamsWidget(QWidget):
         if not config:
             return
 
+        self.equation_edit.setText(config.get('equation', '0'))
+
         for param_info in config.get('params', []):
             label = param_info['label']
             key = param_info['key']
@@ -86,10 +149,21 @@ class ParamsWidget(QWidget):
             
             layout = QHBoxLayout()
             layout.addWidget(QLabel(label))
+            if isinstance(default_value, list):
+                vector_edit = QLineEdit(_format_vector(default_value))
+                vector_edit.setValidator(QRegularExpressionValidator(QRegularExpression(VECTOR_PATTERN), vector_edit))
+                vector_edit.textEdited.connect(lambda _text: self._debounce_timer.start())
+                vector_edit.setEnabled(self._editable)
+                layout.addWidget(vector_edit)
+                self.params_container_layout.addLayout(layout)
+                self.param_vector_edits[key] = vector_edit
+                continue
             spinner = QDoubleSpinBox()
             spinner.setRange(-10000, 10000)
             spinner.setValue(default_value)
             spinner.setSingleStep(0.1)
+            spinner.valueChanged.connect(lambda _value: self._debounce_timer.start())
+            spinner.setEnabled(self._editable)
             layout.addWidget(spinner)
             
             self.params_container_layout.addLayout(layout)
@@ -102,14 +176,24 @@ class ParamsWidget(QWidget):
         }
         for key, spinner in self.param_spinboxes.items():
             params[key] = spinner.value()
-        
-        selected_signal_name = self.signal_type_combo.currentText()
-        config = next((c for c in self.signal_configs if c['name'] == selected_signal_name), None)
-        equation: str = config.get('equation', '0') if config else '0'
+        for key, vector_edit in self.param_vector_edits.items():
+            params[key] = _parse_vector(vector_edit.text())
+
+        equation: str = self.equation_edit.text().strip() or '0'
 
         return params, equation
 
-    def set_params(self, params: Dict[str, Any]) -> None:
+    def sampling_rate(self) -> int:
+        return self.sampling_rate_spin.value()
+
+    def set_params(
+        self,
+        params: Dict[str, Any],
+        equation: Optional[str] = None,
+        sampling_rate: Optional[int] = None,
+        editable: bool = True,
+    ) -> None:
+        self.set_editable(editable)
         self.name_edit.setText(str(params.get("name", "")))
         type_value = params.get("type", "")
         if isinstance(type_value, str):
@@ -119,4 +203,24 @@ class ParamsWidget(QWidget):
         for key, spinner in self.param_spinboxes.items():
             if key in params and isinstance(params[key], (int, float)):
                 spinner.setValue(float(params[key]))
+        for key, vector_edit in self.param_vector_edits.items():
+            if isinstance(params.get(key), (list, tuple)):
+                vector_edit.setText(_format_vector(params[key]))
+        if equation is not None:
+            self.equation_edit.setText(equation)
+        if sampling_rate:
+            self.sampling_rate_spin.setValue(int(sampling_rate))
         self.signal_type_combo.blockSignals(False)
+        # Загрузка параметров сигнала — не правка пользователя
+        self._debounce_timer.stop()
+
+    def set_editable(self, editable: bool) -> None:
+        """Разрешает или запрещает правку параметров, уравнения и частоты.
+
+        Имя остаётся доступным, а выбор типа снова разрешает правку.
+        """
+        self._editable = editable
+        for widget in (self.equation_edit, self.sampling_rate_spin):
+            widget.setEnabled(editable)
+        for widget in [*self.param_spinboxes.values(), *self.param_vector_edits.values()]:
+            widget.setEnabled(editable)
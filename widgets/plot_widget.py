@@ -1,12 +1,19 @@
 from __future__ import annotations
 
-from typing import Sequence, Tuple
+from typing import Dict, Optional, Tuple
 import numpy as np
 from numpy.typing import ArrayLike
 import pyqtgraph as pg
 
+import profiling
+from lod_pyramid import MinMaxPyramid
+from render_scheduler import XLinkGroup, default_scheduler
+
 ColorTuple = Tuple[int, int, int]
 
+# Ширина области графика, если виджет ещё не показан
+_FALLBACK_PIXELS: int = 1000
+
 
 class PlotWidget(pg.PlotWidget):
     def __init__(self, parent=None) -> None:  # type: ignore[override]
@@ -15,17 +22,92 @@ class PlotWidget(pg.PlotWidget):
         self.setLabel('left', 'Амплитуда')
         self.setLabel('bottom', 'Время', units='с')
 
+        # Кривые, отрисовываемые через min/max-пирамиду, и их последние запросы
+        self._lod_items: Dict[pg.PlotDataItem, MinMaxPyramid] = {}
+        self._lod_queries: Dict[pg.PlotDataItem, tuple] = {}
+
+        # Общая группа оси X (см. render_scheduler.XLinkGroup) или None
+        self.x_link_group: Optional[XLinkGroup] = None
+
+        # Пересчёт видимых данных откладывается до кадра планировщика, чтобы
+        # объединить серию событий; скрытый график его пропускает до показа
+        view_box = self.getViewBox()
+        view_box.sigXRangeChanged.connect(self._schedule_lod_refresh)
+        view_box.sigResized.connect(self._schedule_lod_refresh)
+
+    @profiling.profiled("PlotWidget.add_plot")
     def add_plot(
         self,
         t: ArrayLike,
         y: ArrayLike,
-        color: ColorTuple = (255, 255, 255)
+        color: ColorTuple = (255, 255, 255),
+        pyramid: Optional[MinMaxPyramid] = None,
     ) -> pg.PlotDataItem:
         pen = pg.mkPen(color=color, width=2)
-        return self.plot(t, y, pen=pen)  # type: ignore[return-value]
+        if pyramid is None:
+            return self.plot(t, y, pen=pen)  # type: ignore[return-value]
+
+        plot_item = self.plot(pen=pen)
+        self._lod_items[plot_item] = pyramid
+        self._refresh_item(plot_item)
+        return plot_item  # type: ignore[return-value]
 
+    @profiling.profiled("PlotWidget.update_plot")
     def update_plot(self, plot_item: pg.PlotDataItem, t: ArrayLike, y: ArrayLike) -> None:
-        plot_item.setData(t, y)
+        if plot_item in self._lod_items:
+            self._lod_queries.pop(plot_item, None)
+            self._refresh_item(plot_item)
+        else:
+            plot_item.setData(t, y)
 
     def remove_plot(self, plot_item: pg.PlotDataItem) -> None:
+        self._lod_items.pop(plot_item, None)
+        self._lod_queries.pop(plot_item, None)
         self.removeItem(plot_item)
+
+    def _schedule_lod_refresh(self, *args) -> None:
+        if self._lod_items:
+            default_scheduler().schedule(self, self._refresh_lod)
+
+    def set_x_link_group(self, group: Optional[XLinkGroup]) -> None:
+        """Включает график в группу с общим диапазоном оси X (None — ось своя)."""
+        if self.x_link_group is group:
+            return
+        if self.x_link_group is not None:
+            self.x_link_group.remove(self)
+        self.x_link_group = group
+        if group is not None:
+            if group.x_range is None:
+                # Первый график задаёт диапазон группы
+                group.x_range = tuple(self.getViewBox().viewRange()[0])
+            group.add(self)
+
+    def apply_linked_x_range(self) -> None:
+        group = self.x_link_group
+        if group is None or group.x_range is None:
+            return
+        if tuple(self.getViewBox().viewRange()[0]) != group.x_range:
+            self.setXRange(*group.x_range, padding=0)
+
+    def _refresh_lod(self) -> None:
+        for plot_item in list(self._lod_items):
+            self._refresh_item(plot_item)
+
+    @profiling.profiled("PlotWidget.refresh_lod")
+    def _refresh_item(self, plot_item: pg.PlotDataItem) -> None:
+        """Передаёт в кривую только видимый диапазон на подходящем уровне детализации."""
+        pyramid = self._lod_items[plot_item]
+        view_box = self.getViewBox()
+        pixels = int(view_box.width()) or _FALLBACK_PIXELS
+        if view_box.autoRangeEnabled()[0] or len(pyramid.t) == 0:
+            # При автомасштабе по X нужна вся запись, иначе диапазон «схлопнется» до видимого
+            x0, x1 = (float(pyramid.t[0]), float(pyramid.t[-1])) if len(pyramid.t) else (0.0, 0.0)
+        else:
+            x0, x1 = view_box.viewRange()[0]
+
+        query = (x0, x1, pixels, pyramid.version)
+        if self._lod_queries.get(plot_item) == query:
+            return
+        self._lod_queries[plot_item] = query
+        x, y = pyramid.query(x0, x1, pixels)
+        plot_item.setData(np.asarray(x), np.asarray(y))
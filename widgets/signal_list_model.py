@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Set
+from PySide6.QtCore import (
+    QAbstractListModel, QIdentityProxyModel, QModelIndex, QObject, Qt,
+    Signal as QtSignal
+)
+from PySide6.QtGui import QColor
+
+from signal_model import Signal, SignalChange
+from qt_adapter import QtSignalLibrary
+
+# Роль, по которой модель отдаёт идентификатор сигнала
+SIGNAL_ID_ROLE: int = Qt.ItemDataRole.UserRole + 1
+
+
+class SignalListModel(QAbstractListModel):
+    """Общая для всех окон модель списка сигналов библиотеки (имя и цвет).
+
+    Одна модель обслуживает все представления; виджеты на каждый сигнал не
+    создаются, а QListView отрисовывает только видимые строки.
+    """
+
+    def __init__(self, signal_library: QtSignalLibrary, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._signals: List[Signal] = []
+        self._rows: Dict[int, int] = {}
+
+        signal_library.signals_added.connect(self._on_signals_added)
+        signal_library.signals_removed.connect(self._on_signals_removed)
+        signal_library.signal_updated.connect(self._on_signal_updated)
+        self._on_signals_added(signal_library.get_all_signals())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: B008
+        return 0 if parent.isValid() else len(self._signals)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        signal = self._signals[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return signal.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return QColor(*signal.color)
+        if role == SIGNAL_ID_ROLE:
+            return signal.id
+        return None
+
+    def signal_at(self, row: int) -> Optional[Signal]:
+        if 0 <= row < len(self._signals):
+            return self._signals[row]
+        return None
+
+    def row_of(self, signal: Signal) -> int:
+        return self._rows.get(signal.id, -1)
+
+    def _on_signals_added(self, signals: List[Signal]) -> None:
+        signals = [signal for signal in signals if signal.id not in self._rows]
+        if not signals:
+            return
+        first = len(self._signals)
+        self.beginInsertRows(QModelIndex(), first, first + len(signals) - 1)
+        for row, signal in enumerate(signals, start=first):
+            self._signals.append(signal)
+            self._rows[signal.id] = row
+        self.endInsertRows()
+
+    def _on_signals_removed(self, signals: List[Signal]) -> None:
+        rows = sorted((self._rows[s.id] for s in signals if s.id in self._rows), reverse=True)
+        if not rows:
+            return
+        # Удаляем непрерывными диапазонами с конца, чтобы номера строк не сдвигались
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self._signals[start:end + 1]
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+        self._rows = {signal.id: row for row, signal in enumerate(self._signals)}
+
+    def _on_signal_updated(self, signal: Signal, changes: SignalChange) -> None:
+        roles = []
+        if SignalChange.NAME in changes:
+            roles.append(Qt.ItemDataRole.DisplayRole)
+        if SignalChange.STYLE in changes:
+            roles.append(Qt.ItemDataRole.DecorationRole)
+        row = self._rows.get(signal.id)
+        if roles and row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, roles)
+
+
+class CheckableSignalProxy(QIdentityProxyModel):
+    """Представление общей модели с собственными флажками «показать на графике».
+
+    У каждого окна графика свой набор отмеченных сигналов, а имена и цвета
+    берутся из общей модели.
+    """
+    # (сигнал, отмечен ли)
+    check_changed = QtSignal(object, bool)
+
+    def __init__(self, source: SignalListModel, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self._checked: Set[int] = set()
+        source.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        return super().flags(index) | Qt.ItemFlag.ItemIsUserCheckable
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.CheckStateRole and index.isValid():
+            signal_id = super().data(index, SIGNAL_ID_ROLE)
+            return Qt.CheckState.Checked if signal_id in self._checked else Qt.CheckState.Unchecked
+        return super().data(index, role)
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.CheckStateRole or not index.isValid():
+            return super().setData(index, value, role)
+        signal = self.sourceModel().signal_at(index.row())
+        if signal is None:
+            return False
+        self.set_checked(signal, Qt.CheckState(value) == Qt.CheckState.Checked)
+        return True
+
+    def is_checked(self, signal: Signal) -> bool:
+        return signal.id in self._checked
+
+    def set_checked(self, signal: Signal, checked: bool) -> None:
+        if checked == (signal.id in self._checked):
+            return
+        if checked:
+            self._checked.add(signal.id)
+        else:
+            self._checked.discard(signal.id)
+        row = self.sourceModel().row_of(signal)
+        if row >= 0:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.check_changed.emit(signal, checked)
+
+    def _on_rows_about_to_be_removed(self, parent: QModelIndex, first: int, last: int) -> None:
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            signal = source.signal_at(row)
+            if signal is not None:
+                self._checked.discard(signal.id)
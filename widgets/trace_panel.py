@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt, QTimer
+
+import profiling
+
+# Период обновления таблицы, мс
+REFRESH_INTERVAL_MS: int = 500
+_SPARK_LEVELS: str = " ▁▂▃▄▅▆▇█"
+_COLUMNS: List[str] = ["Этап", "Вызовов", "Посл., мс", "Среднее, мс", "p50, мс", "p95, мс", "Макс., мс", "Распределение"]
+
+
+def _sparkline(histogram: List[int]) -> str:
+    """Рисует гистограмму символами от первой до последней непустой корзины."""
+    used = [i for i, count in enumerate(histogram) if count]
+    if not used:
+        return ""
+    counts = histogram[used[0]:used[-1] + 1]
+    top = max(counts)
+    return "".join(_SPARK_LEVELS[-(-count * (len(_SPARK_LEVELS) - 1) // top)] for count in counts)
+
+
+class TracePanel(QWidget):
+    """Панель с текущими задержками этапов (см. profiling).
+
+    Таблица обновляется по таймеру, только пока панель видна и
+    профилирование включено.
+    """
+
+    def __init__(self, parent=None) -> None:  # type: ignore[override]
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.enabled_check = QCheckBox("Профилирование")
+        self.enabled_check.setChecked(profiling.is_enabled())
+        self.enabled_check.toggled.connect(self._on_enabled_toggled)
+        controls.addWidget(self.enabled_check)
+        reset_button = QPushButton("Сбросить")
+        reset_button.clicked.connect(self.reset)
+        controls.addWidget(reset_button)
+        export_button = QPushButton("Экспорт трассы...")
+        export_button.clicked.connect(self.export_trace)
+        controls.addWidget(export_button)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self._update_timer()
+        self.refresh()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def _update_timer(self) -> None:
+        if profiling.is_enabled() and self.isVisible():
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def _on_enabled_toggled(self, checked: bool) -> None:
+        profiling.enable(checked)
+        self._update_timer()
+
+    def refresh(self) -> None:
+        stats: Dict[str, Dict[str, Any]] = profiling.stats()
+        names = sorted(stats, key=lambda name: stats[name]["mean_ms"] * stats[name]["count"], reverse=True)
+        self.table.setRowCount(len(names))
+        for row, name in enumerate(names):
+            stage = stats[name]
+            values = [
+                name,
+                str(stage["count"]),
+                f"{stage['last_ms']:.3f}",
+                f"{stage['mean_ms']:.3f}",
+                f"{stage['p50_ms']:.3f}",
+                f"{stage['p95_ms']:.3f}",
+                f"{stage['max_ms']:.3f}",
+                _sparkline(stage["histogram"]),
+            ]
+            for column, value in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if 0 < column < len(values) - 1:
+                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    self.table.setItem(row, column, item)
+                item.setText(value)
+
+    def reset(self) -> None:
+        profiling.reset()
+        self.refresh()
+
+    def export_trace(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Экспорт трассы", "trace.json", "Chrome Trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            count = profiling.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Экспорт трассы", f"Не удалось записать файл: {e}")
+            return
+        QMessageBox.information(
+            self, "Экспорт трассы",
+            f"Записано событий: {count}.\nОткройте файл в chrome://tracing или ui.perfetto.dev."
+        )